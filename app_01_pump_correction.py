@@ -1,90 +1,142 @@
-import tkinter as tk
-from tkinter import messagebox
-from tkinter import ttk
 import numpy as np
-import matplotlib.pyplot as plt
 from pathlib import Path
 
-from pump_correction_tools import (
-    specific_speed, B_from_water_conditions, correction_factor_flow, correction_factor_head,
-    C_BEP_head, correction_factor_efficiency, corrected_efficiency,
-    corrected_head, corrected_power  # Or rename potencia_water_known to corrected_power if you prefer
-)
+# tkinter and matplotlib are imported inside the functions that open windows or draw plots,
+# so importing this module (e.g. for batch runs) does not pay for them.
+from app_widgets import fluid_picker
+from correction_service import correct_pump, result_to_dict
+from result_cache import default_cache
 
-def calculate_and_plot():
-    try:
-        pump_name = entry_pump_name.get().strip()
-        if not pump_name:
-            messagebox.showerror("Error", "Please enter the pump name.")
-            return
-
-        Q_BEP_water = float(entry_q.get())
-        H_total = float(entry_h.get())
-        N = float(entry_n.get())
-        eta_water = float(entry_eta.get()) / 100  # Convert percent to decimal
-        viscosity = float(entry_visc.get())
-        specific_gravity = float(entry_s.get())
-    except ValueError:
-        messagebox.showerror("Error", "Please enter valid numeric values.")
-        return
-
-    # Validations
-    n_s = specific_speed(N_rpm=N, Q_BEP_water_m3s=Q_BEP_water / 3600, H_BEP_water_m=H_total)
-    if n_s > 60:
-        messagebox.showwarning("Warning", f"Specific speed is out of valid range (<60). n_s = {n_s:.2f}")
-        return
-
-    if not (1 <= viscosity <= 4000):
-        messagebox.showwarning("Warning", "Viscosity is out of valid range (1 to 4000 cSt).")
-        return
+VISCOSITY_RANGE = (1.0, 4000.0)  # Viscosity slider range [cSt], on a log scale
+# Part of the cache key of exported charts; bump it when the chart layout changes.
+CHART_VERSION = 2
 
-    B = B_from_water_conditions(nu_vis_cSt=viscosity, Q_BEP_water_m3h=Q_BEP_water, H_BEP_water_m=H_total, N_rpm=N)
-    if B > 40:
-        messagebox.showwarning("Warning", f"B parameter is out of valid range (<40). B = {B:.2f}")
-        return
 
-    ratios = np.arange(0.2, 1.6, 0.1)
-    Q = ratios * Q_BEP_water
+def read_inputs(entries):
+    """
+    Reads the pump and fluid entries.
 
-    corrected_head_vals = []
-    corrected_eta_vals = []
-    corrected_power_vals = []
+    Returns:
+        tuple: (pump_name, Q_BEP_water, H_total, N, eta_water, viscosity, specific_gravity, curve), where
+        curve holds the optional water curve keyword arguments of correct_pump (see read_water_curve).
 
-    original_head = [H_total] * len(Q)
-    original_eta = [eta_water] * len(Q)
-    original_power = [corrected_power(q, H_total, specific_gravity, eta_water) for q in Q]
+    Raises:
+        ValueError: With a message for the user when an entry is missing or not numeric.
+    """
+    pump_name = entries["pump_name"].get().strip()
+    if not pump_name:
+        raise ValueError("Please enter the pump name.")
 
-    for ratio in ratios:
-        Q_water = ratio * Q_BEP_water
+    try:
+        Q_BEP_water = float(entries["q"].get())
+        H_total = float(entries["h"].get())
+        N = float(entries["n"].get())
+        eta_water = float(entries["eta"].get()) / 100  # Convert percent to decimal
+        viscosity = float(entries["visc"].get())
+        specific_gravity = float(entries["s"].get())
+    except ValueError:
+        raise ValueError("Please enter valid numeric values.") from None
+
+    curve = read_water_curve(entries)
+    return pump_name, Q_BEP_water, H_total, N, eta_water, viscosity, specific_gravity, curve
+
+
+def read_water_curve(entries):
+    """
+    Reads the optional vendor water curve entries (comma-separated values).
+
+    Returns:
+        dict: curve_Q, curve_H, curve_eta and curve_degree keyword arguments of correct_pump;
+        empty when no curve points were entered.
+    """
+    def values(key):
+        text = entries[key].get().strip()
+        if not text:
+            return None
+        try:
+            return [float(v) for v in text.replace(";", ",").split(",") if v.strip()]
+        except ValueError:
+            raise ValueError("Water curve: enter the curve points as comma-separated numbers.") from None
+
+    curve_Q, curve_H, curve_eta = values("curve_q"), values("curve_h"), values("curve_eta")
+    if curve_H is None and curve_eta is None:
+        return {}
+    if curve_Q is None:
+        raise ValueError("Water curve: enter the flow rates of the curve points.")
+    for points in (curve_H, curve_eta):
+        if points is not None and len(points) != len(curve_Q):
+            raise ValueError("Water curve: every curve needs one value per flow rate.")
+
+    for points in (curve_H, curve_eta):
+        if points is not None and len(set(zip(curve_Q, points))) != len(set(curve_Q)):
+            raise ValueError("Water curve: every flow rate can only have one value per curve.")
+
+    degree = entries["curve_degree"].get().strip()
+    if degree and not degree.isdigit():
+        raise ValueError("Water curve: the fit degree must be a whole number.")
+    if degree and int(degree) >= len(set(curve_Q)):
+        raise ValueError(f"Water curve: a degree {degree} fit needs at least {int(degree) + 1} different flow rates.")
+    return {
+        "curve_Q": curve_Q,
+        "curve_H": curve_H,
+        "curve_eta": None if curve_eta is None else [v / 100 for v in curve_eta],  # Convert percent to decimal
+        "curve_degree": int(degree) if degree else None,
+    }
+
+
+def info_text(result, pump_name, Q_BEP_water, H_total, N, eta_water, viscosity, specific_gravity, mathtext=True):
+    # Mathtext is parsed on every draw (~10 ms per line), so the live chart uses plain text.
+    if not mathtext:
+        return '\n'.join((
+            f"Pump Data - {pump_name}",
+            "",
+            f"Q_BEP = {Q_BEP_water:.1f} m³/h",
+            f"H_BEP = {H_total:.1f} m",
+            f"N = {N:.0f} RPM",
+            f"η = {eta_water * 100:.1f} %",
+            f"ν = {viscosity:.1f} cSt",
+            f"s = {specific_gravity:.2f}",
+            f"n_s = {result.n_s:.2f}",
+            f"B = {result.B:.2f}"
+        ))
+    return '\n'.join((
+        f"Pump Data - {pump_name}",
+        "",
+        rf"$Q_{{\mathrm{{BEP}}}} = {Q_BEP_water:.1f}\ m^3/h$",
+        rf"$H_{{\mathrm{{BEP}}}} = {H_total:.1f}\ m$",
+        rf"$N = {N:.0f}\ RPM$",
+        rf"$\eta = {eta_water * 100:.1f}\ \%$",
+        rf"$\nu = {viscosity:.1f}\ cSt$",
+        rf"$s = {specific_gravity:.2f}$",
+        rf"$n_s = {result.n_s:.2f}$",
+        rf"$B = {result.B:.2f}$"
+    ))
 
-        if B <= 1.0:
-            C_q = C_h = C_eta = 1.0
-        else:
-            C_q = correction_factor_flow(B)
-            C_BEP_H = C_BEP_head(C_q)
-            C_h = correction_factor_head(C_BEP_H, Q_water, Q_BEP_water)
-            C_eta = correction_factor_efficiency(B)
 
-        Q_visc = Q_water * C_q
-        H_visc = corrected_head(C_h, H_total)
-        eta_visc = corrected_efficiency(C_eta, eta_water)
-        P = corrected_power(Q_visc, H_visc, specific_gravity, eta_visc)
+def build_chart(fig, animated=False):
+    """
+    Draws the empty pump curve chart (axes, labels, legend, info box) on a matplotlib Figure.
 
-        corrected_head_vals.append(H_visc)
-        corrected_eta_vals.append(eta_visc)
-        corrected_power_vals.append(P)
+    Parameters:
+        fig (Figure): Figure to draw on.
+        animated (bool): Mark the curves and info box as animated, so they can be blitted.
 
-    fig, ax1 = plt.subplots(figsize=(10, 6))
+    Returns:
+        dict: The axes ('ax1' head and power, 'ax2' efficiency), the curve lines by result
+        field and the 'info' text, to be filled by fill_chart.
+    """
+    ax1 = fig.add_subplot()
     ax2 = ax1.twinx()
 
-    ax1.plot(Q, original_head, '--', label='Head (Water)', color='blue')
-    ax1.plot(Q, corrected_head_vals, '-o', label='Head (Viscous Fluid)', color='blue')
+    artists = {"ax1": ax1, "ax2": ax2}
+    artists["H_water"], = ax1.plot([], [], '--', label='Head (Water)', color='blue', animated=animated)
+    artists["H_vis"], = ax1.plot([], [], '-o', label='Head (Viscous Fluid)', color='blue', animated=animated)
 
-    ax1.plot(Q, original_power, '--', label='Power (Water)', color='green')
-    ax1.plot(Q, corrected_power_vals, '-o', label='Power (Viscous Fluid)', color='green')
+    artists["P_water"], = ax1.plot([], [], '--', label='Power (Water)', color='green', animated=animated)
+    artists["P_vis"], = ax1.plot([], [], '-o', label='Power (Viscous Fluid)', color='green', animated=animated)
 
-    ax2.plot(Q, np.array(original_eta) * 100, '--', label='Efficiency (Water)', color='red')
-    ax2.plot(Q, np.array(corrected_eta_vals) * 100, '-o', label='Efficiency (Viscous Fluid)', color='red')
+    artists["eta_water"], = ax2.plot([], [], '--', label='Efficiency (Water)', color='red', animated=animated)
+    artists["eta_vis"], = ax2.plot([], [], '-o', label='Efficiency (Viscous Fluid)', color='red', animated=animated)
 
     ax1.set_xlabel(r"Flow Rate $[m^3/h]$")
     ax1.set_ylabel(r"Head [m]; Power [kW]")
@@ -93,7 +145,7 @@ def calculate_and_plot():
 
     ax1.grid(True)
 
-    plt.subplots_adjust(right=0.75)
+    fig.subplots_adjust(right=0.75)
 
     lines1, labels1 = ax1.get_legend_handles_labels()
     lines2, labels2 = ax2.get_legend_handles_labels()
@@ -101,70 +153,256 @@ def calculate_and_plot():
     fig.legend(lines1 + lines2, labels1 + labels2,
                loc='lower right', bbox_to_anchor=(0.95, 0.15), fontsize=9)
 
-    info_text = '\n'.join((
-        f"Pump Data - {pump_name}",
-        "",
-        rf"$Q_{{\mathrm{{BEP}}}} = {Q_BEP_water:.1f}\ m^3/h$",
-        rf"$H_{{\mathrm{{BEP}}}} = {H_total:.1f}\ m$",
-        rf"$N = {N:.0f}\ RPM$",
-        rf"$\eta = {eta_water * 100:.1f}\ \%$",
-        rf"$\nu = {viscosity:.1f}\ cSt$",
-        rf"$s = {specific_gravity:.2f}$",
-        rf"$n_s = {n_s:.2f}$",
-        rf"$B = {B:.2f}$"
-    ))
-
     props = dict(boxstyle='round', facecolor='white', alpha=0.9, linewidth=1)
-    ax1.text(1.1, 1.0, info_text, transform=ax1.transAxes,
-             fontsize=10, verticalalignment='top', bbox=props)
-
-    plt.title("Pump Curves (Original vs Corrected)", fontsize=14)
+    artists["info"] = ax1.text(1.1, 1.0, "", transform=ax1.transAxes,
+                               fontsize=10, verticalalignment='top', bbox=props, animated=animated)
+
+    ax1.set_title("Pump Curves (Original vs Corrected)", fontsize=14)
+    return artists
+
+
+def fill_chart(artists, result, text):
+    """
+    Sets the curves and info box of a chart drawn by build_chart.
+
+    The head/power axis keeps its limits while the curves fill a reasonable part of it, so
+    dragging the viscosity only moves the curves; it is rescaled (with headroom) when the
+    curves leave it or shrink to under half of it.
+
+    Returns:
+        bool: True if the axis limits changed, so the whole figure must be redrawn.
+    """
+    Q = np.asarray(result.Q_water)
+    for name in ("H_water", "H_vis", "P_water", "P_vis"):
+        artists[name].set_data(Q, getattr(result, name))
+    for name in ("eta_water", "eta_vis"):
+        artists[name].set_data(Q, np.asarray(getattr(result, name)) * 100)
+    artists["info"].set_text(text)
+
+    ax1 = artists["ax1"]
+    # Viscous power always exceeds water power, and viscous head can exceed water head near shutoff.
+    top = max(np.nanmax(getattr(result, name)) for name in ("H_water", "H_vis", "P_water", "P_vis"))
+    rescaled = False
+    for (low, high), get_lim, set_lim in (((Q.min(), Q.max()), ax1.get_xlim, ax1.set_xlim),
+                                          ((0.0, top), ax1.get_ylim, ax1.set_ylim)):
+        span = (high - low) or 1.0
+        current_low, current_high = get_lim()
+        if low < current_low or high > current_high or span < 0.5 * (current_high - current_low):
+            set_lim(low - 0.05 * span, high + 0.05 * span)
+            rescaled = True
+    return rescaled
+
+
+def plot_pump_curves(result, pump_name, Q_BEP_water, H_total, N, eta_water, viscosity, specific_gravity,
+                     file_format="pdf", cache=None):
+    """
+    Saves the pump curve chart to plots/pump_curves_<pump_name>.<file_format> (pdf or png).
+
+    The chart is drawn on its own Figure without pyplot, so exports can run on a worker thread.
+    With a result_cache.ResultCache, a chart already rendered for the same curves and pump data
+    is copied instead of drawn again.
+
+    Returns:
+        Path: The saved file.
+    """
+    text = info_text(result, pump_name, Q_BEP_water, H_total, N, eta_water, viscosity, specific_gravity)
 
     output_dir = Path("plots")
     output_dir.mkdir(exist_ok=True)
 
     clean_name = pump_name.replace(" ", "_").replace("/", "_")
 
-    file_name = output_dir / f"pump_curves_{clean_name}.pdf"
-    plt.savefig(file_name, format='pdf')
-    plt.show()
-
-    messagebox.showinfo("Success", f"Chart saved at:\n{file_name.resolve()}")
-
-root = tk.Tk()
-root.title("Pump Curve Viscosity Correction")
-
-frame = ttk.Frame(root, padding=10)
-frame.grid(row=0, column=0)
-
-ttk.Label(frame, text="Pump Name:").grid(row=0, column=0)
-entry_pump_name = ttk.Entry(frame)
-entry_pump_name.grid(row=0, column=1)
-
-ttk.Label(frame, text="Flow Rate (Best Efficiency Point) [m³/h]:").grid(row=1, column=0)
-entry_q = ttk.Entry(frame)
-entry_q.grid(row=1, column=1)
-
-ttk.Label(frame, text="Total Head [m]:").grid(row=2, column=0)
-entry_h = ttk.Entry(frame)
-entry_h.grid(row=2, column=1)
-
-ttk.Label(frame, text="Rotational Speed [RPM]:").grid(row=3, column=0)
-entry_n = ttk.Entry(frame)
-entry_n.grid(row=3, column=1)
-
-ttk.Label(frame, text="Efficiency [%]:").grid(row=4, column=0)
-entry_eta = ttk.Entry(frame)
-entry_eta.grid(row=4, column=1)
-
-ttk.Label(frame, text="Kinematic Viscosity (1-4000) [cSt]:").grid(row=5, column=0)
-entry_visc = ttk.Entry(frame)
-entry_visc.grid(row=5, column=1)
-
-ttk.Label(frame, text="Specific Gravity:").grid(row=6, column=0)
-entry_s = ttk.Entry(frame)
-entry_s.grid(row=6, column=1)
-
-ttk.Button(frame, text="Generate Chart", command=calculate_and_plot).grid(row=7, columnspan=2, pady=10)
-
-root.mainloop()
+    file_name = output_dir / f"pump_curves_{clean_name}.{file_format}"
+    if cache is not None:
+        key = cache.key("pump_curves_figure", chart_version=CHART_VERSION, result=result_to_dict(result), text=text, file_format=file_format)
+        if cache.copy_figure(key, file_format, file_name):
+            return file_name
+
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 6))
+    fill_chart(build_chart(fig), result, text)
+    fig.savefig(file_name, format=file_format)
+    if cache is not None:
+        cache.put_figure(key, file_name)
+    return file_name
+
+
+class CurvePlot:
+    """
+    Pump curve chart embedded in a Tk window and updated in place.
+
+    The axes, grid, legend and labels are drawn once and cached as a background bitmap; an
+    update sets the new line data and blits only the curves and info box over that background.
+    The whole figure is redrawn only when the axis limits change or the window is resized.
+    """
+
+    def __init__(self, master):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=(10, 6))
+        self.artists = build_chart(self.figure, animated=True)
+        self.canvas = FigureCanvasTkAgg(self.figure, master)
+        self.widget = self.canvas.get_tk_widget()
+        self._animated = [artist for name, artist in self.artists.items() if name not in ("ax1", "ax2")]
+        self._background = None
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def update(self, result, text):
+        """
+        Shows a PumpCorrectionResult with its info box text.
+        """
+        if fill_chart(self.artists, result, text) or self._background is None:
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_animated()
+        self.canvas.blit(self.figure.bbox)
+
+    def _on_draw(self, event):
+        # A full draw skips the animated artists: cache the static background, then add them.
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in self._animated:
+            self.figure.draw_artist(artist)
+
+
+def main(master=None):
+    import math
+    import tkinter as tk
+    from concurrent.futures import ThreadPoolExecutor
+    from tkinter import messagebox, ttk
+
+    root = tk.Tk() if master is None else tk.Toplevel(master)
+    root.title("Pump Curve Viscosity Correction")
+
+    frame = ttk.Frame(root, padding=10)
+    frame.grid(row=0, column=0, sticky="n")
+
+    fields = [
+        ("pump_name", "Pump Name:"),
+        ("q", "Flow Rate (Best Efficiency Point) [m³/h]:"),
+        ("h", "Total Head [m]:"),
+        ("n", "Rotational Speed [RPM]:"),
+        ("eta", "Efficiency [%]:"),
+        ("visc", "Kinematic Viscosity (1-4000) [cSt]:"),
+        ("s", "Specific Gravity:"),
+        ("curve_q", "Water Curve Flow Rates [m³/h] (optional, comma-separated):"),
+        ("curve_h", "Water Curve Heads [m] (optional):"),
+        ("curve_eta", "Water Curve Efficiencies [%] (optional):"),
+        ("curve_degree", "Curve Fit Polynomial Degree (optional, blank = tabulated):"),
+    ]
+
+    entries = {}
+    for row, (key, text) in enumerate(fields):
+        ttk.Label(frame, text=text).grid(row=row, column=0)
+        entries[key] = ttk.Entry(frame)
+        entries[key].grid(row=row, column=1)
+
+    plot = CurvePlot(root)
+    plot.widget.grid(row=0, column=1, sticky="nsew")
+    root.columnconfigure(1, weight=1)
+    root.rowconfigure(0, weight=1)
+
+    status = ttk.Label(frame, text="", foreground="red", wraplength=320)
+    export_format = tk.StringVar(value="pdf")
+    # Exports run one at a time on a worker thread; the Tk loop polls for their completion.
+    exporter = ThreadPoolExecutor(max_workers=1)
+    pending = {"refresh": False}
+
+    def refresh():
+        # Redraws the embedded chart from the entries; input problems go to the status line.
+        pending["refresh"] = False
+        try:
+            inputs = read_inputs(entries)
+        except ValueError as error:
+            status.config(text=str(error))
+            return None
+        try:
+            result = correct_pump(*inputs[1:7], **inputs[7])
+        except ValueError as error:
+            status.config(text=str(error))
+            return None
+        if result.warnings:
+            status.config(text=result.warnings[0])
+            return None
+        status.config(text="")
+        plot.update(result, info_text(result, *inputs[:7], mathtext=False))
+        return result, inputs[:7]
+
+    def schedule_refresh(*_):
+        # Slider events can arrive faster than redraws: coalesce them into one redraw per idle loop.
+        if not pending["refresh"]:
+            pending["refresh"] = True
+            root.after_idle(refresh)
+
+    def set_entry(key, value):
+        entries[key].delete(0, tk.END)
+        entries[key].insert(0, value)
+
+    def on_slider(value):
+        set_entry("visc", f"{10 ** float(value):.1f}")
+        schedule_refresh()
+
+    def on_fluid(properties):
+        set_entry("visc", f"{properties['nu_cSt']:.1f}")
+        set_entry("s", f"{properties['specific_gravity']:.3f}")
+        schedule_refresh()
+
+    def export():
+        shown = refresh()
+        if shown is None:
+            messagebox.showerror("Error", status.cget("text"))
+            return
+        result, inputs = shown
+        future = exporter.submit(plot_pump_curves, result, *inputs, file_format=export_format.get(),
+                                 cache=default_cache())
+        export_button.config(state="disabled")
+
+        def poll():
+            if not future.done():
+                root.after(50, poll)
+                return
+            export_button.config(state="normal")
+            try:
+                file_name = future.result()
+            except OSError as error:
+                messagebox.showerror("Error", f"Could not save the chart:\n{error}")
+                return
+            messagebox.showinfo("Success", f"Chart saved at:\n{file_name.resolve()}")
+
+        poll()
+
+    fluid_picker(frame, len(fields), on_fluid)
+
+    row = len(fields) + 1
+    ttk.Label(frame, text="Viscosity Slider [cSt]:").grid(row=row, column=0)
+    ttk.Scale(frame, from_=math.log10(VISCOSITY_RANGE[0]), to=math.log10(VISCOSITY_RANGE[1]),
+              orient="horizontal", command=on_slider).grid(row=row, column=1, sticky="ew")
+
+    ttk.Button(frame, text="Update Chart", command=refresh).grid(row=row + 1, column=0, pady=10)
+    ttk.Combobox(frame, textvariable=export_format, values=("pdf", "png"), state="readonly",
+                 width=5).grid(row=row + 1, column=1, sticky="e")
+    export_button = ttk.Button(frame, text="Generate Chart", command=export)
+    export_button.grid(row=row + 2, columnspan=2, pady=5)
+    status.grid(row=row + 3, columnspan=2)
+
+    for entry in entries.values():
+        entry.bind("<Return>", schedule_refresh)
+        entry.bind("<FocusOut>", schedule_refresh)
+
+    def close():
+        exporter.shutdown(wait=False)
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", close)
+
+    if master is None:
+        root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
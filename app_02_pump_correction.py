@@ -1,27 +1,28 @@
-import tkinter as tk
 from pathlib import Path
-from tkinter import messagebox
-from tkinter import ttk
-import matplotlib.pyplot as plt
-
-from pump_correction_tools import (
-    B_from_viscous_operation,
-    inverse_correction_factor_flow,
-    inverse_correction_factor_head,
-    equivalent_water_flow,
-    equivalent_water_head,
-    inverse_correction_factor_efficiency,
-    equivalent_water_efficiency,
-    inverse_power
-)
+
+# tkinter and matplotlib are imported inside the functions that open windows or draw plots,
+# so importing this module (e.g. for batch runs) does not pay for them.
+from app_widgets import fluid_picker
+from correction_service import inverse_correction
+from result_cache import default_cache
 
 def save_plot(input_data, output_data, filename="report_plot"):
+    from tkinter import messagebox
+    import matplotlib.pyplot as plt
+
     # Ensure the 'plots' folder exists
     plots_folder = Path("plots")
     plots_folder.mkdir(exist_ok=True)
 
     file_path = plots_folder / f"{filename}.png"
 
+    # Identical reports are copied from the result cache instead of rendered again.
+    cache = default_cache()
+    key = cache.key("report_plot", input_data=input_data, output_data=output_data)
+    if cache.copy_figure(key, "png", file_path):
+        messagebox.showinfo("Image Saved", f"Plot saved as '{file_path}'")
+        return
+
     fig, ax = plt.subplots(figsize=(8, 6))
     ax.axis('off')  # hide axes
 
@@ -34,43 +35,35 @@ def save_plot(input_data, output_data, filename="report_plot"):
     plt.tight_layout()
     fig.savefig(file_path, dpi=300)
     plt.close(fig)
+    cache.put_figure(key, file_path)
     messagebox.showinfo("Image Saved", f"Plot saved as '{file_path}'")
 
-def calculate():
+def calculate(entries):
+    from tkinter import messagebox
+
     try:
-        Q_visc = float(entry_q_visc.get())
-        H_visc = float(entry_h_visc.get())
-        viscosity = float(entry_viscosity.get())
-        specific_gravity = float(entry_specific_gravity.get())
-        eta_water = float(entry_eta_water.get()) / 100  # convert % to decimal
+        Q_visc = float(entries["q_visc"].get())
+        H_visc = float(entries["h_visc"].get())
+        viscosity = float(entries["viscosity"].get())
+        specific_gravity = float(entries["specific_gravity"].get())
+        eta_water = float(entries["eta_water"].get()) / 100  # convert % to decimal
+        N_text = entries["n"].get().strip()
+        N = float(N_text) if N_text else None  # optional: enables the iterative inverse solution
     except ValueError:
         messagebox.showerror("Error", "Please enter valid numeric values.")
         return
 
-    B = B_from_viscous_operation(nu_vis_cSt=viscosity, Q_vis=Q_visc, H_vis=H_visc)
-
-    if B >= 40:
-        messagebox.showwarning("Warning", f"Parameter B out of valid range (<40). B = {B:.2f}")
-        return
-
-    if not (1 <= viscosity <= 4000):
-        messagebox.showwarning("Warning", "Viscosity out of allowed range (1 to 4000 cSt).")
+    result = default_cache().call(inverse_correction, Q_visc=Q_visc, H_visc=H_visc, viscosity=viscosity,
+                                  specific_gravity=specific_gravity, eta_water=eta_water, N=N)
+    if result.warnings:
+        messagebox.showwarning("Warning", result.warnings[0])
         return
 
-    if B <= 1.0:
-        C_q = C_h = C_eta = 1.0
-    else:
-        C_q = inverse_correction_factor_flow(B)
-        C_h = inverse_correction_factor_head(B)
-        C_eta = inverse_correction_factor_efficiency(B)
-
-    # Step 3: Calculate equivalent water operating conditions
-    Q_water = equivalent_water_flow(C_q, Q_visc)
-    H_water = equivalent_water_head(C_h, H_visc)
-    eta_vis = equivalent_water_efficiency(C_eta, eta_water)
-
-    # Step 4: Calculate required power under viscous conditions
-    P_vis = inverse_power(Q_visc, H_vis_total=H_visc, rho=specific_gravity, eta_vis=eta_vis)
+    B = result.B
+    Q_water = result.Q_water
+    H_water = result.H_water
+    eta_vis = result.eta_vis
+    P_vis = result.P_vis
 
     output_data = [
         f"Parameter B: {B:.2f}",
@@ -87,6 +80,8 @@ def calculate():
         f"Specific gravity: {specific_gravity}",
         f"Efficiency with water: {eta_water*100:.2f} %"
     ]
+    if N is not None:
+        input_data.append(f"Rotational speed: {N} RPM")
 
     # Store for later saving
     calculate.input_data = input_data
@@ -94,8 +89,10 @@ def calculate():
 
     messagebox.showinfo("Results", '\n'.join(output_data))
 
-def save_with_name():
-    filename = entry_filename.get().strip()
+def save_with_name(entries):
+    from tkinter import messagebox
+
+    filename = entries["filename"].get().strip()
     if not filename:
         messagebox.showerror("Error", "Please enter a filename.")
         return
@@ -106,38 +103,49 @@ def save_with_name():
 
     save_plot(calculate.input_data, calculate.output_data, filename)
 
-# GUI setup
-root = tk.Tk()
-root.title("Viscous Fluid Operation Correction")
 
-frame = ttk.Frame(root, padding=10)
-frame.grid(row=0, column=0)
+def main(master=None):
+    import tkinter as tk
+    from tkinter import ttk
 
-ttk.Label(frame, text="Flow with viscosity [m³/h]:").grid(row=0, column=0, sticky='w')
-entry_q_visc = ttk.Entry(frame)
-entry_q_visc.grid(row=0, column=1)
+    root = tk.Tk() if master is None else tk.Toplevel(master)
+    root.title("Viscous Fluid Operation Correction")
+
+    frame = ttk.Frame(root, padding=10)
+    frame.grid(row=0, column=0)
+
+    fields = [
+        ("q_visc", "Flow with viscosity [m³/h]:"),
+        ("h_visc", "Manometric head [m]:"),
+        ("viscosity", "Viscosity [cSt] (1 to 4000):"),
+        ("specific_gravity", "Specific gravity:"),
+        ("eta_water", "Efficiency with water (%):"),
+        ("n", "Rotational speed [RPM] (optional):"),
+        ("filename", "Output filename (without extension):"),
+    ]
 
-ttk.Label(frame, text="Manometric head [m]:").grid(row=1, column=0, sticky='w')
-entry_h_visc = ttk.Entry(frame)
-entry_h_visc.grid(row=1, column=1)
+    entries = {}
+    for row, (key, text) in enumerate(fields):
+        ttk.Label(frame, text=text).grid(row=row, column=0, sticky='w')
+        entries[key] = ttk.Entry(frame)
+        entries[key].grid(row=row, column=1)
 
-ttk.Label(frame, text="Viscosity [cSt] (1 to 4000):").grid(row=2, column=0, sticky='w')
-entry_viscosity = ttk.Entry(frame)
-entry_viscosity.grid(row=2, column=1)
+    def on_fluid(properties):
+        entries["viscosity"].delete(0, tk.END)
+        entries["viscosity"].insert(0, f"{properties['nu_cSt']:.1f}")
+        entries["specific_gravity"].delete(0, tk.END)
+        entries["specific_gravity"].insert(0, f"{properties['specific_gravity']:.3f}")
 
-ttk.Label(frame, text="Specific gravity:").grid(row=3, column=0, sticky='w')
-entry_specific_gravity = ttk.Entry(frame)
-entry_specific_gravity.grid(row=3, column=1)
+    fluid_picker(frame, len(fields), on_fluid)
 
-ttk.Label(frame, text="Efficiency with water (%):").grid(row=4, column=0, sticky='w')
-entry_eta_water = ttk.Entry(frame)
-entry_eta_water.grid(row=4, column=1)
+    ttk.Button(frame, text="Calculate Correction", command=lambda: calculate(entries)).grid(
+        row=len(fields) + 1, columnspan=2, pady=10)
+    ttk.Button(frame, text="Save Plot", command=lambda: save_with_name(entries)).grid(
+        row=len(fields) + 2, columnspan=2, pady=5)
 
-ttk.Label(frame, text="Output filename (without extension):").grid(row=5, column=0, sticky='w')
-entry_filename = ttk.Entry(frame)
-entry_filename.grid(row=5, column=1)
+    if master is None:
+        root.mainloop()
 
-ttk.Button(frame, text="Calculate Correction", command=calculate).grid(row=6, columnspan=2, pady=10)
-ttk.Button(frame, text="Save Plot", command=save_with_name).grid(row=7, columnspan=2, pady=5)
 
-root.mainloop()
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,25 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
 from pathlib import Path
-import matplotlib.pyplot as plt
-import numpy as np
 
-from flow_resistance import reynolds_number, friction_factor, pressure_drop  # keep original names for imported funcs
+# tkinter and matplotlib are imported inside the functions that open windows or draw plots,
+# so importing this module (e.g. for batch runs) does not pay for them.
+from app_widgets import fluid_picker
+from correction_service import pressurized_flow
+from result_cache import default_cache
 
 def save_plot(input_data, output_data, filename="flow_report"):
+    from tkinter import messagebox
+    import matplotlib.pyplot as plt
+
     Path("plots").mkdir(exist_ok=True)
     filepath = Path("plots") / f"{filename}.png"
 
+    # Identical reports are copied from the result cache instead of rendered again.
+    cache = default_cache()
+    key = cache.key("report_plot", input_data=input_data, output_data=output_data)
+    if cache.copy_figure(key, "png", filepath):
+        messagebox.showinfo("Success", f"Image saved as {filepath}")
+        return
+
     fig, ax = plt.subplots(figsize=(8, 6))
     ax.axis("off")
 
@@ -20,35 +30,36 @@ def save_plot(input_data, output_data, filename="flow_report"):
     plt.tight_layout()
     fig.savefig(filepath, dpi=300)
     plt.close()
+    cache.put_figure(key, filepath)
     messagebox.showinfo("Success", f"Image saved as {filepath}")
 
-def calculate():
+def calculate(entries):
+    from tkinter import messagebox
+
     try:
-        g = float(entry_g.get())
-        mu = float(entry_mu.get())
-        rho = float(entry_rho.get())
-        P_nominal = float(entry_P_nominal.get())
-        P_min = float(entry_P_min.get())
-        divisor = float(entry_divisor.get())
-        Q_m3h = float(entry_Q.get())
-        D_inch = float(entry_D.get())
-        roughness = float(entry_roughness.get())
+        g = float(entries["g"].get())
+        mu = float(entries["mu"].get())
+        rho = float(entries["rho"].get())
+        P_nominal = float(entries["P_nominal"].get())
+        P_min = float(entries["P_min"].get())
+        divisor = float(entries["divisor"].get())
+        Q_m3h = float(entries["Q"].get())
+        D_inch = float(entries["D"].get())
+        roughness = float(entries["roughness"].get())
     except ValueError:
         messagebox.showerror("Error", "Please enter all values correctly.")
         return
 
-    Q_m3s = Q_m3h / 3600
-    D_m = D_inch * 2.54 / 100
-    A = np.pi * (D_m / 2) ** 2
-    velocity = Q_m3s / A
-    mass_flow = Q_m3s * rho
-
-    Re = reynolds_number(rho=rho, u=velocity, D=D_m, mu=mu)
-    f = friction_factor(Re=Re, D=D_m, epsilon=roughness, f_init=0.02, tol=1e-6, max_iter=100)
-    delta_P_max = P_nominal - P_min
-    head_loss_per_meter = pressure_drop(L=1, D=D_m, u=velocity, f=f, rho=rho)
-    length = (delta_P_max / divisor) / head_loss_per_meter
-    manometric_head = (delta_P_max / divisor) / (rho * g)
+    result = default_cache().call(pressurized_flow, g=g, mu=mu, rho=rho, P_nominal=P_nominal, P_min=P_min,
+                                  divisor=divisor, Q_m3h=Q_m3h, D_inch=D_inch, roughness=roughness)
+    D_m = result.D_m
+    Re = result.Re
+    f = result.f
+    head_loss_per_meter = result.head_loss_per_meter
+    length = result.length
+    manometric_head = result.manometric_head
+    mass_flow = result.mass_flow
+    velocity = result.velocity
 
     input_data = [
         f"Gravity: {g} m/s²",
@@ -78,8 +89,10 @@ def calculate():
 
     messagebox.showinfo("Results", "\n".join(output_data))
 
-def save_with_name():
-    filename = entry_filename.get().strip()
+def save_with_name(entries):
+    from tkinter import messagebox
+
+    filename = entries["filename"].get().strip()
     if not filename:
         messagebox.showerror("Error", "Please enter a filename to save.")
         return
@@ -88,40 +101,57 @@ def save_with_name():
         return
     save_plot(calculate.input_data, calculate.output_data, filename)
 
-root = tk.Tk()
-root.title("Pressurized Pipeline Flow Calculation")
-
-frame = ttk.Frame(root, padding=12)
-frame.grid()
-
-labels = [
-    ("Gravity [m/s²]:", "9.81"),
-    ("Dynamic viscosity μ [Pa·s]:", "0.0945"),
-    ("Density ρ [kg/m³]:", "945"),
-    ("Nominal pressure [Pa]:", "1000000"),
-    ("Minimum pressure [Pa]:", "520000"),
-    ("Pressure drop divisor (ΔP/div):", "2"),
-    ("Volumetric flow rate [m³/h]:", "2124"),
-    ("Internal diameter [inch]:", "24"),
-    ("Absolute roughness [m]:", "0.000045"),
-]
-
-entries = []
-for i, (text, default) in enumerate(labels):
-    ttk.Label(frame, text=text).grid(row=i, column=0, sticky="w")
-    entry = ttk.Entry(frame)
-    entry.insert(0, default)
-    entry.grid(row=i, column=1)
-    entries.append(entry)
-
-(entry_g, entry_mu, entry_rho, entry_P_nominal, entry_P_min,
- entry_divisor, entry_Q, entry_D, entry_roughness) = entries
-
-ttk.Label(frame, text="Filename (without extension):").grid(row=len(labels), column=0, sticky="w")
-entry_filename = ttk.Entry(frame)
-entry_filename.grid(row=len(labels), column=1)
-
-ttk.Button(frame, text="Calculate", command=calculate).grid(row=len(labels)+1, columnspan=2, pady=6)
-ttk.Button(frame, text="Save Plot", command=save_with_name).grid(row=len(labels)+2, columnspan=2)
-
-root.mainloop()
+
+def main(master=None):
+    import tkinter as tk
+    from tkinter import ttk
+
+    root = tk.Tk() if master is None else tk.Toplevel(master)
+    root.title("Pressurized Pipeline Flow Calculation")
+
+    frame = ttk.Frame(root, padding=12)
+    frame.grid()
+
+    labels = [
+        ("g", "Gravity [m/s²]:", "9.81"),
+        ("mu", "Dynamic viscosity μ [Pa·s]:", "0.0945"),
+        ("rho", "Density ρ [kg/m³]:", "945"),
+        ("P_nominal", "Nominal pressure [Pa]:", "1000000"),
+        ("P_min", "Minimum pressure [Pa]:", "520000"),
+        ("divisor", "Pressure drop divisor (ΔP/div):", "2"),
+        ("Q", "Volumetric flow rate [m³/h]:", "2124"),
+        ("D", "Internal diameter [inch]:", "24"),
+        ("roughness", "Absolute roughness [m]:", "0.000045"),
+    ]
+
+    entries = {}
+    for i, (key, text, default) in enumerate(labels):
+        ttk.Label(frame, text=text).grid(row=i, column=0, sticky="w")
+        entry = ttk.Entry(frame)
+        entry.insert(0, default)
+        entry.grid(row=i, column=1)
+        entries[key] = entry
+
+    ttk.Label(frame, text="Filename (without extension):").grid(row=len(labels), column=0, sticky="w")
+    entries["filename"] = ttk.Entry(frame)
+    entries["filename"].grid(row=len(labels), column=1)
+
+    def on_fluid(properties):
+        entries["mu"].delete(0, tk.END)
+        entries["mu"].insert(0, f"{properties['mu']:.5g}")
+        entries["rho"].delete(0, tk.END)
+        entries["rho"].insert(0, f"{properties['rho']:.1f}")
+
+    fluid_picker(frame, len(labels)+1, on_fluid)
+
+    ttk.Button(frame, text="Calculate", command=lambda: calculate(entries)).grid(
+        row=len(labels)+2, columnspan=2, pady=6)
+    ttk.Button(frame, text="Save Plot", command=lambda: save_with_name(entries)).grid(
+        row=len(labels)+3, columnspan=2)
+
+    if master is None:
+        root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
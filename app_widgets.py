@@ -0,0 +1,38 @@
+"""
+Tk form widgets shared by the three applications.
+
+tkinter is imported inside the builders, so the applications can import this module without
+loading it (see benchmarks/startup_time.py).
+"""
+
+from fluid_properties import FLUIDS, get_fluid
+
+
+def fluid_picker(frame, row, fill):
+    """
+    Adds an optional "fluid at temperature" row to an application form.
+
+    Parameters:
+        frame (ttk.Frame): Form frame (grid layout, labels in column 0, entries in column 1).
+        row (int): Grid row of the picker.
+        fill (callable): Called as fill(properties) with Fluid.properties of the chosen fluid
+            and temperature, to write them into the form's viscosity and density entries.
+    """
+    from tkinter import messagebox, ttk
+
+    ttk.Label(frame, text="Fluid / Temperature [°C] (optional):").grid(row=row, column=0, sticky='w')
+    picker = ttk.Frame(frame)
+    picker.grid(row=row, column=1)
+    name = ttk.Combobox(picker, values=sorted(FLUIDS, key=lambda n: FLUIDS[n].viscosity_cSt(40.0)),
+                        state="readonly", width=11)
+    name.grid(row=0, column=0)
+    temperature = ttk.Entry(picker, width=6)
+    temperature.grid(row=0, column=1)
+
+    def apply():
+        try:
+            fill(get_fluid(name.get()).properties(float(temperature.get())))
+        except (KeyError, ValueError):
+            messagebox.showerror("Error", "Please select a fluid and enter a numeric temperature.")
+
+    ttk.Button(picker, text="Apply", width=6, command=apply).grid(row=0, column=2)
@@ -0,0 +1,261 @@
+"""
+Batch runner for pump correction studies (ANSI/HI 9.6.7 Example 1 procedure).
+
+Reads a CSV or Parquet file of pumps, corrects every pump's curves with
+pump_correction_tools.correct_pump_batch and writes one output row per pump and flow ratio:
+
+    python batch_runner.py pumps.csv corrected.csv [--chunk-size 20000] [--flow-ratios 0.2,0.6,1.0,1.2]
+
+Input columns (header names are case sensitive):
+
+    name       Pump name
+    Q_BEP      Flow rate at BEP with water [m³/h]
+    H_BEP      Head at BEP with water [m]
+    N          Pump speed [rpm]
+    eta        Efficiency with water [decimal]
+    viscosity  Kinematic viscosity [cSt]
+    SG         Specific gravity [-]
+
+The file is processed in chunks of rows, so memory use does not grow with the file size.
+Rows outside the validity range of the standard are still corrected and flagged (1) in the
+n_s_out_of_range (n_s > 60), B_out_of_range (B > 40) and viscosity_out_of_range
+(outside 1 to 4000 cSt) columns. Parquet files need the optional pyarrow package.
+"""
+
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from pump_correction_tools import correct_pump_batch
+
+INPUT_COLUMNS = ["name", "Q_BEP", "H_BEP", "N", "eta", "viscosity", "SG"]
+
+OUTPUT_COLUMNS = [
+    "name", "flow_ratio",
+    "Q_water", "H_water", "eta_water", "P_water",
+    "Q_vis", "H_vis", "eta_vis", "P_vis",
+    "n_s", "B", "C_q", "C_h", "C_eta",
+    "n_s_out_of_range", "B_out_of_range", "viscosity_out_of_range",
+]
+
+DEFAULT_CHUNK_SIZE = 20000
+
+# Name, floats with 10 significant digits, range flags written as 0/1.
+_CSV_ROW_FORMAT = ",".join(["%s"] + ["%.10g"] * (len(OUTPUT_COLUMNS) - 4) + ["%d"] * 3) + "\n"
+
+
+def correct_chunk(chunk, flow_ratios=None):
+    """
+    Corrects one chunk of pump records.
+
+    Parameters:
+        chunk (dict): Input columns (see INPUT_COLUMNS) as equal-length sequences.
+        flow_ratios (array_like, optional): Q/Q_BEP grid, see correct_pump_batch.
+
+    Returns:
+        dict: Output columns (see OUTPUT_COLUMNS) as 1-D arrays with one entry per pump and
+        flow ratio, pumps varying slowest.
+    """
+    numeric = {key: np.asarray(chunk[key], dtype=float) for key in INPUT_COLUMNS[1:]}
+    curves = correct_pump_batch(numeric["Q_BEP"], numeric["H_BEP"], numeric["N"], numeric["eta"],
+                                numeric["viscosity"], numeric["SG"], flow_ratios=flow_ratios)
+
+    n_ratios = curves["Q_water"].shape[1]
+
+    def per_pump(values):
+        return np.repeat(values, n_ratios)
+
+    out = {
+        "name": per_pump(np.asarray(chunk["name"], dtype=object)),
+        "flow_ratio": np.tile(curves["flow_ratios"], len(numeric["Q_BEP"])),
+    }
+    for key in ("Q_water", "H_water", "eta_water", "P_water", "Q_vis", "H_vis", "eta_vis", "P_vis", "C_h"):
+        out[key] = curves[key].ravel()
+    for key in ("n_s", "B", "C_q", "C_eta"):
+        out[key] = per_pump(curves[key])
+    out["n_s_out_of_range"] = per_pump(~curves["valid_n_s"])
+    out["B_out_of_range"] = per_pump(~curves["valid_B"])
+    out["viscosity_out_of_range"] = per_pump(~curves["valid_viscosity"])
+    return out
+
+
+def read_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Streams the input file in chunks of rows.
+
+    Parameters:
+        path (str or Path): CSV or Parquet (.parquet / .pq) file.
+        chunk_size (int): Rows per chunk.
+
+    Yields:
+        dict: Input columns of the chunk, names as a list and numeric columns as float arrays
+        (lists for Parquet).
+
+    Raises:
+        ValueError: If the file is empty, a required column is missing or a numeric cell is
+            blank or not a number (naming the line, or row for Parquet, and column).
+    """
+    path = Path(path)
+    if path.suffix.lower() in (".parquet", ".pq"):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        _check_columns(parquet_file.schema_arrow.names, path)
+        first_row = 0
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=INPUT_COLUMNS):
+            chunk = batch.to_pydict()
+            for column in INPUT_COLUMNS[1:]:
+                if None in chunk[column]:
+                    row = first_row + chunk[column].index(None) + 1
+                    raise ValueError(f"{path}, row {row}: column '{column}' is empty.")
+            first_row += batch.num_rows
+            yield chunk
+        return
+
+    with open(path, newline="") as fh:
+        reader = csv.reader(fh)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError(f"{path}: the file is empty, expected a header row with {', '.join(INPUT_COLUMNS)}.")
+        _check_columns(header, path)
+        positions = [header.index(column) for column in INPUT_COLUMNS]
+        n_columns = max(positions) + 1
+
+        rows = []
+        lines = []
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < n_columns:
+                raise ValueError(f"{path}, line {reader.line_num}: expected {len(header)} columns, found {len(row)}.")
+            rows.append(row)
+            lines.append(reader.line_num)
+            if len(rows) == chunk_size:
+                yield _columns(rows, positions, lines, path)
+                rows = []
+                lines = []
+        if rows:
+            yield _columns(rows, positions, lines, path)
+
+
+class ChunkWriter:
+    """
+    Appends output chunks to a CSV or Parquet (.parquet / .pq) file.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._parquet = self.path.suffix.lower() in (".parquet", ".pq")
+        self._writer = None
+        self._fh = None
+
+    def write(self, columns):
+        if self._parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.table({key: columns[key] for key in OUTPUT_COLUMNS})
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+            return
+
+        if self._fh is None:
+            self._fh = open(self.path, "w", newline="")
+            self._fh.write(",".join(OUTPUT_COLUMNS) + "\n")
+
+        # One %-format per row is several times faster than csv.writer on float columns.
+        names = [_csv_field(name) for name in columns["name"].tolist()]
+        values = [columns[key].tolist() for key in OUTPUT_COLUMNS[1:]]
+        self._fh.write("".join(_CSV_ROW_FORMAT % row for row in zip(names, *values)))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._fh is not None:
+            self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run(input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE, flow_ratios=None):
+    """
+    Corrects every pump of input_path and writes the curves to output_path.
+
+    Parameters:
+        input_path (str or Path): CSV or Parquet file with INPUT_COLUMNS.
+        output_path (str or Path): CSV or Parquet file to write OUTPUT_COLUMNS to.
+        chunk_size (int): Rows per chunk.
+        flow_ratios (array_like, optional): Q/Q_BEP grid, see correct_pump_batch.
+
+    Returns:
+        int: Number of pumps processed.
+    """
+    n_pumps = 0
+    with ChunkWriter(output_path) as writer:
+        for chunk in read_chunks(input_path, chunk_size):
+            writer.write(correct_chunk(chunk, flow_ratios))
+            n_pumps += len(chunk["name"])
+        if n_pumps == 0:
+            # A header-only input still gives an output file with the header.
+            writer.write(correct_chunk({column: [] for column in INPUT_COLUMNS}, flow_ratios))
+    return n_pumps
+
+
+def _check_columns(names, path):
+    missing = [column for column in INPUT_COLUMNS if column not in names]
+    if missing:
+        raise ValueError(f"{path}: missing required column(s) {', '.join(missing)}.")
+
+
+def _csv_field(text):
+    if any(char in text for char in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def _columns(rows, positions, lines, path):
+    # Numeric columns are converted here so that a bad cell can be reported with its line;
+    # the row-by-row search only runs once a column has failed to convert.
+    columns = {}
+    for column, i in zip(INPUT_COLUMNS, positions):
+        values = [row[i] for row in rows]
+        if column != "name":
+            try:
+                values = np.asarray(values, dtype=float)
+            except ValueError:
+                for line, value in zip(lines, values):
+                    try:
+                        float(value)
+                    except ValueError:
+                        raise ValueError(f"{path}, line {line}: column '{column}' value '{value}' "
+                                         f"is not a number.") from None
+        columns[column] = values
+    return columns
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV or Parquet file of pump records.")
+    parser.add_argument("output", help="CSV or Parquet file for the corrected curves.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk.")
+    parser.add_argument("--flow-ratios", help="Comma-separated Q/Q_BEP values (default: 0.2 to 1.5 by 0.1).")
+    args = parser.parse_args(argv)
+
+    flow_ratios = [float(v) for v in args.flow_ratios.split(",")] if args.flow_ratios else None
+    try:
+        n_pumps = run(args.input, args.output, args.chunk_size, flow_ratios)
+    except (OSError, ValueError) as error:
+        sys.exit(f"Error: {error}")
+    print(f"{n_pumps} pumps corrected, results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+Benchmark scripts. Run them from the repository root, e.g.
+python -m benchmarks.friction_factor_backends
+"""
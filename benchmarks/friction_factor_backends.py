@@ -0,0 +1,151 @@
+"""
+Benchmark and accuracy report for the friction factor backends in flow_resistance.
+
+Every backend is evaluated over a log-spaced grid of the turbulent Re / relative-roughness
+plane and compared against the current fixed-point result (default tolerance) and against a
+tightly converged Colebrook-White reference. Run from the repository root:
+
+    python -m benchmarks.friction_factor_backends [--n-re 400] [--n-rough 80] [--json report.json]
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from flow_resistance import FRICTION_METHODS, friction_factor_array
+
+# Transcendental evaluations (log, sqrt, non-integer power) per point and iteration.
+TRANSCENDENTALS_FIXED = {
+    "fixed_point": 0,
+    "swamee_jain": 2,   # Re**0.9 + log10
+    "haaland": 2,       # (e/3.7)**1.11 + log10
+    "serghides": 3,     # three log10
+    "newton": 2,        # Swamee-Jain start
+    "lambert_w": 3,     # log(bc) + log(L) + final log(w)
+}
+TRANSCENDENTALS_PER_ITER = {"fixed_point": 2, "newton": 1, "lambert_w": 1}  # sqrt + log10 / log10 / log
+
+REGIONS = {
+    "transition (2.3e3-1e4)": (2300, 1e4),
+    "moderate (1e4-1e6)": (1e4, 1e6),
+    "fully rough (1e6-1e8)": (1e6, 1e8),
+}
+
+
+def mean_iterations(Re, rel_roughness, method, max_iter=100):
+    """
+    Estimates the mean iteration count from the number of unconverged elements per budget.
+
+    Parameters:
+        Re (ndarray): Reynolds numbers.
+        rel_roughness (ndarray): Relative roughness values.
+        method (str): Backend name.
+        max_iter (int): Largest budget tried.
+
+    Returns:
+        float: Mean iterations per point.
+    """
+    total = Re.size
+    iterations = 0.0
+    for k in range(max_iter):
+        _, n_failed = friction_factor_array(Re, 1.0, rel_roughness, max_iter=k, method=method)
+        if n_failed == 0:
+            break
+        iterations += n_failed / total
+    return iterations
+
+
+def time_backend(Re, rel_roughness, method, repeat=5):
+    """
+    Returns the best wall time per point over repeat runs [s].
+    """
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        friction_factor_array(Re, 1.0, rel_roughness, method=method)
+        best = min(best, time.perf_counter() - start)
+    return best / Re.size
+
+
+def build_report(n_re=400, n_rough=80):
+    """
+    Builds the accuracy and speed report for every backend.
+
+    Parameters:
+        n_re (int): Number of Reynolds numbers in the grid.
+        n_rough (int): Number of non-zero relative roughness values (a smooth pipe is added).
+
+    Returns:
+        dict: Report keyed by backend name.
+    """
+    Re_axis = np.logspace(np.log10(2301), 8, n_re)
+    rough_axis = np.concatenate([[0.0], np.logspace(-7, np.log10(0.05), n_rough)])
+    Re, rel_roughness = np.meshgrid(Re_axis, rough_axis, indexing="ij")
+
+    exact, _ = friction_factor_array(Re, 1.0, rel_roughness, tol=1e-15, max_iter=1000)
+    current, _ = friction_factor_array(Re, 1.0, rel_roughness)
+
+    report = {}
+    for method in FRICTION_METHODS:
+        f, n_failed = friction_factor_array(Re, 1.0, rel_roughness, method=method)
+        err_exact = np.abs(f / exact - 1)
+        err_current = np.abs(f / current - 1)
+
+        iterations = mean_iterations(Re, rel_roughness, method) if method in ("fixed_point", "newton") else (
+            3.0 if method == "lambert_w" else 0.0)
+
+        report[method] = {
+            "time_per_point_ns": time_backend(Re, rel_roughness, method) * 1e9,
+            "mean_iterations": iterations,
+            "transcendentals_per_point": TRANSCENDENTALS_FIXED[method]
+            + TRANSCENDENTALS_PER_ITER.get(method, 0) * iterations,
+            "n_failed": int(n_failed),
+            "max_rel_error_vs_exact": float(err_exact.max()),
+            "mean_rel_error_vs_exact": float(err_exact.mean()),
+            "max_rel_error_vs_fixed_point": float(err_current.max()),
+            "max_rel_error_by_region": {
+                name: float(err_exact[(Re >= lo) & (Re < hi)].max()) for name, (lo, hi) in REGIONS.items()
+            },
+        }
+    return report
+
+
+def print_report(report):
+    """
+    Prints the report as a text table.
+    """
+    header = (f"{'method':<12} {'ns/point':>9} {'iters':>6} {'transc.':>8} {'max err':>9} "
+              f"{'mean err':>9} {'vs f.p.':>9} {'failed':>6}")
+    print(header)
+    print("-" * len(header))
+    for method, r in report.items():
+        print(f"{method:<12} {r['time_per_point_ns']:>9.1f} {r['mean_iterations']:>6.2f} "
+              f"{r['transcendentals_per_point']:>8.1f} {r['max_rel_error_vs_exact']:>9.2e} "
+              f"{r['mean_rel_error_vs_exact']:>9.2e} {r['max_rel_error_vs_fixed_point']:>9.2e} "
+              f"{r['n_failed']:>6d}")
+
+    print("\nMaximum relative error against the converged Colebrook-White solution, by region:")
+    for method, r in report.items():
+        regions = "  ".join(f"{name}: {err:.2e}" for name, err in r["max_rel_error_by_region"].items())
+        print(f"{method:<12} {regions}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n-re", type=int, default=400)
+    parser.add_argument("--n-rough", type=int, default=80)
+    parser.add_argument("--json", help="Optional path to write the report as JSON.")
+    args = parser.parse_args()
+
+    report = build_report(args.n_re, args.n_rough)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Randomized check of the estimated error bound stored by friction_table.FrictionTable.
+
+Tables are built for both interpolations, with the default grid and refined to error targets,
+and each is queried at random (Re, epsilon/D) points against a tightly converged Colebrook-White
+solution. The script fails (exit code 1) if any lookup exceeds the table's error_bound. Run from
+the repository root:
+
+    python -m benchmarks.friction_table_accuracy [--samples 200000] [--seed 0]
+"""
+
+import argparse
+import sys
+import time
+
+from friction_table import FrictionTable
+
+# (interpolation, max_rel_error) of the checked tables; None keeps the default grid.
+CASES = [
+    ("bilinear", None), ("bilinear", 1e-3), ("bilinear", 1e-4),
+    ("bicubic", None), ("bicubic", 1e-4), ("bicubic", 2e-5),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=200000, help="Random lookups per table.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'interpolation':<14} {'target':>8} {'grid':>11} {'build':>8} {'error_bound':>12} {'sampled':>12}")
+    for interpolation, target in CASES:
+        start = time.perf_counter()
+        table = FrictionTable.build(interpolation=interpolation, max_rel_error=target)
+        build_time = time.perf_counter() - start
+        sampled = table.sampled_error(args.samples, args.seed)
+        status = ""
+        if sampled > table.error_bound:
+            status = "  BOUND EXCEEDED"
+            failed = True
+        grid = "x".join(str(n) for n in table.values.shape)
+        print(f"{interpolation:<14} {target if target else '-':>8} {grid:>11} {build_time:>7.2f}s "
+              f"{table.error_bound:>12.4e} {sampled:>12.4e}{status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
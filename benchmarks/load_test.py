@@ -0,0 +1,155 @@
+"""
+Load test for correction_server: many concurrent keep-alive clients, latency percentiles and
+throughput. By default a server is started in a subprocess on a free port; pass --port to
+test a server that is already running. Run from the repository root:
+
+    python -m benchmarks.load_test [--endpoint forward] [--concurrency 200] [--requests 20000] [--json report.json]
+
+The closed-loop clients keep `concurrency` requests in flight, so at saturation the latency is
+about concurrency / throughput: a single server process answers in under 1 ms p99 for one
+client but about 15 ms p99 for 100 (see the correction_server docstring for measured numbers).
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+CASES = {
+    "forward": {"Q_BEP_water": 300.0, "H_total": 80.0, "N": 2950.0, "eta_water": 0.75, "viscosity": 120.0,
+                "specific_gravity": 0.9},
+    "inverse": {"Q_visc": 250.0, "H_visc": 70.0, "viscosity": 120.0, "specific_gravity": 0.9, "eta_water": 0.75},
+    "pipeline": {"g": 9.81, "mu": 0.0945, "rho": 945.0, "P_nominal": 1e6, "P_min": 5.2e5, "divisor": 2,
+                 "Q_m3h": 300.0, "D_inch": 8.0, "roughness": 4.5e-5},
+}
+
+
+async def _request(reader, writer, method, path, body=b""):
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    status = int(head.split(b" ", 2)[1])
+    return status, await reader.readexactly(length)
+
+
+async def _client(host, port, path, bodies, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for body in bodies:
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, "POST", path, body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, endpoint, concurrency, n_requests, seed=0):
+    """
+    Sends n_requests to one endpoint from concurrency keep-alive connections.
+
+    Returns:
+        dict: Request count, errors, elapsed time, requests per second, latency percentiles
+        [ms] and the server's batch counters for the endpoint.
+    """
+    rng = np.random.default_rng(seed)
+    base = CASES[endpoint]
+    path = "/" + endpoint
+    per_client = [n_requests // concurrency + (i < n_requests % concurrency) for i in range(concurrency)]
+
+    def body():
+        # Jitter every input a little so the server cannot answer from identical rows.
+        return json.dumps({key: value * (1 + 0.05 * rng.uniform(-1, 1)) for key, value in base.items()}).encode()
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, path, [body() for _ in range(n)], latencies, errors)
+                           for n in per_client if n))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, stats = await _request(reader, writer, "GET", "/stats")
+    writer.close()
+
+    ms = np.array(latencies) * 1000
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "elapsed_s": elapsed,
+        "requests_per_s": len(latencies) / elapsed,
+        "latency_ms": {"p50": float(np.percentile(ms, 50)), "p90": float(np.percentile(ms, 90)),
+                       "p99": float(np.percentile(ms, 99)), "max": float(ms.max())},
+        "server": json.loads(stats)[path],
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_server(host, port, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Server on {host}:{port} did not start within {timeout} s.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", choices=sorted(CASES), default="forward")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="Port of a running server (default: start one).")
+    parser.add_argument("--max-delay-ms", type=float, default=0.0, help="Passed to the server that is started.")
+    parser.add_argument("--json", help="Optional path to write the report as JSON.")
+    args = parser.parse_args()
+
+    server = None
+    port = args.port
+    if port is None:
+        port = _free_port()
+        server = subprocess.Popen([sys.executable, "correction_server.py", "--host", args.host, "--port", str(port),
+                                   "--max-delay-ms", str(args.max_delay_ms)], stdout=subprocess.DEVNULL)
+    try:
+        _wait_for_server(args.host, port)
+        report = asyncio.run(run_load(args.host, port, args.endpoint, args.concurrency, args.requests))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latency = report["latency_ms"]
+    print(f"{report['endpoint']}: {report['requests']} requests, {report['concurrency']} concurrent, "
+          f"{report['errors']} errors")
+    print(f"  throughput   {report['requests_per_s']:,.0f} requests/s")
+    print(f"  latency [ms] p50 {latency['p50']:.3f}  p90 {latency['p90']:.3f}  p99 {latency['p99']:.3f}  "
+          f"max {latency['max']:.3f}")
+    print(f"  server       {report['server']['batches']} batches, "
+          f"mean batch size {report['server']['mean_batch_size']:.1f}")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
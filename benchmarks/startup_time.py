@@ -0,0 +1,142 @@
+"""
+Cold-start import benchmark for the compute and application modules.
+
+Each module is imported in a fresh interpreter with python -X importtime, and the best
+cumulative import time over several runs is reported. The script fails (exit code 1) when
+
+  - a module pulls in tkinter or matplotlib at import time, or
+  - a module's import time exceeds the stored baseline by more than the allowed margin.
+
+Run from the repository root:
+
+    python -m benchmarks.startup_time                    # check against the baseline
+    python -m benchmarks.startup_time --update-baseline  # record a new baseline
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+MODULES = [
+    "pump_correction_tools",
+    "flow_resistance",
+    "correction_service",
+    "correction_cache",
+    "friction_table",
+    "metrics",
+    "operating_point",
+    "pipeline_sweep",
+    "batch_runner",
+    "pump_catalog",
+    "correction_stream",
+    "correction_server",
+    "pipe_network",
+    "monte_carlo",
+    "fluid_properties",
+    "pump_station",
+    "speed_optimizer",
+    "result_cache",
+    "app_01_pump_correction",
+    "app_02_pump_correction",
+    "app_03_pressurized_flow",
+]
+
+FORBIDDEN = ("tkinter", "_tkinter", "matplotlib")
+
+BASELINE_FILE = Path(__file__).with_name("startup_baseline.json")
+
+
+def import_profile(module):
+    """
+    Imports a module in a fresh interpreter and parses the -X importtime report.
+
+    Parameters:
+        module (str): Module name.
+
+    Returns:
+        tuple: (cumulative import time of the module [ms], set of every module imported).
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               capture_output=True, text=True, check=True)
+    imported = set()
+    cumulative = None
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if not cumulative_us.strip().isdigit():
+            continue
+        imported.add(name)
+        if name == module:
+            cumulative = int(cumulative_us) / 1000
+    return cumulative, imported
+
+
+def measure(modules, repeat=5):
+    """
+    Measures the best cumulative import time of each module over repeat cold starts.
+
+    Parameters:
+        modules (list of str): Module names.
+        repeat (int): Number of fresh interpreters per module.
+
+    Returns:
+        tuple: (dict of best times [ms], dict of forbidden modules found per module).
+    """
+    times = {}
+    violations = {}
+    for module in modules:
+        best = float("inf")
+        for _ in range(repeat):
+            cumulative, imported = import_profile(module)
+            best = min(best, cumulative)
+        times[module] = best
+        found = sorted(name for name in imported if name.split(".")[0] in FORBIDDEN)
+        if found:
+            violations[module] = found
+    return times, violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed relative slowdown against the baseline (default: 0.5 = 50%%).")
+    parser.add_argument("--slack-ms", type=float, default=20.0,
+                        help="Allowed absolute slowdown against the baseline [ms], absorbs timer noise.")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    times, violations = measure(MODULES, args.repeat)
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+
+    failed = False
+    print(f"{'module':<26} {'import [ms]':>11} {'baseline':>9} {'limit':>9}")
+    for module, elapsed in times.items():
+        reference = baseline.get(module)
+        limit = reference * (1 + args.tolerance) + args.slack_ms if reference is not None else None
+        status = ""
+        if limit is not None and elapsed > limit:
+            status = "  REGRESSION"
+            failed = True
+        print(f"{module:<26} {elapsed:>11.1f} "
+              f"{reference if reference is not None else float('nan'):>9.1f} "
+              f"{limit if limit is not None else float('nan'):>9.1f}{status}")
+
+    for module, found in violations.items():
+        print(f"{module} imports GUI/plotting modules at import time: {', '.join(found)}")
+        failed = True
+
+    if args.update_baseline:
+        BASELINE_FILE.write_text(json.dumps({m: round(t, 1) for m, t in times.items()}, indent=2) + "\n")
+        print(f"Baseline written to {BASELINE_FILE}")
+        return
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Benchmark suite for the compute functions and the application pipelines.
+
+Every case is timed with timeit (best of several repeats) at up to three sizes:
+
+    scalar  one value per call, as the GUIs use the functions
+    batch   1,000 elements per call
+    sweep   100,000 elements per call
+
+Cases cover specific_speed, B_from_water_conditions and every correction factor of
+pump_correction_tools, the friction factor in the laminar, near-transition and turbulent
+regimes, the curve generation pipeline (correction_service.correct_pump / correct_pump_batch)
+and the pipeline sizing pipeline (pressurized_flow / pressurized_flow_batch / sweep_pipeline).
+
+The results are compared with benchmarks/suite_baseline.json and the script fails (exit code 1)
+if a case is slower than the baseline allows. Run from the repository root:
+
+    python -m benchmarks.suite                    # check against the baseline
+    python -m benchmarks.suite --update-baseline  # record a new baseline
+    python -m benchmarks.suite --filter friction --json report.json
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+import pump_correction_tools as tools
+from correction_service import correct_pump, pressurized_flow, pressurized_flow_batch
+from flow_resistance import friction_factor, friction_factor_array
+from pipeline_sweep import sweep_pipeline
+
+BASELINE_FILE = Path(__file__).with_name("suite_baseline.json")
+
+SIZES = {"scalar": 1, "batch": 1000, "sweep": 100000}
+
+# Reynolds number ranges of the friction factor regimes.
+REGIMES = {"laminar": (100.0, 2000.0), "transition": (2300.0, 4000.0), "turbulent": (1e4, 1e7)}
+
+
+def _inputs(n, seed=0):
+    # Pump and fluid inputs spread around the ANSI/HI 9.6.7 examples; scalars when n == 1.
+    rng = np.random.default_rng(seed)
+
+    def draw(low, high):
+        values = rng.uniform(low, high, n)
+        return float(values[0]) if n == 1 else values
+
+    return {
+        "Q": draw(50, 500), "H": draw(20, 150), "N": draw(1450, 3550), "eta": draw(0.5, 0.85),
+        "nu": draw(20, 1000), "SG": draw(0.8, 1.0), "B": draw(1.5, 30), "D": draw(0.05, 0.6),
+        "eps": draw(1e-5, 1e-3), "Re": {name: draw(*bounds) for name, bounds in REGIMES.items()},
+    }
+
+
+def build_cases():
+    """
+    Builds the benchmark cases.
+
+    Returns:
+        list: (name, size label, elements per call, zero-argument callable) tuples.
+    """
+    cases = []
+    for size, n in SIZES.items():
+        x = _inputs(n)
+
+        def add(name, fn):
+            cases.append((name, size, n, fn))
+
+        add("specific_speed", lambda x=x: tools.specific_speed(x["N"], x["Q"] / 3600, x["H"]))
+        add("B_from_water_conditions", lambda x=x: tools.B_from_water_conditions(x["nu"], x["Q"], x["H"], x["N"]))
+        add("correction_factor_flow", lambda x=x: tools.correction_factor_flow(x["B"]))
+        add("correction_factor_head", lambda x=x: tools.correction_factor_head(
+            tools.C_BEP_head(0.9), 0.8 * x["Q"], x["Q"]))
+        add("correction_factor_efficiency", lambda x=x: tools.correction_factor_efficiency(x["B"]))
+        add("B_from_viscous_operation", lambda x=x: tools.B_from_viscous_operation(x["nu"], x["Q"], x["H"]))
+        add("inverse_correction_factor_flow", lambda x=x: tools.inverse_correction_factor_flow(x["B"]))
+        add("inverse_correction_factor_head", lambda x=x: tools.inverse_correction_factor_head(x["B"]))
+        add("inverse_correction_factor_efficiency", lambda x=x: tools.inverse_correction_factor_efficiency(x["B"]))
+
+        for regime, Re in x["Re"].items():
+            if n == 1:
+                add(f"friction_factor[{regime}]", lambda Re=Re, x=x: friction_factor(Re, x["D"], x["eps"]))
+            else:
+                add(f"friction_factor_array[{regime}]", lambda Re=Re, x=x: friction_factor_array(Re, x["D"], x["eps"]))
+
+        if n == 1:
+            add("curve_generation[correct_pump]", lambda x=x: correct_pump(
+                x["Q"], x["H"], x["N"], x["eta"], x["nu"], x["SG"]))
+            add("pipeline_sizing[pressurized_flow]", lambda x=x: pressurized_flow(
+                9.81, 0.0945, 945.0, 1e6, 5.2e5, 2, x["Q"], x["D"] / 0.0254, x["eps"]))
+        else:
+            add("curve_generation[correct_pump_batch]", lambda x=x: tools.correct_pump_batch(
+                x["Q"], x["H"], x["N"], x["eta"], x["nu"], x["SG"]))
+            add("pipeline_sizing[pressurized_flow_batch]", lambda x=x: pressurized_flow_batch(
+                9.81, 0.0945, 945.0, 1e6, 5.2e5, 2, x["Q"], x["D"] / 0.0254, x["eps"]))
+            # Same number of cases as the size, as a Q x D x roughness x fluid grid.
+            n_q = n // 40
+            add("pipeline_sizing[sweep_pipeline]", lambda n_q=n_q: sweep_pipeline(
+                np.linspace(50, 3000, n_q), np.linspace(2, 24, 10), [4.5e-5, 1.5e-4], [(0.001, 998), (0.0945, 945)],
+                n_workers=1))
+    return cases
+
+
+def time_case(fn, repeat=5, min_time=0.2):
+    """
+    Times one case.
+
+    Parameters:
+        fn (callable): Zero-argument callable.
+        repeat (int): Number of timing repeats; the best one is kept.
+        min_time (float): Minimum duration of one repeat [s].
+
+    Returns:
+        float: Best time per call [s].
+    """
+    timer = timeit.Timer(fn)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run_suite(name_filter=None, repeat=5, min_time=0.2):
+    """
+    Runs the benchmark cases.
+
+    Parameters:
+        name_filter (str, optional): Only run cases whose name contains this text.
+        repeat (int): Timing repeats per case.
+        min_time (float): Minimum duration of one repeat [s].
+
+    Returns:
+        dict: {'<name>@<size>': {'name', 'size', 'elements', 'seconds_per_call', 'ns_per_element'}}.
+    """
+    # glibc serves large arrays with fresh mmap() calls, page-faulting on every call, until a
+    # large block has been freed once. Free one up front so timings don't depend on which
+    # cases ran before (e.g. when using name_filter).
+    np.ones(2000000)
+
+    results = {}
+    for name, size, n, fn in build_cases():
+        if name_filter and name_filter not in name:
+            continue
+        seconds = time_case(fn, repeat, min_time)
+        results[f"{name}@{size}"] = {"name": name, "size": size, "elements": n, "seconds_per_call": seconds,
+                                     "ns_per_element": seconds / n * 1e9}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", help="Only run cases whose name contains this text.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum duration of one timing repeat [s].")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed relative slowdown against the baseline (default: 0.5 = 50%%).")
+    parser.add_argument("--json", help="Optional path to write the results as JSON.")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run_suite(args.filter, args.repeat, args.min_time)
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+
+    failed = False
+    print(f"{'case':<52} {'per call':>12} {'per element':>13} {'baseline':>12} {'ratio':>7}")
+    for key, result in results.items():
+        reference = baseline.get(key)
+        ratio = result["seconds_per_call"] / reference if reference else float("nan")
+        status = ""
+        if reference and ratio > 1 + args.tolerance:
+            status = "  REGRESSION"
+            failed = True
+        print(f"{key:<52} {_format_time(result['seconds_per_call']):>12} "
+              f"{result['ns_per_element']:>10.1f} ns {_format_time(reference) if reference else '-':>12} "
+              f"{ratio:>7.2f}{status}")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"results": results, "baseline": baseline}, fh, indent=2)
+
+    if args.update_baseline:
+        baseline.update({key: float(f"{result['seconds_per_call']:.4g}") for key, result in results.items()})
+        BASELINE_FILE.write_text(json.dumps(dict(sorted(baseline.items())), indent=2) + "\n")
+        print(f"Baseline written to {BASELINE_FILE}")
+        return
+
+    sys.exit(1 if failed else 0)
+
+
+def _format_time(seconds):
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+from collections import OrderedDict, namedtuple
+
+from pump_correction_tools import (
+    specific_speed, B_from_water_conditions, correction_factor_flow, correction_factor_efficiency
+)
+
+CorrectionFactors = namedtuple("CorrectionFactors", ["B", "C_q", "C_eta", "n_s"])
+
+
+class CorrectionCache:
+    """
+    Opt-in memoization of the B -> C_q / C_eta chain (and the specific speed) of
+    pump_correction_tools.
+
+    Inputs are quantized to a fixed resolution before being used as the key, so that repeated
+    requests for the same catalog pump and standard viscosity hit the cache even when they arrive
+    with rounding noise. The least recently used entry is evicted once maxsize entries are stored.
+
+    A cache instance is not locked, since a lock costs about as much as the computation it
+    saves; give each worker thread its own instance.
+
+    Example:
+        cache = CorrectionCache(maxsize=4096)
+        B, C_q, C_eta, n_s = cache.factors(120.0, 110.0, 77.0, 2950)
+        print(cache.stats())
+    """
+
+    def __init__(self, maxsize=1024, resolution=1e-6):
+        """
+        Parameters:
+            maxsize (int): Maximum number of cached entries.
+            resolution (float): Quantization step applied to every input, in the input units
+                (cSt, m³/h, m, rpm).
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+
+        self.maxsize = maxsize
+        self.resolution = resolution
+        self._scale = 1.0 / resolution
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def factors(self, nu_vis_cSt, Q_BEP_water_m3h, H_BEP_water_m, N_rpm):
+        """
+        Returns B, C_q, C_eta and n_s for a pump and fluid, computing them only on a cache miss.
+
+        Parameters:
+            nu_vis_cSt (float): Kinematic viscosity of viscous fluid [cSt].
+            Q_BEP_water_m3h (float): Flow rate at BEP with water [m³/h].
+            H_BEP_water_m (float): Head at BEP with water [m].
+            N_rpm (float): Pump speed [rpm].
+
+        Returns:
+            CorrectionFactors: (B, C_q, C_eta, n_s). For B <= 1 both factors are 1.
+        """
+        scale = self._scale
+        key = (round(nu_vis_cSt * scale), round(Q_BEP_water_m3h * scale),
+               round(H_BEP_water_m * scale), round(N_rpm * scale))
+
+        entries = self._entries
+        entry = entries.get(key)
+        if entry is not None:
+            entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+
+        nu, Q, H, N = (k * self.resolution for k in key)
+        B = float(B_from_water_conditions(nu, Q, H, N))
+        n_s = float(specific_speed(N, Q / 3600, H))
+        if B <= 1.0:
+            entry = CorrectionFactors(B, 1.0, 1.0, n_s)
+        else:
+            entry = CorrectionFactors(B, float(correction_factor_flow(B)), float(correction_factor_efficiency(B)), n_s)
+
+        entries[key] = entry
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: hits, misses, evictions, current size, maxsize and hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        """
+        Removes every entry and resets the counters.
+        """
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
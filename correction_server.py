@@ -0,0 +1,305 @@
+"""
+Local HTTP/JSON service for the pump corrections and the pipeline calculation.
+
+Endpoints (POST a JSON object, get a JSON object back; keys are the arguments of the
+correction_service functions):
+
+    /forward   - correct_pump at the BEP: Q_BEP_water, H_total, N, eta_water, viscosity, specific_gravity
+    /inverse   - inverse_correction: Q_visc, H_visc, viscosity, specific_gravity, eta_water [, N]
+    /pipeline  - pressurized_flow: g, mu, rho, P_nominal, P_min, divisor, Q_m3h, D_inch, roughness
+
+GET /health answers {"status": "ok"} and GET /stats reports request and batch counters.
+
+Requests to the same endpoint that arrive together are micro-batched: they are queued, and
+one vectorized NumPy evaluation (correct_pump_batch, inverse_correction_batch,
+pressurized_flow_batch) answers all of them. By default a batch is closed at the next event
+loop pass, so a lone request is not delayed; --max-delay-ms trades latency for larger batches.
+If a batch fails, its cases are evaluated one by one so that only the offending request gets
+the error. Inputs must be finite numbers; NaN or infinite outputs are returned as null.
+
+    python correction_server.py [--host 127.0.0.1] [--port 8750] [--max-batch 1024] [--max-delay-ms 0]
+
+benchmarks/load_test.py measures latency and throughput against it. Measured with the load
+test on one machine (forward endpoint, client and server on the same host):
+
+    concurrent clients    throughput     p50        p99
+    1                     3,750 req/s    0.24 ms    0.48 ms
+    10                    6,900 req/s    1.15 ms    1.99 ms
+    100                   7,700 req/s    9.8 ms     14.8 ms
+
+The sub-millisecond target is met for a lone caller only. A batch of 54 cases evaluates in about
+0.24 ms, so the time goes to per-request HTTP and JSON handling in one Python process (about
+0.1 ms per request). With 100 callers waiting on each other, latency is concurrency/throughput.
+Sub-millisecond answers for hundreds of concurrent callers would need about ten times the
+throughput, e.g. several server processes behind a load balancer, which is not provided here.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+
+import numpy as np
+
+from correction_service import inverse_correction_batch, pressurized_flow_batch
+from pump_correction_tools import correct_pump_batch
+
+DEFAULT_PORT = 8750
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            500: "Internal Server Error"}
+
+
+def _forward(columns):
+    curves = correct_pump_batch(columns["Q_BEP_water"], columns["H_total"], columns["N"], columns["eta_water"],
+                                columns["viscosity"], columns["specific_gravity"], flow_ratios=[1.0])
+    out = {key: curves[key] for key in ("n_s", "B", "C_q", "C_eta", "valid_n_s", "valid_B", "valid_viscosity")}
+    for key in ("C_h", "Q_vis", "H_vis", "eta_vis", "P_vis"):
+        out[key] = curves[key][:, 0]
+    return out
+
+
+def _inverse(columns):
+    return inverse_correction_batch(columns["Q_visc"], columns["H_visc"], columns["viscosity"],
+                                    columns["specific_gravity"], columns["eta_water"], columns["N"])
+
+
+def _pipeline(columns):
+    # The batch-wide n_failed count means nothing to one request; 'converged' flags each case.
+    out = pressurized_flow_batch(**columns)
+    del out["n_failed"]
+    return out
+
+
+# Path: (required fields, optional fields with defaults, batch evaluation)
+ENDPOINTS = {
+    "/forward": (("Q_BEP_water", "H_total", "N", "eta_water", "viscosity", "specific_gravity"), {}, _forward),
+    "/inverse": (("Q_visc", "H_visc", "viscosity", "specific_gravity", "eta_water"), {"N": np.nan}, _inverse),
+    "/pipeline": (("g", "mu", "rho", "P_nominal", "P_min", "divisor", "Q_m3h", "D_inch", "roughness"), {},
+                  _pipeline),
+}
+
+
+class MicroBatcher:
+    """
+    Collects cases submitted by concurrent requests and evaluates them in one vectorized call.
+    """
+
+    def __init__(self, fields, defaults, evaluate, max_batch=1024, max_delay=0.0):
+        """
+        Parameters:
+            fields (tuple): Required case fields.
+            defaults (dict): Optional case fields and their default values.
+            evaluate (callable): Maps a dict of 1-D input arrays to a dict of output arrays.
+            max_batch (int): A batch is evaluated at once when it reaches this size.
+            max_delay (float): Seconds to keep a batch open after its first case; 0 closes it at
+                the next event loop pass.
+        """
+        self.names = tuple(fields) + tuple(defaults)
+        self.fields = fields
+        self.defaults = defaults
+        self.evaluate = evaluate
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.requests = 0
+        self.batches = 0
+        self._pending = []
+        self._timer = None
+
+    def validate(self, case):
+        """
+        Returns the case as a tuple of floats in self.names order.
+
+        Raises:
+            ValueError: If a required field is missing or a value is not a finite number.
+        """
+        if not isinstance(case, dict):
+            raise ValueError("Request body must be a JSON object.")
+        missing = [name for name in self.fields if name not in case]
+        if missing:
+            raise ValueError(f"Missing field(s): {', '.join(missing)}.")
+        try:
+            values = tuple(float(case[name]) for name in self.fields) + tuple(
+                float(case.get(name, default)) for name, default in self.defaults.items())
+        except (TypeError, ValueError):
+            raise ValueError("All fields must be numbers.") from None
+        # Defaults may be NaN (meaning "not given"), values sent by the client may not.
+        if not all(math.isfinite(value) for name, value in zip(self.names, values) if name in case):
+            raise ValueError("All fields must be finite numbers.")
+        return values
+
+    async def submit(self, values):
+        """
+        Queues one validated case and waits for its result.
+
+        Returns:
+            dict: Output values of the case as Python floats and bools (None for NaN or infinite).
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((values, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = (loop.call_later(self.max_delay, self._flush) if self.max_delay > 0
+                           else loop.call_soon(self._flush))
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        self.requests += len(pending)
+        self.batches += 1
+        try:
+            rows = self._evaluate([values for values, _ in pending])
+        except Exception as error:
+            if len(pending) == 1:
+                rows = [error]
+            else:
+                # One bad case must not fail its whole batch: retry every case on its own.
+                rows = []
+                for values, _ in pending:
+                    try:
+                        rows.extend(self._evaluate([values]))
+                    except Exception as case_error:
+                        rows.append(case_error)
+
+        for row, (_, future) in zip(rows, pending):
+            if future.done():
+                continue
+            if isinstance(row, Exception):
+                future.set_exception(row)
+            else:
+                future.set_result(row)
+
+    def _evaluate(self, cases):
+        # One vectorized call; returns one output dict per case, NaN and inf mapped to None.
+        table = np.array(cases, dtype=float)
+        outputs = self.evaluate({name: table[:, i] for i, name in enumerate(self.names)})
+        columns = {key: np.asarray(value).tolist() for key, value in outputs.items()}
+        keys = list(columns)
+        return [{key: None if isinstance(value, float) and not math.isfinite(value) else value
+                 for key, value in zip(keys, row)} for row in zip(*columns.values())]
+
+
+class CorrectionServer:
+    """
+    asyncio HTTP/1.1 server (keep-alive, JSON bodies) with one MicroBatcher per endpoint.
+    """
+
+    def __init__(self, max_batch=1024, max_delay=0.0):
+        self.batchers = {path: MicroBatcher(fields, defaults, evaluate, max_batch, max_delay)
+                         for path, (fields, defaults, evaluate) in ENDPOINTS.items()}
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """
+        Starts listening.
+
+        Returns:
+            asyncio.Server: The listening server; port=0 picks a free port (see server.sockets).
+        """
+        return await asyncio.start_server(self._handle, host, port)
+
+    def stats(self):
+        """
+        Returns the request and batch counters per endpoint.
+
+        Returns:
+            dict: {path: {'requests', 'batches', 'mean_batch_size'}}.
+        """
+        return {path: {"requests": b.requests, "batches": b.batches,
+                       "mean_batch_size": b.requests / b.batches if b.batches else 0.0}
+                for path, b in self.batchers.items()}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                method, path, version = (lines[0].split(" ") + ["", "", ""])[:3]
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() != "HTTP/1.0")
+                length = headers.get("content-length", "0") or "0"
+                if length.isdigit():
+                    body = await reader.readexactly(int(length))
+                    status, payload = await self._respond(method, path, body)
+                else:
+                    # The body cannot be delimited, so answer and close the connection.
+                    status, payload = 400, {"error": f"Invalid Content-Length header {length!r}."}
+                    keep_alive = False
+                data = json.dumps(payload, allow_nan=False).encode()
+                writer.write(f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, method, path, body):
+        if method == "GET":
+            if path == "/health":
+                return 200, {"status": "ok"}
+            if path == "/stats":
+                return 200, self.stats()
+            return 404, {"error": f"Unknown path {path}."}
+
+        batcher = self.batchers.get(path)
+        if batcher is None:
+            return 404, {"error": f"Unknown path {path}."}
+        if method != "POST":
+            return 405, {"error": "Use POST."}
+
+        try:
+            values = batcher.validate(json.loads(body or b"null"))
+        except ValueError as error:
+            return 400, {"error": str(error)}
+        try:
+            return 200, await batcher.submit(values)
+        except Exception as error:
+            return 500, {"error": str(error)}
+
+
+async def serve(host="127.0.0.1", port=DEFAULT_PORT, max_batch=1024, max_delay=0.0):
+    """
+    Runs a CorrectionServer until cancelled.
+    """
+    server = await CorrectionServer(max_batch, max_delay).start(host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch", type=int, default=1024, help="Largest micro-batch.")
+    parser.add_argument("--max-delay-ms", type=float, default=0.0,
+                        help="How long a micro-batch waits for more requests (default: next loop pass).")
+    args = parser.parse_args(argv)
+
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch, args.max_delay_ms / 1000))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""
+Headless compute layer for the three applications.
+
+Each application's calculation is available as a pure function that takes plain numbers and
+returns a result object, without importing tkinter or matplotlib:
+
+    correct_pump           - app_01_pump_correction (water -> viscous, ANSI/HI 9.6.7 Example 1)
+    inverse_correction     - app_02_pump_correction (viscous -> water, ANSI/HI 9.6.7 Example 2)
+    pressurized_flow       - app_03_pressurized_flow (pipeline flow and allowable length)
+
+inverse_correction_batch and pressurized_flow_batch are the array versions of
+inverse_correction and pressurized_flow, used by sweeps and by correction_server.
+
+Cases can also be run from the command line, one JSON object per line:
+
+    python correction_service.py app_01 < cases.jsonl > results.jsonl
+
+where each input line holds the keyword arguments of the corresponding function. With
+--cache DIR, results of cases already run are read from a result_cache.ResultCache. With
+--factor-cache N, app_01 cases share a correction_cache.CorrectionCache of N entries for B, C_q,
+C_eta and n_s, whose counters are written to stderr at the end.
+"""
+
+import argparse
+import functools
+import json
+import sys
+from dataclasses import dataclass, field, fields
+
+import numpy as np
+
+from correction_cache import CorrectionCache
+from flow_resistance import reynolds_number, friction_factor, friction_factor_array, pressure_drop
+from pump_correction_tools import (
+    correct_pump_batch,
+    B_from_viscous_operation,
+    inverse_correction_factor_flow,
+    inverse_correction_factor_head,
+    inverse_correction_factor_efficiency,
+    equivalent_water_flow,
+    equivalent_water_head,
+    equivalent_water_efficiency,
+    inverse_power,
+    solve_water_equivalent,
+    water_curve
+)
+
+
+@dataclass
+class PumpCorrectionResult:
+    """
+    Corrected pump curves for one pump and fluid (app_01_pump_correction).
+
+    Curves are arrays over the flow-ratio grid, with Q_water as the abscissa.
+    """
+    n_s: float
+    B: float
+    C_q: float
+    C_eta: float
+    Q_water: np.ndarray
+    H_water: np.ndarray
+    eta_water: np.ndarray
+    P_water: np.ndarray
+    Q_vis: np.ndarray
+    H_vis: np.ndarray
+    eta_vis: np.ndarray
+    P_vis: np.ndarray
+    warnings: list = field(default_factory=list)
+
+    @property
+    def valid(self):
+        return not self.warnings
+
+
+@dataclass
+class InverseCorrectionResult:
+    """
+    Equivalent water performance for a viscous operating point (app_02_pump_correction).
+    """
+    B: float
+    C_q: float
+    C_h: float
+    C_eta: float
+    Q_water: float
+    H_water: float
+    eta_vis: float
+    P_vis: float
+    warnings: list = field(default_factory=list)
+
+    @property
+    def valid(self):
+        return not self.warnings
+
+
+@dataclass
+class PipelineFlowResult:
+    """
+    Flow in a pressurized pipeline and its allowable length (app_03_pressurized_flow).
+    """
+    D_m: float
+    velocity: float
+    mass_flow: float
+    Re: float
+    f: float
+    head_loss_per_meter: float
+    length: float
+    manometric_head: float
+    warnings: list = field(default_factory=list)
+
+    @property
+    def valid(self):
+        return not self.warnings
+
+
+def correct_pump(Q_BEP_water, H_total, N, eta_water, viscosity, specific_gravity, flow_ratios=None,
+                 curve_Q=None, curve_H=None, curve_eta=None, curve_degree=None, factor_cache=None):
+    """
+    Corrects a water pump curve for a viscous fluid (ANSI/HI 9.6.7 Example 1).
+
+    Parameters:
+        Q_BEP_water (float): Flow rate at BEP with water [m³/h].
+        H_total (float): Head at BEP with water [m].
+        N (float): Pump speed [rpm].
+        eta_water (float): Efficiency with water [decimal].
+        viscosity (float): Kinematic viscosity [cSt].
+        specific_gravity (float): Specific gravity [-].
+        flow_ratios (array_like, optional): Q/Q_BEP grid. Defaults to 0.2 to 1.5 in steps of 0.1.
+        curve_Q (array_like, optional): Flow rates of vendor water curve points [m³/h].
+        curve_H (array_like, optional): Water head at curve_Q [m]. Without it the head is
+            taken as constant at H_total.
+        curve_eta (array_like, optional): Water efficiency at curve_Q [decimal]. Without it the
+            efficiency is taken as constant at eta_water.
+        curve_degree (int, optional): Fit a polynomial of this degree to the curve points
+            instead of interpolating them linearly (see pump_correction_tools.water_curve).
+        factor_cache (correction_cache.CorrectionCache, optional): Look B, C_q, C_eta and n_s up
+            there instead of computing them; inputs are quantized to the cache's resolution.
+
+    Returns:
+        PumpCorrectionResult: Corrected curves. Out-of-range n_s, viscosity or B are reported
+        in warnings, in the order the GUI checks them.
+    """
+    if flow_ratios is None:
+        flow_ratios = np.arange(0.2, 1.6, 0.1)
+    Q_grid = Q_BEP_water * np.asarray(flow_ratios, dtype=float)
+    H_water_curve = eta_water_curve = None
+    if curve_H is not None:
+        H_water_curve = water_curve(curve_Q, curve_H, Q_grid, curve_degree)
+    if curve_eta is not None:
+        eta_water_curve = water_curve(curve_Q, curve_eta, Q_grid, curve_degree)
+
+    factors = None if factor_cache is None else factor_cache.factors(viscosity, Q_BEP_water, H_total, N)
+
+    curves = correct_pump_batch(Q_BEP_water, H_total, N, eta_water, viscosity, specific_gravity,
+                                flow_ratios=flow_ratios, H_water_curve=H_water_curve,
+                                eta_water_curve=eta_water_curve, factors=factors)
+    n_s = float(curves["n_s"])
+    B = float(curves["B"])
+
+    warnings = []
+    if not curves["valid_n_s"]:
+        warnings.append(f"Specific speed is out of valid range (<60). n_s = {n_s:.2f}")
+    if not curves["valid_viscosity"]:
+        warnings.append("Viscosity is out of valid range (1 to 4000 cSt).")
+    if not curves["valid_B"]:
+        warnings.append(f"B parameter is out of valid range (<40). B = {B:.2f}")
+
+    return PumpCorrectionResult(
+        n_s=n_s, B=B, C_q=float(curves["C_q"]), C_eta=float(curves["C_eta"]),
+        Q_water=curves["Q_water"], H_water=curves["H_water"], eta_water=curves["eta_water"],
+        P_water=curves["P_water"], Q_vis=curves["Q_vis"], H_vis=curves["H_vis"],
+        eta_vis=curves["eta_vis"], P_vis=curves["P_vis"], warnings=warnings,
+    )
+
+
+def inverse_correction(Q_visc, H_visc, viscosity, specific_gravity, eta_water, N=None):
+    """
+    Computes the equivalent water performance of a viscous operating point (ANSI/HI 9.6.7 Example 2).
+
+    Parameters:
+        Q_visc (float): Flow rate with viscous fluid [m³/h].
+        H_visc (float): Head with viscous fluid [m].
+        viscosity (float): Kinematic viscosity [cSt].
+        specific_gravity (float): Specific gravity [-].
+        eta_water (float): Efficiency with water [decimal].
+        N (float, optional): Pump speed [rpm]. When given, B is solved so that the forward
+            correction of the water-equivalent point reproduces the viscous point
+            (solve_water_equivalent); otherwise the standard estimate B_from_viscous_operation is used.
+
+    Returns:
+        InverseCorrectionResult: Equivalent water performance. Out-of-range B or viscosity are
+        reported in warnings, in the order the GUI checks them.
+    """
+    if N is None:
+        B = float(B_from_viscous_operation(nu_vis_cSt=viscosity, Q_vis=Q_visc, H_vis=H_visc))
+    else:
+        B = float(solve_water_equivalent(Q_visc, H_visc, viscosity, N)["B"])
+
+    warnings = []
+    if B >= 40:
+        warnings.append(f"Parameter B out of valid range (<40). B = {B:.2f}")
+    if not (1 <= viscosity <= 4000):
+        warnings.append("Viscosity out of allowed range (1 to 4000 cSt).")
+
+    if B <= 1.0:
+        C_q = C_h = C_eta = 1.0
+    else:
+        C_q = float(inverse_correction_factor_flow(B))
+        C_h = float(inverse_correction_factor_head(B))
+        C_eta = float(inverse_correction_factor_efficiency(B))
+
+    Q_water = equivalent_water_flow(C_q, Q_visc)
+    H_water = equivalent_water_head(C_h, H_visc)
+    eta_vis = equivalent_water_efficiency(C_eta, eta_water)
+    P_vis = inverse_power(Q_visc, H_vis_total=H_visc, rho=specific_gravity, eta_vis=eta_vis)
+
+    return InverseCorrectionResult(B=B, C_q=C_q, C_h=C_h, C_eta=C_eta, Q_water=Q_water, H_water=H_water,
+                                   eta_vis=eta_vis, P_vis=P_vis, warnings=warnings)
+
+
+def inverse_correction_batch(Q_visc, H_visc, viscosity, specific_gravity, eta_water, N=None):
+    """
+    Array version of inverse_correction. All inputs broadcast against each other.
+
+    Parameters:
+        Same as inverse_correction, as arrays. Elements of N that are NaN use the standard
+        estimate B_from_viscous_operation, like N=None does for the scalar version.
+
+    Returns:
+        dict: 'B', 'C_q', 'C_h', 'C_eta', 'Q_water', 'H_water', 'eta_vis' and 'P_vis' arrays,
+        plus the 'valid_B' (B < 40) and 'valid_viscosity' (1 to 4000 cSt) masks.
+    """
+    if N is None:
+        N = np.nan
+    Q_visc, H_visc, viscosity, specific_gravity, eta_water, N = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (Q_visc, H_visc, viscosity, specific_gravity, eta_water, N)))
+
+    B = np.array(B_from_viscous_operation(nu_vis_cSt=viscosity, Q_vis=Q_visc, H_vis=H_visc), dtype=float)
+    known_speed = ~np.isnan(N)
+    if known_speed.any():
+        B[known_speed] = solve_water_equivalent(Q_visc[known_speed], H_visc[known_speed], viscosity[known_speed],
+                                                N[known_speed])["B"]
+
+    B_eff = np.maximum(B, 1.0)
+    C_q = inverse_correction_factor_flow(B_eff)
+    C_h = inverse_correction_factor_head(B_eff)
+    C_eta = inverse_correction_factor_efficiency(B_eff)
+    eta_vis = equivalent_water_efficiency(C_eta, eta_water)
+
+    return {
+        "B": B,
+        "C_q": C_q,
+        "C_h": C_h,
+        "C_eta": C_eta,
+        "Q_water": equivalent_water_flow(C_q, Q_visc),
+        "H_water": equivalent_water_head(C_h, H_visc),
+        "eta_vis": eta_vis,
+        "P_vis": inverse_power(Q_visc, H_vis_total=H_visc, rho=specific_gravity, eta_vis=eta_vis),
+        "valid_B": B < 40,
+        "valid_viscosity": (viscosity >= 1) & (viscosity <= 4000),
+    }
+
+
+def pressurized_flow(g, mu, rho, P_nominal, P_min, divisor, Q_m3h, D_inch, roughness):
+    """
+    Computes the flow in a pressurized pipeline and the length that consumes the allowed pressure drop.
+
+    Parameters:
+        g (float): Gravity [m/s²].
+        mu (float): Dynamic viscosity [Pa·s].
+        rho (float): Density [kg/m³].
+        P_nominal (float): Nominal pressure [Pa].
+        P_min (float): Minimum pressure [Pa].
+        divisor (float): Pressure drop divisor coefficient [-].
+        Q_m3h (float): Volumetric flow rate [m³/h].
+        D_inch (float): Internal diameter [inch].
+        roughness (float): Absolute roughness [m].
+
+    Returns:
+        PipelineFlowResult: Reynolds number, friction factor, losses and allowable length.
+    """
+    Q_m3s = Q_m3h / 3600
+    D_m = D_inch * 2.54 / 100
+    A = np.pi * (D_m / 2) ** 2
+    velocity = Q_m3s / A
+    mass_flow = Q_m3s * rho
+
+    Re = reynolds_number(rho=rho, u=velocity, D=D_m, mu=mu)
+    f = friction_factor(Re=Re, D=D_m, epsilon=roughness, f_init=0.02, tol=1e-6, max_iter=100)
+    delta_P_max = P_nominal - P_min
+    head_loss_per_meter = pressure_drop(L=1, D=D_m, u=velocity, f=f, rho=rho)
+    length = (delta_P_max / divisor) / head_loss_per_meter
+    manometric_head = (delta_P_max / divisor) / (rho * g)
+
+    return PipelineFlowResult(D_m=D_m, velocity=velocity, mass_flow=mass_flow, Re=Re, f=f,
+                              head_loss_per_meter=head_loss_per_meter, length=length,
+                              manometric_head=manometric_head)
+
+
+def pressurized_flow_batch(g, mu, rho, P_nominal, P_min, divisor, Q_m3h, D_inch, roughness):
+    """
+    Array version of pressurized_flow. All inputs broadcast against each other.
+
+    Parameters:
+        Same as pressurized_flow, as arrays.
+
+    Returns:
+        dict: 'D_m', 'velocity', 'mass_flow', 'Re', 'f', 'head_loss_per_meter', 'length' and
+        'manometric_head' arrays, 'converged' (False where the friction factor did not converge
+        and keeps its last iterate) and 'n_failed', the number of those elements.
+    """
+    g, mu, rho, P_nominal, P_min, divisor, Q_m3h, D_inch, roughness = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (g, mu, rho, P_nominal, P_min, divisor, Q_m3h, D_inch, roughness)))
+
+    Q_m3s = Q_m3h / 3600
+    D_m = D_inch * 2.54 / 100
+    A = np.pi * (D_m / 2) ** 2
+    velocity = Q_m3s / A
+    mass_flow = Q_m3s * rho
+
+    Re = reynolds_number(rho=rho, u=velocity, D=D_m, mu=mu)
+    f, n_failed, converged = friction_factor_array(Re=Re, D=D_m, epsilon=roughness, f_init=0.02, tol=1e-6,
+                                                   max_iter=100, return_converged=True)
+    delta_P_max = P_nominal - P_min
+    head_loss_per_meter = pressure_drop(L=1, D=D_m, u=velocity, f=f, rho=rho)
+
+    return {
+        "D_m": D_m,
+        "velocity": velocity,
+        "mass_flow": mass_flow,
+        "Re": Re,
+        "f": f,
+        "head_loss_per_meter": head_loss_per_meter,
+        "length": (delta_P_max / divisor) / head_loss_per_meter,
+        "manometric_head": (delta_P_max / divisor) / (rho * g),
+        "converged": converged,
+        "n_failed": n_failed,
+    }
+
+
+APPS = {
+    "app_01": correct_pump,
+    "app_02": inverse_correction,
+    "app_03": pressurized_flow,
+}
+
+
+def result_to_dict(result):
+    """
+    Converts a result object to JSON-serializable built-in types.
+
+    Parameters:
+        result: PumpCorrectionResult, InverseCorrectionResult or PipelineFlowResult.
+
+    Returns:
+        dict: Field values, with arrays converted to lists.
+    """
+    out = {}
+    for item in fields(result):
+        value = getattr(result, item.name)
+        out[item.name] = value.tolist() if isinstance(value, np.ndarray) else (
+            float(value) if isinstance(value, np.floating) else value)
+    return out
+
+
+def run_cases(app, cases, cache=None, factor_cache=None):
+    """
+    Runs a sequence of cases through one application's compute function.
+
+    Parameters:
+        app (str): 'app_01', 'app_02' or 'app_03'.
+        cases (iterable of dict): Keyword arguments of the compute function.
+        cache (result_cache.ResultCache, optional): Reuse results of identical cases stored there.
+        factor_cache (correction_cache.CorrectionCache, optional): Passed to correct_pump for
+            app_01 cases; ignored by the other applications.
+
+    Yields:
+        Result objects, one per case.
+    """
+    compute = APPS[app]
+    if factor_cache is not None and compute is correct_pump:
+        # update_wrapper keeps the name the result cache keys on.
+        compute = functools.update_wrapper(functools.partial(compute, factor_cache=factor_cache), compute)
+    for case in cases:
+        yield compute(**case) if cache is None else cache.call(compute, **case)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run pump correction and pipeline cases without a GUI.")
+    parser.add_argument("app", choices=sorted(APPS), help="Which application's calculation to run.")
+    parser.add_argument("input", nargs="?", help="JSON lines file with one case per line (default: stdin).")
+    parser.add_argument("--cache", metavar="DIR", help="Reuse results of identical cases from this cache directory.")
+    parser.add_argument("--factor-cache", metavar="N", type=int,
+                        help="Memoize the app_01 correction factors in an LRU cache of N entries.")
+    args = parser.parse_args(argv)
+
+    cache = None
+    if args.cache:
+        from result_cache import ResultCache  # result_cache imports this module
+        cache = ResultCache(args.cache)
+    factor_cache = CorrectionCache(maxsize=args.factor_cache) if args.factor_cache else None
+
+    source = open(args.input) if args.input else sys.stdin
+    try:
+        cases = (json.loads(line) for line in source if line.strip())
+        for result in run_cases(args.app, cases, cache, factor_cache):
+            sys.stdout.write(json.dumps(result_to_dict(result)) + "\n")
+    finally:
+        if args.input:
+            source.close()
+    if factor_cache is not None:
+        sys.stderr.write(json.dumps(factor_cache.stats()) + "\n")
+
+
+if __name__ == "__main__":
+    main()
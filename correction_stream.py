@@ -0,0 +1,111 @@
+"""
+Streaming correction of live (or replayed historian) samples for one pump and its pipeline.
+
+correct_stream consumes an iterator of (timestamp, viscosity, flow) samples and yields, for
+each one, the corrected pump head, efficiency and power (ANSI/HI 9.6.7, pump_correction_tools)
+and the pipe friction loss (Darcy-Weisbach, flow_resistance). The work is incremental:
+
+    - The correction factors B, C_q and C_eta are recomputed only when the viscosity has moved
+      by more than viscosity_tol (relative) from the value they were computed for.
+    - The friction factor is solved with flow_resistance.friction_factor (so the selected
+      backend and any installed metrics sink apply), warm-started from the previous sample's
+      friction factor, so a slowly varying flow converges in one or two passes.
+
+The per-sample pump path uses the math module on Python floats, which is much faster than
+NumPy for one value at a time. Example:
+
+    for out in correct_stream(samples, Q_BEP_water_m3h=300, H_BEP_water_m=80, N_rpm=2950,
+                              eta_water=0.75, specific_gravity=0.9, L_m=2000, D_m=0.2,
+                              roughness_m=4.5e-5):
+        print(out.timestamp, out.H_vis, out.P_vis, out.head_loss)
+"""
+
+import math
+from collections import namedtuple
+
+from flow_resistance import reynolds_number, pressure_drop, friction_factor
+from pump_correction_tools import B_from_water_conditions, correction_factor_flow, correction_factor_efficiency
+
+StreamResult = namedtuple("StreamResult", [
+    "timestamp", "viscosity", "Q_vis", "H_vis", "eta_vis", "P_vis", "B", "Re", "f", "head_loss", "recomputed",
+])
+
+
+def correct_stream(samples, Q_BEP_water_m3h, H_BEP_water_m, N_rpm, eta_water, specific_gravity,
+                   L_m, D_m, roughness_m, shutoff_ratio=1.25, viscosity_tol=0.01,
+                   temperature_to_viscosity=None, g=9.81, tol=1e-6, max_iter=100, friction_method="fixed_point"):
+    """
+    Corrects a stream of operating samples for one pump and pipeline.
+
+    The water head curve is the parabola through the shutoff head (shutoff_ratio * H_BEP) and
+    the BEP, as in operating_point.solve_operating_point, and the water efficiency is constant.
+
+    Parameters:
+        samples (iterable): (timestamp, viscosity [cSt], flow [m³/h]) tuples; the second item is
+            a temperature when temperature_to_viscosity is given. The flow is the measured
+            (viscous) flow rate.
+        Q_BEP_water_m3h (float): Flow rate at BEP with water [m³/h].
+        H_BEP_water_m (float): Head at BEP with water [m].
+        N_rpm (float): Pump speed [rpm].
+        eta_water (float): Efficiency with water [decimal].
+        specific_gravity (float): Specific gravity [-].
+        L_m (float): Pipe length [m].
+        D_m (float): Pipe internal diameter [m].
+        roughness_m (float): Absolute roughness [m].
+        shutoff_ratio (float): Shutoff head over BEP head of the water curve [-].
+        viscosity_tol (float): Relative viscosity change that triggers new correction factors.
+        temperature_to_viscosity (callable, optional): Maps the sample temperature to kinematic
+            viscosity [cSt].
+        g (float): Gravity [m/s²].
+        tol (float): Convergence tolerance of the friction factor.
+        max_iter (int): Maximum friction factor iterations per sample.
+        friction_method (str): Turbulent friction factor backend, see flow_resistance.friction_factor.
+
+    Yields:
+        StreamResult: timestamp, viscosity [cSt], Q_vis [m³/h], H_vis [m], eta_vis [decimal],
+        P_vis [kW], B, Re, f, head_loss [m] and recomputed (True when the correction factors
+        were recomputed for this sample).
+
+    Raises:
+        ValueError: If friction_method is unknown.
+        RuntimeError: If the friction factor does not converge within max_iter.
+    """
+    H_shutoff = shutoff_ratio * H_BEP_water_m
+    K = (H_shutoff - H_BEP_water_m) / Q_BEP_water_m3h ** 2
+    area = math.pi * (D_m / 2) ** 2
+    rho = 1000.0 * specific_gravity
+    power_scale = specific_gravity / 367
+
+    nu_low = nu_high = 0.0
+    B = C_q = eta_vis = head_scale = 1.0
+    f = 0.02
+
+    for timestamp, value, Q_vis in samples:
+        nu = temperature_to_viscosity(value) if temperature_to_viscosity is not None else value
+
+        recomputed = not (nu_low <= nu <= nu_high)
+        if recomputed:
+            nu_low, nu_high = nu * (1 - viscosity_tol), nu * (1 + viscosity_tol)
+            B = float(B_from_water_conditions(nu, Q_BEP_water_m3h, H_BEP_water_m, N_rpm))
+            B_eff = max(B, 1.0)
+            C_q = float(correction_factor_flow(B_eff))
+            eta_vis = float(correction_factor_efficiency(B_eff)) * eta_water
+            head_scale = (1 - C_q) / Q_BEP_water_m3h ** 0.75
+
+        # Pump: Q_water = Q_vis / C_q, H_vis = C_h(Q_water) * H_water(Q_water).
+        Q_water = Q_vis / C_q
+        H_vis = (1 - head_scale * abs(Q_water) ** 0.75) * (H_shutoff - K * Q_water * abs(Q_water))
+        P_vis = Q_vis * H_vis * power_scale / eta_vis
+
+        # Pipe: warm-started from the previous sample's (turbulent) friction factor. Friction
+        # always uses the sample's viscosity.
+        u = Q_vis / 3600 / area
+        Re = abs(reynolds_number(rho=rho, u=u, D=D_m, mu=nu * 1e-6 * rho))
+        if Re > 0:
+            f = float(friction_factor(Re, D_m, roughness_m, f_init=f if f < 1 else 0.02, tol=tol, max_iter=max_iter,
+                                      method=friction_method))
+        else:
+            f = math.inf
+        head_loss = math.copysign(pressure_drop(L=L_m, D=D_m, u=u, f=f, rho=rho), u) / (rho * g) if u else 0.0
+
+        yield StreamResult(timestamp, nu, Q_vis, H_vis, eta_vis, P_vis, B, Re, f, head_loss, recomputed)
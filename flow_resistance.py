@@ -1,5 +1,45 @@
+import itertools
+import logging
+import time
+
 import numpy as np
 
+FRICTION_METHODS = ("fixed_point", "swamee_jain", "haaland", "serghides", "newton", "lambert_w")
+
+# Reynolds number above which the flow counts as fully turbulent in the regime metrics; between
+# 2300 and this value it counts as transition (the turbulent formula is still used).
+TURBULENT_RE = 4000
+
+logger = logging.getLogger(__name__)
+
+# Optional metrics sink, see set_metrics_sink. None disables instrumentation.
+_metrics = None
+
+
+def set_metrics_sink(sink):
+    """
+    Installs a metrics sink for friction_factor and friction_factor_array.
+
+    The sink receives counters through sink.increment(name, n) and samples through
+    sink.observe(name, values), where values is a float or an array of floats. Names used:
+
+        friction_factor.calls, friction_factor.laminar / .transition / .turbulent (hit counts),
+        friction_factor.failures (not converged), friction_factor.iterations,
+        friction_factor.residual (|Colebrook-White residual| in 1/sqrt(f)), friction_factor.seconds
+
+    metrics.MetricsRecorder is an in-memory sink. With no sink installed (the default) the
+    solvers do no extra work.
+
+    Parameters:
+        sink: Object with increment and observe methods, or None to disable.
+
+    Returns:
+        The previously installed sink.
+    """
+    global _metrics
+    previous, _metrics = _metrics, sink
+    return previous
+
 def reynolds_number(rho, u, D, mu):
     """
     Calculates the Reynolds number for internal flow.
@@ -16,7 +56,7 @@ def reynolds_number(rho, u, D, mu):
     return (rho * u * D) / mu
 
 
-def friction_factor(Re, D, epsilon, f_init=0.02, tol=1e-6, max_iter=100):
+def friction_factor(Re, D, epsilon, f_init=0.02, tol=1e-6, max_iter=100, method="fixed_point"):
     """
     Solves the implicit Colebrook-White equation for the Darcy-Weisbach friction factor.
 
@@ -27,29 +67,303 @@ def friction_factor(Re, D, epsilon, f_init=0.02, tol=1e-6, max_iter=100):
         f_init (float): Initial guess for f
         tol (float): Convergence tolerance
         max_iter (int): Maximum iterations
+        method (str): Turbulent backend, one of FRICTION_METHODS:
+            'fixed_point' - fixed-point iteration on Colebrook-White (reference)
+            'swamee_jain', 'haaland', 'serghides' - explicit approximations
+            'newton' - Newton iteration on 1/sqrt(f), started from Swamee-Jain
+            'lambert_w' - exact closed form in terms of the Lambert W function
 
     Returns:
         float: Darcy-Weisbach friction factor
 
     Raises:
+        ValueError: If method is unknown
         RuntimeError: If solution does not converge within max_iter
     """
-    if Re > 2300:
-        f = f_init
-        for _ in range(max_iter):
-            lhs = 1.0 / np.sqrt(f)
-            rhs = -2.0 * np.log10((epsilon / (3.7 * D)) + (2.51 / (Re * np.sqrt(f))))
+    if method not in FRICTION_METHODS:
+        raise ValueError(f"Unknown friction factor method '{method}'. Choose one of {FRICTION_METHODS}.")
+
+    sink = _metrics
+    if sink is not None:
+        start = time.perf_counter()
+
+    n_iter = None
+    if Re <= 2300:
+        f = 64 / Re
+        logger.debug("Laminar flow friction factor: %.5f", f)
+        converged = True
+    elif method == "fixed_point":
+        f, n_iter, converged = _colebrook_fixed_point(Re, epsilon / (3.7 * D), f_init, tol, max_iter)
+    else:
+        f, failed = _turbulent_friction_factor(np.array([Re], dtype=float), np.array([epsilon / D], dtype=float),
+                                               method, tol, max_iter)
+        f = float(f[0])
+        converged = not failed.any()
+
+    if sink is not None:
+        _record(sink, np.array([Re], dtype=float), np.array([epsilon / D], dtype=float), np.array([f]),
+                None if n_iter is None else np.array([n_iter]), 0 if converged else 1, time.perf_counter() - start)
+
+    if not converged:
+        raise RuntimeError("Friction factor did not converge within the maximum number of iterations.")
+    return f
+
+
+def _colebrook_fixed_point(Re, a, f_init, tol, max_iter):
+    """
+    Fixed-point iteration on the Colebrook-White equation for one turbulent Reynolds number.
+
+    Parameters:
+        Re (float): Reynolds number (turbulent)
+        a (float): epsilon / (3.7 D)
+        f_init (float): Initial guess for f
+        tol (float): Convergence tolerance on f
+        max_iter (int): Maximum iterations
+
+    Returns:
+        tuple: (f, number of iterations, converged)
+    """
+    f = f_init
+    for n_iter in range(1, max_iter + 1):
+        rhs = -2.0 * np.log10(a + (2.51 / (Re * np.sqrt(f))))
+        f_new = 1.0 / (rhs ** 2)
+
+        if abs(f - f_new) < tol:
+            return f_new, n_iter, True
+        f = f_new
+    return f, max_iter, False
+
+
+def friction_factor_path(Re, rel_roughness, f_init=0.02, tol=1e-6, max_iter=100, predictor=True):
+    """
+    Solves Colebrook-White along an ordered path of (Re, epsilon/D) points by continuation.
+
+    Each turbulent point is iterated with the fixed-point scheme of friction_factor, seeded
+    from the previous turbulent solution instead of f_init. With predictor=True the seed is
+    moved along the tangent of the Colebrook-White curve (a first-order Euler step in Re and
+    epsilon/D), which usually leaves one or two iterations per point on a smooth sweep.
+    Laminar points (Re <= 2300) take f = 64/Re and do not reset the continuation.
+
+    Parameters:
+        Re (iterable): Reynolds numbers, in path order
+        rel_roughness (iterable or float): Relative roughness epsilon/D per point, or one value
+            for the whole path
+        f_init (float): Initial guess for the first turbulent point
+        tol (float): Convergence tolerance
+        max_iter (int): Maximum iterations per point
+        predictor (bool): Use the tangent predictor for the seed
+
+    Yields:
+        tuple: (f, number of iterations) per point (0 iterations for laminar points)
+
+    Raises:
+        RuntimeError: If a point does not converge within max_iter
+    """
+    if np.ndim(rel_roughness) == 0:
+        rel_roughness = itertools.repeat(float(rel_roughness))
+
+    c = 2.0 / np.log(10.0)
+    previous = None  # (Re, a, f) of the last turbulent solution
+    for Re_i, rel_i in zip(Re, rel_roughness):
+        sink = _metrics
+        if sink is not None:
+            start = time.perf_counter()
+
+        if Re_i <= 2300:
+            f, n_iter, converged = 64 / Re_i, None, True
+        else:
+            a = rel_i / 3.7
+            if previous is None:
+                seed = f_init
+            else:
+                Re_0, a_0, f_0 = previous
+                seed = f_0
+                if predictor:
+                    # Tangent of G(x) = x + 2 log10(a + b x) = 0, x = 1/sqrt(f), b = 2.51/Re.
+                    x = 1.0 / np.sqrt(f_0)
+                    b = 2.51 / Re_0
+                    y = a_0 + b * x
+                    dx = -(c * (a - a_0) - c * b * x * (Re_i - Re_0) / Re_0) / (y * (1.0 + c * b / y))
+                    if x + dx > 0:
+                        seed = 1.0 / (x + dx) ** 2
+            f, n_iter, converged = _colebrook_fixed_point(Re_i, a, seed, tol, max_iter)
+            previous = (Re_i, a, f)
+
+        if sink is not None:
+            _record(sink, np.array([Re_i], dtype=float), np.array([rel_i], dtype=float), np.array([f]),
+                    None if n_iter is None else np.array([n_iter]), 0 if converged else 1,
+                    time.perf_counter() - start)
+        if not converged:
+            raise RuntimeError("Friction factor did not converge within the maximum number of iterations.")
+        yield f, n_iter or 0
+
+
+def _record(sink, Re, rel_roughness, f, iterations, n_failed, seconds):
+    # Reports one solver call to the metrics sink. f and iterations are per element;
+    # iterations is None for backends that are not iterated here.
+    laminar = Re <= 2300
+    turbulent = Re >= TURBULENT_RE
+    n_laminar = int(np.count_nonzero(laminar))
+    n_turbulent = int(np.count_nonzero(turbulent))
+
+    sink.increment("friction_factor.calls", 1)
+    sink.increment("friction_factor.laminar", n_laminar)
+    sink.increment("friction_factor.transition", Re.size - n_laminar - n_turbulent)
+    sink.increment("friction_factor.turbulent", n_turbulent)
+    sink.increment("friction_factor.failures", int(n_failed))
+
+    active = ~laminar
+    if active.any():
+        f_act = f[active]
+        x = 1.0 / np.sqrt(f_act)
+        residual = np.abs(x + 2.0 * np.log10(rel_roughness[active] / 3.7 + 2.51 * x / Re[active]))
+        if iterations is not None:
+            sink.observe("friction_factor.iterations", iterations[active])
+        sink.observe("friction_factor.residual", residual)
+    sink.observe("friction_factor.seconds", seconds)
+
+
+def friction_factor_array(Re, D, epsilon, f_init=0.02, tol=1e-6, max_iter=100, method="fixed_point",
+                          return_converged=False):
+    """
+    Solves the Colebrook-White equation element-wise for arrays of any shape.
+
+    Laminar elements (Re <= 2300) take f = 64/Re and turbulent elements are iterated with the
+    same fixed-point scheme as friction_factor. Each element leaves the iteration as soon as it
+    converges, so only the unresolved elements are recomputed on later passes.
+
+    Parameters:
+        Re (array_like): Reynolds number
+        D (array_like): Pipe diameter [m]
+        epsilon (array_like): Absolute roughness [m]
+        f_init (float): Initial guess for f
+        tol (float): Convergence tolerance
+        max_iter (int): Maximum iterations
+        method (str): Turbulent backend, see friction_factor
+        return_converged (bool): Also return the per-element convergence mask
+
+    Returns:
+        tuple: (f, n_failed) where f is the Darcy-Weisbach friction factor array with the
+        broadcast shape of the inputs and n_failed is the number of turbulent elements that did
+        not converge within max_iter (those keep their last iterate). With return_converged,
+        (f, n_failed, converged) where converged is a boolean array shaped like f.
+
+    Raises:
+        ValueError: If method is unknown
+    """
+    if method not in FRICTION_METHODS:
+        raise ValueError(f"Unknown friction factor method '{method}'. Choose one of {FRICTION_METHODS}.")
+
+    sink = _metrics
+    if sink is not None:
+        start = time.perf_counter()
+
+    Re, D, epsilon = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (Re, D, epsilon)))
+    f = np.empty(Re.shape)
+
+    laminar = Re <= 2300
+    f[laminar] = 64 / Re[laminar]
+
+    idx = np.flatnonzero(~laminar)
+    f_flat = f.reshape(-1)
+    # Per-element iteration counts of the fixed-point scheme, only kept for the metrics sink.
+    iterations = np.zeros(Re.size, dtype=int) if sink is not None and method == "fixed_point" else None
+
+    if method != "fixed_point":
+        f_flat[idx], failed = _turbulent_friction_factor(Re.ravel()[idx], epsilon.ravel()[idx] / D.ravel()[idx],
+                                                         method, tol, max_iter)
+        idx = idx[failed]
+    else:
+        rel = epsilon.ravel()[idx] / (3.7 * D.ravel()[idx])
+        b = 2.51 / Re.ravel()[idx]
+        f_act = np.full(idx.size, float(f_init))
+
+        for n_iter in range(1, max_iter + 1):
+            if idx.size == 0:
+                break
+            rhs = -2.0 * np.log10(rel + b / np.sqrt(f_act))
             f_new = 1.0 / (rhs ** 2)
 
-            if abs(f - f_new) < tol:
-                return f_new
+            done = np.abs(f_act - f_new) < tol
+            f_flat[idx[done]] = f_new[done]
+            if iterations is not None:
+                iterations[idx[done]] = n_iter
+
+            keep = ~done
+            idx, rel, b, f_act = idx[keep], rel[keep], b[keep], f_new[keep]
+
+        f_flat[idx] = f_act
+        if iterations is not None:
+            iterations[idx] = max_iter
+    # idx now holds the elements that did not converge.
+    n_failed = idx.size
+
+    if sink is not None:
+        _record(sink, Re.ravel(), epsilon.ravel() / D.ravel(), f_flat, iterations, n_failed,
+                time.perf_counter() - start)
+    if return_converged:
+        converged = np.ones(Re.shape, dtype=bool)
+        converged.reshape(-1)[idx] = False
+        return f, n_failed, converged
+    return f, n_failed
+
+
+def _turbulent_friction_factor(Re, rel_roughness, method, tol, max_iter):
+    """
+    Evaluates a non fixed-point turbulent backend on 1-D arrays.
+
+    Parameters:
+        Re (ndarray): Reynolds number (turbulent)
+        rel_roughness (ndarray): Relative roughness epsilon/D
+        method (str): Backend name, see friction_factor
+        tol (float): Convergence tolerance on f (Newton only)
+        max_iter (int): Maximum iterations (Newton only)
+
+    Returns:
+        tuple: (f, failed) where failed marks the elements that did not converge
+    """
+    a = rel_roughness / 3.7
+    no_failures = np.zeros(Re.shape, dtype=bool)
+
+    if method == "swamee_jain":
+        return 0.25 / np.log10(a + 5.74 / Re ** 0.9) ** 2, no_failures
+
+    if method == "haaland":
+        return (-1.8 * np.log10(a ** 1.11 + 6.9 / Re)) ** -2, no_failures
+
+    if method == "serghides":
+        A = -2.0 * np.log10(a + 12.0 / Re)
+        B = -2.0 * np.log10(a + 2.51 * A / Re)
+        C = -2.0 * np.log10(a + 2.51 * B / Re)
+        return (A - (B - A) ** 2 / (C - 2.0 * B + A)) ** -2, no_failures
+
+    b = 2.51 / Re
+    c = 2.0 / np.log(10.0)
+
+    if method == "newton":
+        # g(x) = x + 2 log10(a + b x) = 0 with x = 1/sqrt(f)
+        f = 0.25 / np.log10(a + 5.74 / Re ** 0.9) ** 2
+        x = 1.0 / np.sqrt(f)
+        active = np.ones(Re.shape, dtype=bool)
+        for _ in range(max_iter):
+            y = a + b * x
+            x = x - (x + 2.0 * np.log10(y)) / (1.0 + c * b / y)
+            f_new = 1.0 / x ** 2
+            active = np.abs(f - f_new) >= tol
             f = f_new
-    else:
-        f = 64 / Re
-        print(f"Laminar flow friction factor: {f:.5f}")
-        return f
+            if not active.any():
+                break
+        return f, active
 
-    raise RuntimeError("Friction factor did not converge within the maximum number of iterations.")
+    # lambert_w: 1/sqrt(f) = -c ln(b c W(z)) with ln z = a/(b c) - ln(b c).
+    # W is evaluated from ln z directly because z itself overflows for rough pipes at high Re.
+    log_bc = np.log(b * c)
+    L = a / (b * c) - log_bc
+    log_L = np.log(L)
+    w = L - log_L + log_L / L
+    for _ in range(3):
+        w = w * (1.0 + L - np.log(w)) / (1.0 + w)
+    return (c * (log_bc + np.log(w))) ** -2, no_failures
 
 
 def pressure_drop(L, D, u, f, rho):
@@ -0,0 +1,173 @@
+"""
+Temperature-dependent fluid properties for the pump and pipeline calculations.
+
+Kinematic viscosity follows the Walther equation of ASTM D341,
+
+    log10(log10(nu + 0.7)) = A - B * log10(T)        (nu in cSt, T in K),
+
+fitted to two or more measured (temperature, viscosity) points. Density follows a constant
+volumetric expansion coefficient, rho(T) = rho_ref / (1 + beta * (T - T_ref)). Fits are cached
+by their data points, so building the same Fluid again (or looking it up in the registry) does
+not refit, and every property accepts temperature arrays:
+
+    oil = get_fluid("ISO VG 46")
+    T = np.linspace(10, 80, 71)
+    curves = correct_pump_batch(110, 77, 2950, 0.8, oil.viscosity_cSt(T)[:, None], oil.specific_gravity(T)[:, None])
+
+The Walther fit is meant for petroleum oils above about 2 cSt; it does not describe water.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+KELVIN = 273.15
+WATER_DENSITY = 999.0  # Water at 15.6 °C (60 °F), reference of the specific gravity [kg/m³]
+
+
+def cst_to_pa_s(nu_cSt, rho):
+    """
+    Converts kinematic viscosity to dynamic viscosity.
+
+    Parameters:
+        nu_cSt (float or array_like): Kinematic viscosity [cSt].
+        rho (float or array_like): Density [kg/m³].
+
+    Returns:
+        float or ndarray: Dynamic viscosity [Pa·s].
+    """
+    return np.asarray(nu_cSt) * 1e-6 * rho
+
+
+def pa_s_to_cst(mu, rho):
+    """
+    Converts dynamic viscosity to kinematic viscosity.
+
+    Parameters:
+        mu (float or array_like): Dynamic viscosity [Pa·s].
+        rho (float or array_like): Density [kg/m³].
+
+    Returns:
+        float or ndarray: Kinematic viscosity [cSt].
+    """
+    return np.asarray(mu) / rho * 1e6
+
+
+@dataclass(frozen=True)
+class Fluid:
+    """
+    Fluid with a Walther viscosity-temperature fit and a linear thermal expansion.
+
+    Build it from measured points with Fluid.from_points; A and B are the Walther coefficients.
+    """
+    name: str
+    A: float
+    B: float
+    rho_ref: float
+    T_ref_C: float = 15.0
+    beta: float = 6.5e-4
+
+    @classmethod
+    def from_points(cls, name, temperatures_C, viscosities_cSt, rho_ref, T_ref_C=15.0, beta=6.5e-4):
+        """
+        Fits the Walther equation to measured viscosities.
+
+        Parameters:
+            name (str): Fluid name.
+            temperatures_C (sequence of float): Temperatures of the measurements [°C].
+            viscosities_cSt (sequence of float): Kinematic viscosities at those temperatures [cSt].
+            rho_ref (float): Density at T_ref_C [kg/m³].
+            T_ref_C (float): Reference temperature of the density [°C].
+            beta (float): Volumetric thermal expansion coefficient [1/K].
+
+        Returns:
+            Fluid: The fitted fluid.
+        """
+        A, B = _fit_walther(tuple(float(t) for t in temperatures_C), tuple(float(v) for v in viscosities_cSt))
+        return cls(name, A, B, float(rho_ref), float(T_ref_C), float(beta))
+
+    def viscosity_cSt(self, T_C):
+        """
+        Kinematic viscosity [cSt] at temperature T_C [°C] (float or array).
+        """
+        return 10 ** (10 ** (self.A - self.B * np.log10(np.asarray(T_C) + KELVIN))) - 0.7
+
+    def temperature_C(self, nu_cSt):
+        """
+        Temperature [°C] at which the fluid has kinematic viscosity nu_cSt [cSt] (inverse of viscosity_cSt).
+        """
+        return 10 ** ((self.A - np.log10(np.log10(np.asarray(nu_cSt) + 0.7))) / self.B) - KELVIN
+
+    def density(self, T_C):
+        """
+        Density [kg/m³] at temperature T_C [°C].
+        """
+        return self.rho_ref / (1 + self.beta * (np.asarray(T_C) - self.T_ref_C))
+
+    def specific_gravity(self, T_C):
+        """
+        Specific gravity [-] at temperature T_C [°C], relative to water at 15.6 °C.
+        """
+        return self.density(T_C) / WATER_DENSITY
+
+    def dynamic_viscosity(self, T_C):
+        """
+        Dynamic viscosity [Pa·s] at temperature T_C [°C].
+        """
+        return cst_to_pa_s(self.viscosity_cSt(T_C), self.density(T_C))
+
+    def properties(self, T_C):
+        """
+        Returns every property at temperature T_C [°C].
+
+        Returns:
+            dict: 'nu_cSt' [cSt] and 'specific_gravity' [-] for the pump correction, 'mu' [Pa·s]
+            and 'rho' [kg/m³] for the pipeline calculation.
+        """
+        rho = self.density(T_C)
+        nu = self.viscosity_cSt(T_C)
+        return {"nu_cSt": nu, "specific_gravity": rho / WATER_DENSITY, "mu": cst_to_pa_s(nu, rho), "rho": rho}
+
+
+@lru_cache(maxsize=256)
+def _fit_walther(temperatures_C, viscosities_cSt):
+    # Least-squares line of log10(log10(nu + 0.7)) against log10(T); exact for two points.
+    if len(temperatures_C) < 2 or len(set(temperatures_C)) < 2:
+        raise ValueError("The Walther fit needs viscosities at two or more different temperatures.")
+    x = np.log10(np.asarray(temperatures_C) + KELVIN)
+    y = np.log10(np.log10(np.asarray(viscosities_cSt) + 0.7))
+    slope, intercept = np.polyfit(x, y, 1)
+    return float(intercept), float(-slope)
+
+
+FLUIDS = {}
+
+
+def register_fluid(fluid):
+    """
+    Adds a fluid to the registry (replacing a fluid of the same name) and returns it.
+    """
+    FLUIDS[fluid.name] = fluid
+    return fluid
+
+
+def get_fluid(name):
+    """
+    Returns a registered fluid by name.
+
+    Raises:
+        KeyError: If no fluid of that name is registered.
+    """
+    try:
+        return FLUIDS[name]
+    except KeyError:
+        raise KeyError(f"Unknown fluid '{name}'. Registered fluids: {', '.join(sorted(FLUIDS))}.") from None
+
+
+# ISO 3448 grades with viscosity index about 100 (viscosity at 40 °C and 100 °C), typical mineral oil density.
+for _name, _nu_40, _nu_100, _rho in (("ISO VG 22", 22.0, 4.3, 865.0), ("ISO VG 32", 32.0, 5.4, 870.0),
+                                     ("ISO VG 46", 46.0, 6.8, 875.0), ("ISO VG 68", 68.0, 8.7, 880.0),
+                                     ("ISO VG 100", 100.0, 11.3, 885.0), ("ISO VG 150", 150.0, 14.7, 890.0),
+                                     ("ISO VG 220", 220.0, 19.0, 895.0), ("ISO VG 320", 320.0, 24.0, 900.0)):
+    register_fluid(Fluid.from_points(_name, (40.0, 100.0), (_nu_40, _nu_100), _rho))
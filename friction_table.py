@@ -0,0 +1,282 @@
+import numpy as np
+
+from flow_resistance import friction_factor_array
+
+# Header layout of the persisted .npy file, followed by the flattened table.
+_FILE_VERSION = 1
+_HEADER_SIZE = 9
+_INTERPOLATIONS = ("bilinear", "bicubic")
+# Quadratic extrapolation v[n] = 3 v[n-1] - 3 v[n-2] + v[n-3] for bicubic points beyond the edges.
+_GHOST_WEIGHTS = (3.0, -3.0, 1.0)
+# The error is estimated on a 5x5 sample inside every cell. The largest interpolation error lies
+# between samples, up to a few percent above the sampled maximum, so the estimate is scaled by a
+# margin. This is an empirical estimate, not a proven bound.
+_ERROR_SAMPLES = 5
+_ERROR_SAFETY = 1.1
+
+
+class FrictionTable:
+    """
+    Precomputed Darcy-Weisbach friction factor over a log-spaced (Re, epsilon/D) grid.
+
+    The table covers turbulent flow only. Laminar queries (Re <= 2300) return 64/Re and queries
+    above the tabulated Reynolds or roughness range are solved exactly with friction_factor_array,
+    so error_bound applies to every query. Relative roughness below the grid (including smooth
+    pipes) is clamped to the first grid line, which is part of the error check.
+
+    error_bound is an estimate: the largest error at 5x5 sample points per cell, times a 10 %
+    margin. It is not a proven bound, but random lookups have stayed below it on every grid
+    tried (see benchmarks/friction_table_accuracy.py).
+
+    Build a table with FrictionTable.build, persist it with save and share it between worker
+    processes with FrictionTable.load(path, mmap=True).
+    """
+
+    def __init__(self, log_re_range, log_rr_range, values, interpolation="bilinear", error_bound=np.nan):
+        """
+        Parameters:
+            log_re_range (tuple): (min, max) of log10(Re) covered by the table.
+            log_rr_range (tuple): (min, max) of log10(epsilon/D) covered by the table.
+            values (ndarray): Friction factors with shape (n_re, n_rr).
+            interpolation (str): 'bilinear' or 'bicubic'.
+            error_bound (float): Estimated maximum relative error of the table against Colebrook-White.
+        """
+        if interpolation not in _INTERPOLATIONS:
+            raise ValueError(f"Unknown interpolation '{interpolation}'. Choose one of {_INTERPOLATIONS}.")
+
+        self.log_re_min, self.log_re_max = float(log_re_range[0]), float(log_re_range[1])
+        self.log_rr_min, self.log_rr_max = float(log_rr_range[0]), float(log_rr_range[1])
+        self.values = values
+        self.interpolation = interpolation
+        self.error_bound = float(error_bound)
+
+        n_re, n_rr = values.shape
+        self._re_step = (self.log_re_max - self.log_re_min) / (n_re - 1)
+        self._rr_step = (self.log_rr_max - self.log_rr_min) / (n_rr - 1)
+
+    @classmethod
+    def build(cls, Re_range=(2300, 1e8), rel_roughness_range=(1e-10, 0.05), n_re=128, n_rr=64,
+              interpolation="bilinear", max_rel_error=None, max_points=4096):
+        """
+        Tabulates the friction factor and estimates the interpolation error.
+
+        Parameters:
+            Re_range (tuple): (min, max) Reynolds number of the table.
+            rel_roughness_range (tuple): (min, max) relative roughness epsilon/D of the table.
+            n_re (int): Initial number of grid points along Re.
+            n_rr (int): Initial number of grid points along epsilon/D.
+            interpolation (str): 'bilinear' or 'bicubic'.
+            max_rel_error (float, optional): Target error. The grid is refined (doubling the
+                number of intervals along both axes) until the estimated error is below it.
+            max_points (int): Largest number of grid points allowed along one axis.
+
+        Returns:
+            FrictionTable: The tabulated friction factor.
+
+        Raises:
+            RuntimeError: If max_rel_error cannot be reached within max_points.
+        """
+        log_re_range = (np.log10(Re_range[0]), np.log10(Re_range[1]))
+        log_rr_range = (np.log10(rel_roughness_range[0]), np.log10(rel_roughness_range[1]))
+
+        while True:
+            log_re = np.linspace(*log_re_range, n_re)
+            log_rr = np.linspace(*log_rr_range, n_rr)
+            values, _ = _colebrook(10 ** log_re[:, None], 10 ** log_rr[None, :])
+
+            table = cls(log_re_range, log_rr_range, values, interpolation)
+            table.error_bound = table._measure_error()
+
+            if max_rel_error is None or table.error_bound <= max_rel_error:
+                return table
+
+            n_re, n_rr = 2 * n_re - 1, 2 * n_rr - 1
+            if max(n_re, n_rr) > max_points:
+                raise RuntimeError(f"Friction table could not reach a relative error of {max_rel_error:g} "
+                                   f"within {max_points} points per axis.")
+
+    def __call__(self, Re, D, epsilon):
+        """
+        Looks up the friction factor with the same arguments as flow_resistance.friction_factor.
+
+        Parameters:
+            Re (array_like): Reynolds number
+            D (array_like): Pipe diameter [m]
+            epsilon (array_like): Absolute roughness [m]
+
+        Returns:
+            ndarray: Darcy-Weisbach friction factor
+        """
+        return self.lookup(Re, np.asarray(epsilon, dtype=float) / np.asarray(D, dtype=float))
+
+    def lookup(self, Re, rel_roughness):
+        """
+        Interpolates the friction factor for arrays of Reynolds number and relative roughness.
+
+        Parameters:
+            Re (array_like): Reynolds number
+            rel_roughness (array_like): Relative roughness epsilon/D
+
+        Returns:
+            ndarray: Darcy-Weisbach friction factor with the broadcast shape of the inputs.
+        """
+        Re, rel_roughness = np.broadcast_arrays(np.asarray(Re, dtype=float), np.asarray(rel_roughness, dtype=float))
+        log_re = np.log10(Re)
+        log_rr = np.log10(np.maximum(rel_roughness, 10 ** self.log_rr_min))
+
+        laminar = Re <= 2300
+        outside = ~laminar & ((log_re < self.log_re_min) | (log_re > self.log_re_max) | (log_rr > self.log_rr_max))
+        inside = ~(laminar | outside)
+        if inside.all():
+            return self._interpolate(log_re, log_rr)
+
+        f = np.empty(Re.shape)
+        f[laminar] = 64 / Re[laminar]
+        if outside.any():
+            f[outside], _ = _colebrook(Re[outside], rel_roughness[outside])
+        f[inside] = self._interpolate(log_re[inside], log_rr[inside])
+        return f
+
+    def save(self, path):
+        """
+        Writes the table to a single .npy file that can be memory-mapped by load.
+
+        Parameters:
+            path (str or Path): Output file, conventionally with the .npy extension.
+        """
+        n_re, n_rr = self.values.shape
+        header = np.array([_FILE_VERSION, self.log_re_min, self.log_re_max, n_re,
+                           self.log_rr_min, self.log_rr_max, n_rr,
+                           _INTERPOLATIONS.index(self.interpolation), self.error_bound])
+        np.save(path, np.concatenate([header, np.asarray(self.values, dtype=float).ravel()]))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Reads a table written by save.
+
+        Parameters:
+            path (str or Path): File written by save.
+            mmap (bool): Memory-map the file read-only instead of reading it into memory, so that
+                every process loading the same file shares one copy of the table.
+
+        Returns:
+            FrictionTable: The loaded table.
+        """
+        data = np.load(path, mmap_mode="r" if mmap else None)
+        version, log_re_min, log_re_max, n_re, log_rr_min, log_rr_max, n_rr, interp, error_bound = data[:_HEADER_SIZE]
+        if int(version) != _FILE_VERSION:
+            raise ValueError(f"Unsupported friction table file version {int(version)}.")
+
+        values = data[_HEADER_SIZE:].reshape(int(n_re), int(n_rr))
+        return cls((log_re_min, log_re_max), (log_rr_min, log_rr_max), values,
+                   _INTERPOLATIONS[int(interp)], error_bound)
+
+    def _interpolate(self, log_re, log_rr):
+        n_re, n_rr = self.values.shape
+        x = (log_re - self.log_re_min) / self._re_step
+        y = (log_rr - self.log_rr_min) / self._rr_step
+        i = np.clip(np.floor(x).astype(np.intp), 0, n_re - 2)
+        j = np.clip(np.floor(y).astype(np.intp), 0, n_rr - 2)
+        tx = x - i
+        ty = y - j
+        flat = self.values.reshape(-1)
+
+        if self.interpolation == "bilinear":
+            k = i * n_rr + j
+            return ((flat[k] * (1 - tx) + flat[k + n_rr] * tx) * (1 - ty)
+                    + (flat[k + 1] * (1 - tx) + flat[k + n_rr + 1] * tx) * ty)
+
+        # Catmull-Rom bicubic on the 4x4 neighbourhood. Cells on the table border reach one point
+        # beyond the edge; those are recomputed with quadratically extrapolated ghost points so
+        # that boundary cells keep third-order accuracy.
+        wx = _catmull_rom_weights(tx)
+        wy = _catmull_rom_weights(ty)
+        rows = [np.clip(i + a - 1, 0, n_re - 1) * n_rr for a in range(4)]
+        cols = [np.clip(j + b - 1, 0, n_rr - 1) for b in range(4)]
+        f = np.zeros(log_re.shape)
+        for a in range(4):
+            f += wx[a] * (wy[0] * flat[rows[a] + cols[0]] + wy[1] * flat[rows[a] + cols[1]]
+                          + wy[2] * flat[rows[a] + cols[2]] + wy[3] * flat[rows[a] + cols[3]])
+
+        border = (i == 0) | (i == n_re - 2) | (j == 0) | (j == n_rr - 2)
+        if border.any():
+            ib, jb = i[border], j[border]
+            wxb = [w[border] for w in wx]
+            wyb = [w[border] for w in wy]
+            f[border] = sum(wxb[a] * wyb[b] * self._node(ib + a - 1, jb + b - 1)
+                            for a in range(4) for b in range(4))
+        return f
+
+    def _node(self, i, j):
+        n_re, n_rr = self.values.shape
+        v = self.values
+        ci = np.clip(i, 0, n_re - 1)
+        cj = np.clip(j, 0, n_rr - 1)
+        node = v[ci, cj]
+
+        ghost = (ci != i) | (cj != j)
+        if ghost.any():
+            ci, cj = ci[ghost], cj[ghost]
+            di, dj = i[ghost] - ci, j[ghost] - cj
+            wi, wj = np.abs(di), np.abs(dj)
+            value = np.zeros(ci.shape)
+            for p, weight_p in enumerate(_GHOST_WEIGHTS):
+                cp = np.where(wi == 1, weight_p, float(p == 0))
+                for q, weight_q in enumerate(_GHOST_WEIGHTS):
+                    cq = np.where(wj == 1, weight_q, float(q == 0))
+                    value += cp * cq * v[ci - p * di, cj - q * dj]
+            node[ghost] = value
+        return node
+
+    def _measure_error(self, block=32):
+        # Checks every cell on a 5x5 sub-grid, plus smooth pipes clamped to the first roughness
+        # line, against the converged Colebrook-White solution, and scales the sampled maximum by
+        # _ERROR_SAFETY. Cells are checked in blocks of Re rows to keep memory bounded for fine tables.
+        n_re, n_rr = self.values.shape
+        offsets = (np.arange(_ERROR_SAMPLES) + 0.5) / _ERROR_SAMPLES
+        log_rr = (self.log_rr_min + self._rr_step * (np.arange(n_rr - 1)[:, None] + offsets)).ravel()
+        rel_roughness = np.concatenate([[0.0], 10 ** log_rr])[None, :]
+        log_rr_clamped = np.log10(np.maximum(rel_roughness, 10 ** self.log_rr_min))
+
+        error = 0.0
+        for start in range(0, n_re - 1, block):
+            cells = np.arange(start, min(start + block, n_re - 1))
+            log_re = (self.log_re_min + self._re_step * (cells[:, None] + offsets)).ravel()[:, None]
+            exact, _ = _colebrook(10 ** log_re, rel_roughness)
+            approx = self._interpolate(*np.broadcast_arrays(log_re, log_rr_clamped))
+            error = max(error, float(np.max(np.abs(approx / exact - 1))))
+        return _ERROR_SAFETY * error
+
+    def sampled_error(self, n_samples=200000, seed=0):
+        """
+        Measures the relative error of random lookups against Colebrook-White.
+
+        Queries are drawn log-uniformly over the tabulated Re and epsilon/D range, as a check
+        that the estimated error_bound holds between the points it was sampled at.
+
+        Parameters:
+            n_samples (int): Number of random lookups.
+            seed (int): Seed of the random generator.
+
+        Returns:
+            float: Largest relative error of the sampled lookups.
+        """
+        rng = np.random.default_rng(seed)
+        Re = 10 ** rng.uniform(self.log_re_min, self.log_re_max, n_samples)
+        rel_roughness = 10 ** rng.uniform(self.log_rr_min, self.log_rr_max, n_samples)
+        exact, _ = _colebrook(Re, rel_roughness)
+        return float(np.max(np.abs(self.lookup(Re, rel_roughness) / exact - 1)))
+
+
+def _colebrook(Re, rel_roughness):
+    return friction_factor_array(Re, 1.0, rel_roughness, tol=1e-14, max_iter=1000)
+
+
+def _catmull_rom_weights(t):
+    t2 = t * t
+    t3 = t2 * t
+    return (0.5 * (-t3 + 2 * t2 - t),
+            0.5 * (3 * t3 - 5 * t2 + 2),
+            0.5 * (-3 * t3 + 4 * t2 + t),
+            0.5 * (t3 - t2))
@@ -0,0 +1,81 @@
+"""
+In-memory metrics sink for the solver instrumentation (see flow_resistance.set_metrics_sink).
+
+Example:
+    from flow_resistance import set_metrics_sink, friction_factor_array
+    from metrics import MetricsRecorder
+
+    recorder = MetricsRecorder()
+    set_metrics_sink(recorder)
+    friction_factor_array(Re, D, epsilon)
+    set_metrics_sink(None)
+    print(recorder.report())
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+
+class MetricsRecorder:
+    """
+    Collects counters and histogram samples in memory.
+    """
+
+    def __init__(self):
+        self.counters = defaultdict(int)
+        self._samples = defaultdict(list)
+
+    def increment(self, name, n=1):
+        """
+        Adds n to a counter.
+        """
+        self.counters[name] += n
+
+    def observe(self, name, values):
+        """
+        Records one sample (float) or many samples (array) of a histogram.
+        """
+        self._samples[name].append(np.atleast_1d(np.asarray(values, dtype=float)).ravel())
+
+    def samples(self, name):
+        """
+        Returns every recorded sample of a histogram as one array.
+        """
+        chunks = self._samples.get(name)
+        return np.concatenate(chunks) if chunks else np.empty(0)
+
+    def summary(self):
+        """
+        Summarizes the histograms.
+
+        Returns:
+            dict: {name: {'count', 'mean', 'min', 'p50', 'p90', 'p99', 'max', 'total'}}.
+        """
+        out = {}
+        for name in self._samples:
+            values = self.samples(name)
+            if values.size == 0:
+                continue
+            p50, p90, p99 = np.percentile(values, [50, 90, 99])
+            out[name] = {"count": int(values.size), "mean": float(values.mean()), "min": float(values.min()),
+                         "p50": float(p50), "p90": float(p90), "p99": float(p99), "max": float(values.max()),
+                         "total": float(values.sum())}
+        return out
+
+    def report(self):
+        """
+        Returns the counters and histogram summaries as printable text.
+        """
+        lines = [f"{name:<36} {value:>12}" for name, value in sorted(self.counters.items())]
+        for name, stats in sorted(self.summary().items()):
+            lines.append(f"{name:<36} n={stats['count']} mean={stats['mean']:.4g} p50={stats['p50']:.4g} "
+                         f"p99={stats['p99']:.4g} max={stats['max']:.4g}")
+        return "\n".join(lines)
+
+    def clear(self):
+        """
+        Removes every counter and sample.
+        """
+        self.counters.clear()
+        self._samples.clear()
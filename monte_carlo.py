@@ -0,0 +1,391 @@
+"""
+Monte Carlo propagation of input uncertainty through the pump correction and the pipeline
+calculation.
+
+Every input is either a fixed number or a distribution tuple:
+
+    ("normal", mean, std)
+    ("uniform", low, high)
+    ("triangular", low, mode, high)
+    ("lognormal", median, sigma)       sigma is the standard deviation of ln(x)
+
+Samples are drawn and evaluated in chunks with the vectorized functions
+(pump_correction_tools.correct_pump_batch, correction_service.pressurized_flow_batch), so
+memory use depends on chunk_size only. Each chunk has its own random stream spawned from the
+seed, so results are reproducible and do not depend on the number of worker processes.
+Percentiles are read from fixed-bin histograms whose range is set by the first chunk, with a
+resolution of about 1/2000 of the first chunk's spread. Values outside the range are kept exactly
+up to TAIL_CAP per output element; beyond that the range is widened to cover them, at a coarser
+resolution. Non-finite outputs are left out of the percentiles, mean and std of that element.
+
+Example (motor sizing on the 95th percentile power at the BEP):
+
+    result = pump_monte_carlo(Q_BEP_water_m3h=("normal", 110, 3), H_BEP_water_m=("normal", 77, 2),
+                              N_rpm=2950, eta_water=("triangular", 0.76, 0.80, 0.82),
+                              nu_vis_cSt=("lognormal", 120, 0.15), specific_gravity=0.9, seed=1)
+    P_95 = result.band("P_vis", 95)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from correction_service import pressurized_flow_batch
+from pump_correction_tools import correct_pump_batch
+
+DEFAULT_PERCENTILES = (5, 50, 95)
+DEFAULT_CHUNK_SIZE = 50000
+N_BINS = 4096
+# Exact values kept outside an output's histogram range before the range is widened.
+TAIL_CAP = 8 * N_BINS
+
+
+@dataclass
+class MonteCarloResult:
+    """
+    Percentile bands of the sampled outputs.
+
+    bands, mean and std map each output name to an array; bands have the percentile as first
+    axis, followed by the output shape (the flow-ratio grid for pump curves, scalar otherwise).
+    n_invalid counts the samples outside the method's range (pump_monte_carlo) or whose friction
+    factor did not converge (pipeline_monte_carlo). The bands, mean and std are taken over the
+    n_included samples: pump_monte_carlo leaves out the invalid samples unless include_invalid
+    is set, pipeline_monte_carlo keeps every sample. seed reproduces the run.
+    """
+    n_samples: int
+    seed: int
+    percentiles: np.ndarray
+    bands: dict
+    mean: dict
+    std: dict
+    n_invalid: int
+    flow_ratios: np.ndarray = None
+    n_included: int = None
+
+    @property
+    def valid(self):
+        return self.n_invalid == 0
+
+    def band(self, name, percentile):
+        """
+        Returns one percentile of an output (must be one of the computed percentiles).
+        """
+        matches = np.flatnonzero(np.isclose(self.percentiles, percentile))
+        if matches.size == 0:
+            raise ValueError(f"Percentile {percentile} was not computed; available: {self.percentiles.tolist()}.")
+        return self.bands[name][matches[0]]
+
+
+def sample(rng, spec, n):
+    """
+    Draws n samples of one input.
+
+    Parameters:
+        rng (numpy.random.Generator): Random generator.
+        spec (float or tuple): Fixed value or distribution tuple (see the module docstring).
+        n (int): Number of samples.
+
+    Returns:
+        ndarray: Samples, shape (n,).
+    """
+    if not isinstance(spec, tuple):
+        return np.full(n, float(spec))
+    kind, *params = spec
+    if kind == "normal":
+        mean, std = params
+        return rng.normal(mean, std, n)
+    if kind == "uniform":
+        low, high = params
+        return rng.uniform(low, high, n)
+    if kind == "triangular":
+        low, mode, high = params
+        return rng.triangular(low, mode, high, n)
+    if kind == "lognormal":
+        median, sigma = params
+        return rng.lognormal(np.log(median), sigma, n)
+    raise ValueError(f"Unknown distribution '{kind}'. Use normal, uniform, triangular or lognormal.")
+
+
+def pump_monte_carlo(Q_BEP_water_m3h, H_BEP_water_m, N_rpm, eta_water, nu_vis_cSt, specific_gravity,
+                     flow_ratios=(1.0,), n_samples=10**6, seed=None, percentiles=DEFAULT_PERCENTILES,
+                     chunk_size=DEFAULT_CHUNK_SIZE, n_workers=1, include_invalid=False):
+    """
+    Propagates uncertain pump and fluid data through the ANSI/HI 9.6.7 correction.
+
+    Samples outside the method's range (n_s > 60, B > 40 or viscosity outside 1 to 4000 cSt) are
+    counted in n_invalid and, unless include_invalid is set, left out of the bands.
+
+    Parameters:
+        Q_BEP_water_m3h (float or tuple): Flow rate at BEP with water [m³/h].
+        H_BEP_water_m (float or tuple): Head at BEP with water [m].
+        N_rpm (float or tuple): Pump speed [rpm].
+        eta_water (float or tuple): Efficiency with water [decimal].
+        nu_vis_cSt (float or tuple): Kinematic viscosity [cSt].
+        specific_gravity (float or tuple): Specific gravity [-].
+        flow_ratios (array_like): Q/Q_BEP points of the curve bands. Defaults to the BEP only.
+        n_samples (int): Number of samples.
+        seed (int, optional): Seed of the random streams. Defaults to fresh entropy, stored in the result.
+        percentiles (sequence of float): Percentiles of the bands [%].
+        chunk_size (int): Samples evaluated per vectorized call.
+        n_workers (int, optional): Worker processes; 1 runs in-process, None uses os.cpu_count().
+        include_invalid (bool): Also bin the samples outside the method's range.
+
+    Returns:
+        MonteCarloResult: Bands of 'B' and of the 'Q_vis' [m³/h], 'H_vis' [m], 'eta_vis' [decimal]
+        and 'P_vis' [kW] curves over flow_ratios.
+    """
+    inputs = {"Q_BEP_water_m3h": Q_BEP_water_m3h, "H_BEP_water_m": H_BEP_water_m, "N_rpm": N_rpm,
+              "eta_water": eta_water, "nu_vis_cSt": nu_vis_cSt, "specific_gravity": specific_gravity}
+    flow_ratios = np.atleast_1d(np.asarray(flow_ratios, dtype=float))
+    options = {"flow_ratios": flow_ratios, "include_invalid": include_invalid}
+    result = run_monte_carlo(_evaluate_pump, inputs, options, n_samples, seed, percentiles, chunk_size, n_workers)
+    result.flow_ratios = flow_ratios
+    return result
+
+
+def pipeline_monte_carlo(mu, rho, Q_m3h, D_inch, roughness, g=9.81, P_nominal=1e6, P_min=5.2e5, divisor=2,
+                         n_samples=10**6, seed=None, percentiles=DEFAULT_PERCENTILES, chunk_size=DEFAULT_CHUNK_SIZE,
+                         n_workers=1):
+    """
+    Propagates uncertain fluid, flow and pipe data through the pipeline calculation
+    (correction_service.pressurized_flow_batch). Every argument is a number or a distribution tuple.
+
+    Parameters:
+        mu (float or tuple): Dynamic viscosity [Pa·s].
+        rho (float or tuple): Density [kg/m³].
+        Q_m3h (float or tuple): Volumetric flow rate [m³/h].
+        D_inch (float or tuple): Internal diameter [inch].
+        roughness (float or tuple): Absolute roughness [m].
+        g, P_nominal, P_min, divisor: As in correction_service.pressurized_flow.
+        n_samples, seed, percentiles, chunk_size, n_workers: As in pump_monte_carlo.
+
+    Returns:
+        MonteCarloResult: Bands of 'Re', 'f', 'velocity' [m/s], 'head_loss_per_meter' [m/m] and
+        the allowable line 'length' [m].
+    """
+    inputs = {"g": g, "mu": mu, "rho": rho, "P_nominal": P_nominal, "P_min": P_min, "divisor": divisor,
+              "Q_m3h": Q_m3h, "D_inch": D_inch, "roughness": roughness}
+    return run_monte_carlo(_evaluate_pipeline, inputs, {}, n_samples, seed, percentiles, chunk_size, n_workers)
+
+
+def run_monte_carlo(evaluate, inputs, options, n_samples, seed=None, percentiles=DEFAULT_PERCENTILES,
+                    chunk_size=DEFAULT_CHUNK_SIZE, n_workers=1):
+    """
+    Samples the inputs chunk by chunk and accumulates percentile histograms of the outputs.
+
+    Parameters:
+        evaluate (callable): Module-level function evaluate(samples, **options) returning
+            (outputs, n_invalid), where outputs maps names to arrays with the binned samples as
+            first axis (evaluate may leave invalid samples out).
+        inputs (dict): {name: number or distribution tuple}.
+        options (dict): Fixed keyword arguments of evaluate.
+        n_samples, seed, percentiles, chunk_size, n_workers: As in pump_monte_carlo.
+
+    Returns:
+        MonteCarloResult: The bands.
+    """
+    seed_sequence = np.random.SeedSequence(seed)
+    sizes = [min(chunk_size, n_samples - start) for start in range(0, n_samples, chunk_size)]
+    chunk_seeds = seed_sequence.spawn(len(sizes))
+
+    # The first chunk sets the histogram ranges that every other chunk is binned on.
+    outputs, n_invalid = _sample_and_evaluate(evaluate, inputs, options, chunk_seeds[0], sizes[0])
+    histograms = {name: _Histogram.covering(values) for name, values in outputs.items()}
+    ranges = {name: (histogram.low.copy(), histogram.high.copy()) for name, histogram in histograms.items()}
+    for name, histogram in histograms.items():
+        histogram.merge(_Histogram.summarize(outputs[name], *ranges[name]))
+    del outputs
+
+    tasks = [(evaluate, inputs, options, chunk_seed, size, ranges) for chunk_seed, size in zip(chunk_seeds[1:], sizes[1:])]
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1:
+        partials = map(_evaluate_chunk, *zip(*tasks)) if tasks else []
+        for chunk_invalid, summaries in partials:
+            n_invalid += chunk_invalid
+            for name, summary in summaries.items():
+                histograms[name].merge(summary)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            for chunk_invalid, summaries in pool.map(_evaluate_chunk, *zip(*tasks)) if tasks else []:
+                n_invalid += chunk_invalid
+                for name, summary in summaries.items():
+                    histograms[name].merge(summary)
+
+    percentiles = np.asarray(percentiles, dtype=float)
+    return MonteCarloResult(
+        n_samples=n_samples,
+        seed=seed_sequence.entropy,
+        percentiles=percentiles,
+        bands={name: histogram.percentiles(percentiles) for name, histogram in histograms.items()},
+        mean={name: histogram.mean() for name, histogram in histograms.items()},
+        std={name: histogram.std() for name, histogram in histograms.items()},
+        n_invalid=int(n_invalid),
+        n_included=next(iter(histograms.values())).n_samples,
+    )
+
+
+def _sample_and_evaluate(evaluate, inputs, options, chunk_seed, size):
+    rng = np.random.default_rng(chunk_seed)
+    samples = {name: sample(rng, spec, size) for name, spec in inputs.items()}
+    return evaluate(samples, **options)
+
+
+def _evaluate_chunk(evaluate, inputs, options, chunk_seed, size, ranges):
+    # Runs in the worker processes: only the small histogram summaries travel back.
+    outputs, n_invalid = _sample_and_evaluate(evaluate, inputs, options, chunk_seed, size)
+    return n_invalid, {name: _Histogram.summarize(values, *ranges[name]) for name, values in outputs.items()}
+
+
+def _evaluate_pump(samples, flow_ratios, include_invalid):
+    result = correct_pump_batch(samples["Q_BEP_water_m3h"], samples["H_BEP_water_m"], samples["N_rpm"],
+                                samples["eta_water"], samples["nu_vis_cSt"], samples["specific_gravity"],
+                                flow_ratios=flow_ratios)
+    outputs = {name: result[name] for name in ("B", "Q_vis", "H_vis", "eta_vis", "P_vis")}
+    valid = result["valid"]
+    if not include_invalid:
+        outputs = {name: values[valid] for name, values in outputs.items()}
+    return outputs, int(np.count_nonzero(~valid))
+
+
+def _evaluate_pipeline(samples):
+    result = pressurized_flow_batch(samples["g"], samples["mu"], samples["rho"], samples["P_nominal"],
+                                    samples["P_min"], samples["divisor"], samples["Q_m3h"], samples["D_inch"],
+                                    samples["roughness"])
+    outputs = {name: result[name] for name in ("Re", "f", "velocity", "head_loss_per_meter", "length")}
+    return outputs, int(result["n_failed"])
+
+
+class _Histogram:
+    """
+    Fixed-bin histogram per output element, plus the exact values that fall outside its range.
+
+    Non-finite values (NaN, inf) are counted in neither. Once more than TAIL_CAP values of an
+    element lie outside its range, the range is widened to cover them and the bins are merged
+    onto the wider range, so memory stays bounded.
+    """
+
+    def __init__(self, low, high, shape):
+        self.low = low.copy()
+        self.high = high.copy()
+        self.shape = shape
+        k = low.size
+        self.counts = np.zeros((k, N_BINS), dtype=np.int64)
+        self.below = [np.empty(0)] * k
+        self.above = [np.empty(0)] * k
+        self.n_samples = 0
+        self.n = np.zeros(k, dtype=np.int64)
+        self.total = np.zeros(k)
+        self.total_sq = np.zeros(k)
+
+    @classmethod
+    def covering(cls, values):
+        # Range of the first chunk, widened by half its spread on both sides; [0, 1) if the chunk
+        # has no (finite) values, e.g. when every sample was invalid.
+        values = np.asarray(values, dtype=float)
+        flat = values.reshape(len(values), int(np.prod(values.shape[1:])))
+        finite = np.isfinite(flat)
+        v_min = np.where(finite, flat, np.inf).min(axis=0, initial=np.inf)
+        v_max = np.where(finite, flat, -np.inf).max(axis=0, initial=-np.inf)
+        empty = ~finite.any(axis=0)
+        v_min, v_max = np.where(empty, 0.0, v_min), np.where(empty, 1.0, v_max)
+        spread = np.maximum(v_max - v_min, np.maximum(np.abs(v_max), 1.0) * 1e-9)
+        return cls(v_min - 0.5 * spread, v_max + 0.5 * spread, values.shape[1:])
+
+    @staticmethod
+    def summarize(values, low, high):
+        """
+        Bins one chunk of samples; returns a summary for merge.
+        """
+        values = np.asarray(values, dtype=float)
+        flat = values.reshape(len(values), int(np.prod(values.shape[1:])))
+        k = flat.shape[1]
+        finite = np.isfinite(flat)
+        width = (high - low) / N_BINS
+        inside = (flat >= low) & (flat < high)
+        columns = np.broadcast_to(np.arange(k), flat.shape)
+        bins = ((flat[inside] - low[columns[inside]]) / width[columns[inside]]).astype(np.intp)
+        bins = np.minimum(bins, N_BINS - 1)
+        counts = np.bincount(columns[inside] * N_BINS + bins, minlength=k * N_BINS).reshape(k, N_BINS)
+        below = [flat[:, j][flat[:, j] < low[j]] for j in range(k)]
+        above = [flat[:, j][finite[:, j] & (flat[:, j] >= high[j])] for j in range(k)]
+        values_or_zero = np.where(finite, flat, 0.0)
+        return (low, high, counts, below, above, len(flat), finite.sum(axis=0), values_or_zero.sum(axis=0),
+                (values_or_zero ** 2).sum(axis=0))
+
+    def merge(self, summary):
+        low, high, counts, below, above, n_samples, n, total, total_sq = summary
+        for j in range(self.low.size):
+            if low[j] == self.low[j] and high[j] == self.high[j]:
+                self.counts[j] += counts[j]
+            else:
+                # Binned on a range this histogram has widened since.
+                self.counts[j] += _rebin(counts[j], low[j], high[j], self.low[j], self.high[j])
+            self.below[j] = np.concatenate((self.below[j], below[j]))
+            self.above[j] = np.concatenate((self.above[j], above[j]))
+            if low[j] != self.low[j] or high[j] != self.high[j]:
+                self._absorb_tails(j)
+            if len(self.below[j]) + len(self.above[j]) > TAIL_CAP:
+                self._widen(j)
+        self.n_samples += n_samples
+        self.n += n
+        self.total += total
+        self.total_sq += total_sq
+
+    def _widen(self, j):
+        # Stretch the range over every tail value, with one spare bin above the largest one.
+        low = min(self.low[j], self.below[j].min(initial=np.inf))
+        high = max(self.high[j], self.above[j].max(initial=-np.inf))
+        high += (high - low) / (N_BINS - 1)
+        self.counts[j] = _rebin(self.counts[j], self.low[j], self.high[j], low, high)
+        self.low[j], self.high[j] = low, high
+        self._absorb_tails(j)
+
+    def _absorb_tails(self, j):
+        # Moves tail values that now fall inside the range into the bins.
+        tails = np.concatenate((self.below[j], self.above[j]))
+        inside = (tails >= self.low[j]) & (tails < self.high[j])
+        width = (self.high[j] - self.low[j]) / N_BINS
+        bins = np.minimum(((tails[inside] - self.low[j]) / width).astype(np.intp), N_BINS - 1)
+        self.counts[j] += np.bincount(bins, minlength=N_BINS)
+        self.below[j] = self.below[j][self.below[j] < self.low[j]]
+        self.above[j] = self.above[j][self.above[j] >= self.high[j]]
+
+    def percentiles(self, q):
+        out = np.full((len(q), self.low.size), np.nan)
+        width = (self.high - self.low) / N_BINS
+        for j in range(self.low.size):
+            n = self.n[j]
+            if n == 0:
+                continue
+            below, above = np.sort(self.below[j]), np.sort(self.above[j])
+            cumulative = len(below) + np.cumsum(self.counts[j])
+            for i, target in enumerate(np.asarray(q) / 100 * n):
+                if target <= len(below):
+                    out[i, j] = below[max(int(np.ceil(target)) - 1, 0)]
+                elif target > n - len(above):
+                    out[i, j] = above[int(np.ceil(target - (n - len(above)))) - 1]
+                else:
+                    # Linear interpolation inside the bin holding the target rank.
+                    b = int(np.searchsorted(cumulative, target))
+                    before = cumulative[b] - self.counts[j, b]
+                    out[i, j] = self.low[j] + (b + (target - before) / self.counts[j, b]) * width[j]
+        return out.reshape((len(q),) + self.shape)
+
+    def mean(self):
+        n = np.where(self.n > 0, self.n, np.nan)
+        return (self.total / n).reshape(self.shape)
+
+    def std(self):
+        n = np.where(self.n > 0, self.n, np.nan)
+        mean = self.total / n
+        return np.sqrt(np.maximum(self.total_sq / n - mean ** 2, 0.0)).reshape(self.shape)
+
+
+def _rebin(counts, low, high, new_low, new_high):
+    # Moves the counts of N_BINS bins on [low, high) onto N_BINS bins on [new_low, new_high) by
+    # bin centre; the wider range is coarser, so this costs at most one new bin of resolution.
+    centres = low + (np.arange(N_BINS) + 0.5) * (high - low) / N_BINS
+    bins = np.clip(((centres - new_low) / (new_high - new_low) * N_BINS).astype(np.intp), 0, N_BINS - 1)
+    return np.bincount(bins, weights=counts, minlength=N_BINS).round().astype(np.int64)
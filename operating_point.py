@@ -0,0 +1,153 @@
+"""
+Pump/system operating point for viscous service.
+
+Combines the ANSI/HI 9.6.7 corrected pump curve (pump_correction_tools) with the
+Darcy-Weisbach system curve (flow_resistance) and solves for their intersection over arrays of
+pumps, pipelines and fluids at once:
+
+    result = solve_operating_point(Q_BEP[:, None, None], H_BEP[:, None, None], N[:, None, None], eta[:, None, None],
+                                   nu[None, None, :], SG, L[None, :, None], D[None, :, None], roughness, H_static)
+"""
+
+import numpy as np
+
+from flow_resistance import reynolds_number, friction_factor_array, pressure_drop
+from pump_correction_tools import (
+    B_from_water_conditions, correction_factor_flow, C_BEP_head, correction_factor_head,
+    correction_factor_efficiency, corrected_power
+)
+
+
+def system_head(Q_m3h, L_m, D_m, roughness_m, H_static_m, nu_vis_cSt, specific_gravity, g=9.81,
+                friction_method="fixed_point"):
+    """
+    Calculates the system curve: static head plus Darcy-Weisbach friction loss.
+
+    Parameters:
+        Q_m3h (array_like): Flow rate [m³/h].
+        L_m (array_like): Pipe length [m].
+        D_m (array_like): Pipe internal diameter [m].
+        roughness_m (array_like): Absolute roughness [m].
+        H_static_m (array_like): Static head [m].
+        nu_vis_cSt (array_like): Kinematic viscosity [cSt].
+        specific_gravity (array_like): Specific gravity [-].
+        g (float): Gravity [m/s²].
+        friction_method (str): Turbulent friction factor backend, see flow_resistance.friction_factor.
+
+    Returns:
+        tuple: (head [m], Reynolds number, friction factor) arrays with the broadcast input shape.
+    """
+    Q_m3h, L_m, D_m, roughness_m, H_static_m, nu, s = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (Q_m3h, L_m, D_m, roughness_m, H_static_m, nu_vis_cSt, specific_gravity)))
+
+    rho = 1000.0 * s
+    mu = nu * 1e-6 * rho
+    u = (Q_m3h / 3600) / (np.pi * (D_m / 2) ** 2)
+
+    # Zero flow has no friction loss; a tiny Re keeps the laminar branch finite there.
+    Re = np.maximum(reynolds_number(rho=rho, u=u, D=D_m, mu=mu), 1e-12)
+    f, _ = friction_factor_array(Re, D_m, roughness_m, method=friction_method)
+    head = H_static_m + pressure_drop(L=L_m, D=D_m, u=u, f=f, rho=rho) / (rho * g)
+    return head, Re, f
+
+
+def solve_operating_point(Q_BEP_water_m3h, H_BEP_water_m, N_rpm, eta_water, nu_vis_cSt, specific_gravity,
+                          L_m, D_m, roughness_m, H_static_m, shutoff_ratio=1.25, g=9.81,
+                          friction_method="fixed_point", tol=1e-6, max_iter=100):
+    """
+    Finds where the viscous-corrected pump curve meets the system curve, for many cases at once.
+
+    The water head curve is the parabola through the shutoff head (shutoff_ratio * H_BEP) and
+    the BEP, H(Q) = H0 - (H0 - H_BEP) (Q/Q_BEP)²; shutoff_ratio = 1 gives the flat curve of
+    app_01_pump_correction. The water efficiency is constant, as in app_01_pump_correction. The
+    viscous curve follows ANSI/HI 9.6.7 (B <= 1 passes through). All inputs broadcast against
+    each other, so e.g. pumps (P, 1, 1) x pipelines (1, L, 1) x viscosities (1, 1, V) are solved
+    in one call by bracketed false position (Illinois variant) on the water flow rate.
+
+    Parameters:
+        Q_BEP_water_m3h (array_like): Flow rate at BEP with water [m³/h].
+        H_BEP_water_m (array_like): Head at BEP with water [m].
+        N_rpm (array_like): Pump speed [rpm].
+        eta_water (array_like): Efficiency with water [decimal].
+        nu_vis_cSt (array_like): Kinematic viscosity [cSt].
+        specific_gravity (array_like): Specific gravity [-].
+        L_m (array_like): Pipe length [m].
+        D_m (array_like): Pipe internal diameter [m].
+        roughness_m (array_like): Absolute roughness [m].
+        H_static_m (array_like): Static head [m].
+        shutoff_ratio (array_like): Shutoff head over BEP head of the water curve [-].
+        g (float): Gravity [m/s²].
+        friction_method (str): Turbulent friction factor backend, see flow_resistance.friction_factor.
+        tol (float): Convergence tolerance on the head residual [m].
+        max_iter (int): Iteration budget.
+
+    Returns:
+        dict: Arrays with the broadcast input shape: 'Q_water', 'Q_vis', 'H_vis', 'eta_vis',
+        'P_vis', 'B', 'Re', 'f', 'has_solution' (False where the pump cannot overcome the static
+        head or never meets the system curve; values are NaN there) and 'converged'.
+    """
+    (Q_BEP, H_BEP, N, eta_w, nu, s, L_m, D_m, roughness_m, H_static_m, shutoff_ratio) = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (Q_BEP_water_m3h, H_BEP_water_m, N_rpm, eta_water, nu_vis_cSt,
+                                               specific_gravity, L_m, D_m, roughness_m, H_static_m, shutoff_ratio)))
+
+    B = B_from_water_conditions(nu, Q_BEP, H_BEP, N)
+    B_eff = np.maximum(B, 1.0)
+    C_q = correction_factor_flow(B_eff)
+    C_eta = correction_factor_efficiency(B_eff)
+    H_shutoff = shutoff_ratio * H_BEP
+
+    def pump_head(Q_water):
+        H_water = H_shutoff - (H_shutoff - H_BEP) * (Q_water / Q_BEP) ** 2
+        return correction_factor_head(C_BEP_head(C_q), Q_water, Q_BEP) * H_water
+
+    def residual(Q_water):
+        H_sys, _, _ = system_head(C_q * Q_water, L_m, D_m, roughness_m, H_static_m, nu, s, g, friction_method)
+        return pump_head(Q_water) - H_sys
+
+    # Bracket: zero flow, and the flow where the water curve reaches zero head (or a generous
+    # multiple of the BEP flow for flat curves).
+    lo = np.zeros(Q_BEP.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hi = np.where(shutoff_ratio > 1, Q_BEP * np.sqrt(H_shutoff / (H_shutoff - H_BEP)), 10 * Q_BEP)
+    r_lo = residual(lo)
+    r_hi = residual(hi)
+    has_solution = (r_lo > 0) & (r_hi < 0)
+
+    active = has_solution.copy()
+    Q = np.where(active, lo, np.nan)
+    side = np.zeros(Q_BEP.shape, dtype=int)
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        Q_new = np.where(active, hi - r_hi * (hi - lo) / (r_hi - r_lo), Q)
+        r_new = residual(np.where(active, Q_new, lo))
+
+        move_hi = active & (r_new < 0)
+        move_lo = active & (r_new >= 0)
+        # Illinois: halve the residual kept on a side that was retained twice in a row.
+        r_lo = np.where(move_hi & (side == -1), 0.5 * r_lo, r_lo)
+        r_hi = np.where(move_lo & (side == 1), 0.5 * r_hi, r_hi)
+        hi, r_hi = np.where(move_hi, Q_new, hi), np.where(move_hi, r_new, r_hi)
+        lo, r_lo = np.where(move_lo, Q_new, lo), np.where(move_lo, r_new, r_lo)
+        side = np.where(move_hi, -1, np.where(move_lo, 1, side))
+
+        Q = np.where(active, Q_new, Q)
+        active &= np.abs(r_new) > tol
+
+    Q_vis = C_q * Q
+    H_vis = pump_head(Q)
+    eta_vis = C_eta * eta_w
+    _, Re, f = system_head(np.nan_to_num(Q_vis), L_m, D_m, roughness_m, H_static_m, nu, s, g, friction_method)
+
+    return {
+        "Q_water": Q,
+        "Q_vis": Q_vis,
+        "H_vis": H_vis,
+        "eta_vis": eta_vis,
+        "P_vis": corrected_power(Q_vis, H_vis, s, eta_vis),
+        "B": B,
+        "Re": np.where(has_solution, Re, np.nan),
+        "f": np.where(has_solution, f, np.nan),
+        "has_solution": has_solution,
+        "converged": has_solution & ~active,
+    }
@@ -0,0 +1,365 @@
+"""
+Steady-state pipe network solver.
+
+A network is made of junctions (with elevation and demand), fixed-head reservoirs, pipes
+(length, diameter, roughness) and pumps. Flows and heads are solved together with the global
+gradient method (Todini-Pilati): a Newton iteration on the energy and continuity equations
+whose linear step reduces to one sparse, symmetric positive definite system in the junction
+heads. Pipe losses use the Darcy-Weisbach equation with the Colebrook-White friction factor
+of flow_resistance.friction_factor_array, blended linearly with the laminar 64/Re between
+Re = 2000 and 4000 so the losses stay continuous for Newton.
+
+The linear system is solved with scipy.sparse when SciPy is installed; otherwise a
+Jacobi-preconditioned conjugate gradient on the incidence structure (NumPy only) is used.
+
+Example:
+    net = PipeNetwork(nu_cSt=1.0, specific_gravity=1.0)
+    net.add_reservoir("tank", head_m=50)
+    net.add_junction("A", elevation_m=10, demand_m3h=80)
+    net.add_junction("B", elevation_m=5, demand_m3h=40)
+    net.add_pipe("tank", "A", length_m=800, diameter_m=0.2, roughness_m=4.5e-5)
+    net.add_pipe("A", "B", length_m=500, diameter_m=0.15, roughness_m=4.5e-5)
+    result = net.solve()
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from flow_resistance import friction_factor_array
+from pump_correction_tools import B_from_water_conditions, correction_factor_flow
+
+LINEAR_SOLVERS = ("auto", "scipy", "cg")
+
+# Reynolds numbers bounding the laminar-turbulent blend of the friction factor.
+TRANSITION_RE = (2000.0, 4000.0)
+
+
+@dataclass
+class NetworkResult:
+    """
+    Solved state of a PipeNetwork. Node arrays follow the order nodes were added, link arrays
+    the order pipes and pumps were added (links[i] is the (start, end) name pair of link i).
+    """
+    nodes: list
+    links: list
+    head_m: np.ndarray
+    pressure_Pa: np.ndarray
+    supply_m3h: np.ndarray
+    flow_m3h: np.ndarray
+    velocity: np.ndarray
+    head_loss_m: np.ndarray
+    Re: np.ndarray
+    f: np.ndarray
+    iterations: int
+    converged: bool
+    flow_change: float
+
+    @property
+    def valid(self):
+        return self.converged
+
+
+class PipeNetwork:
+    """
+    Pipe network with junctions, reservoirs, pipes and pumps. Positive flow runs from a link's
+    start node to its end node.
+    """
+
+    def __init__(self, nu_cSt=1.0, specific_gravity=1.0, g=9.81):
+        """
+        Parameters:
+            nu_cSt (float): Kinematic viscosity of the fluid [cSt].
+            specific_gravity (float): Specific gravity of the fluid [-].
+            g (float): Gravity [m/s²].
+        """
+        self.nu_cSt = nu_cSt
+        self.specific_gravity = specific_gravity
+        self.g = g
+
+        self._index = {}
+        self._names = []
+        self._elevation = []
+        self._demand = []
+        self._fixed_head = []
+
+        self._pipes = []
+        self._pumps = []
+
+    def _add_node(self, name, elevation, demand, fixed_head):
+        if name in self._index:
+            raise ValueError(f"Node {name!r} already exists.")
+        self._index[name] = len(self._names)
+        self._names.append(name)
+        self._elevation.append(float(elevation))
+        self._demand.append(float(demand))
+        self._fixed_head.append(fixed_head)
+
+    def add_junction(self, name, elevation_m=0.0, demand_m3h=0.0):
+        """
+        Adds a junction whose head is solved for.
+
+        Parameters:
+            name (hashable): Node name.
+            elevation_m (float): Elevation [m].
+            demand_m3h (float): Flow drawn from the network at the node [m³/h] (negative for an inflow).
+        """
+        self._add_node(name, elevation_m, demand_m3h, np.nan)
+
+    def add_reservoir(self, name, head_m):
+        """
+        Adds a fixed-head node (tank or reservoir free surface). Every connected part of the
+        network needs at least one.
+
+        Parameters:
+            name (hashable): Node name.
+            head_m (float): Hydraulic head [m].
+        """
+        self._add_node(name, head_m, 0.0, float(head_m))
+
+    def add_pipe(self, start, end, length_m, diameter_m, roughness_m):
+        """
+        Adds a pipe between two existing nodes.
+
+        Parameters:
+            start, end (hashable): Node names.
+            length_m (float): Length [m].
+            diameter_m (float): Internal diameter [m].
+            roughness_m (float): Absolute roughness [m].
+        """
+        self._pipes.append((self._node(start), self._node(end), float(length_m), float(diameter_m),
+                            float(roughness_m)))
+
+    def add_pump(self, start, end, Q_BEP_water_m3h, H_BEP_water_m, N_rpm=None, shutoff_ratio=1.25):
+        """
+        Adds a pump lifting the fluid from start (suction) to end (discharge).
+
+        The water curve is the parabola through the shutoff head (shutoff_ratio * H_BEP) and the
+        BEP, as in operating_point.solve_operating_point. When N_rpm is given the curve is
+        corrected for the network fluid with ANSI/HI 9.6.7; otherwise it is used as is.
+
+        Parameters:
+            start, end (hashable): Node names.
+            Q_BEP_water_m3h (float): Flow rate at BEP with water [m³/h].
+            H_BEP_water_m (float): Head at BEP with water [m].
+            N_rpm (float, optional): Pump speed [rpm].
+            shutoff_ratio (float): Shutoff head over BEP head of the water curve [-].
+        """
+        if N_rpm is None:
+            C_q = 1.0
+        else:
+            B = B_from_water_conditions(self.nu_cSt, Q_BEP_water_m3h, H_BEP_water_m, N_rpm)
+            C_q = float(correction_factor_flow(max(B, 1.0)))
+        self._pumps.append((self._node(start), self._node(end), Q_BEP_water_m3h / 3600, float(H_BEP_water_m),
+                            float(shutoff_ratio), C_q))
+
+    def _node(self, name):
+        try:
+            return self._index[name]
+        except KeyError:
+            raise ValueError(f"Unknown node {name!r}.") from None
+
+    def solve(self, tol=1e-6, max_iter=100, linear_solver="auto", friction_method="fixed_point"):
+        """
+        Solves the network flows and heads.
+
+        Parameters:
+            tol (float): Convergence tolerance on the relative flow change sum|dQ| / sum|Q|.
+            max_iter (int): Maximum Newton iterations.
+            linear_solver (str): 'scipy' (sparse direct), 'cg' (NumPy conjugate gradient) or
+                'auto' (scipy when installed).
+            friction_method (str): Turbulent friction factor backend, see flow_resistance.friction_factor.
+
+        Returns:
+            NetworkResult: Heads, pressures and reservoir supplies per node; flows, velocities,
+            head losses, Reynolds numbers and friction factors per link (NaN for pumps).
+
+        Raises:
+            ValueError: If the network has no reservoir or no links, or the linear solver is unknown.
+        """
+        if linear_solver not in LINEAR_SOLVERS:
+            raise ValueError(f"Unknown linear solver {linear_solver!r}. Choose one of {', '.join(LINEAR_SOLVERS)}.")
+        has_scipy = linear_solver != "cg" and _scipy_sparse() is not None
+        if linear_solver == "scipy" and not has_scipy:
+            raise ValueError("linear_solver='scipy' needs SciPy installed.")
+        use_scipy = has_scipy
+
+        fixed_head = np.array(self._fixed_head, dtype=float)
+        fixed = ~np.isnan(fixed_head)
+        if not fixed.any():
+            raise ValueError("The network needs at least one reservoir.")
+        if not self._pipes and not self._pumps:
+            raise ValueError("The network has no pipes or pumps.")
+
+        n_nodes = len(self._names)
+        # Unknown heads are numbered 0..n_free-1; fixed-head nodes map to the extra slot n_free,
+        # which always holds a zero correction.
+        free_index = np.full(n_nodes, np.count_nonzero(~fixed))
+        free_index[~fixed] = np.arange(np.count_nonzero(~fixed))
+        n_free = int(np.count_nonzero(~fixed))
+
+        pipes = np.array(self._pipes, dtype=float).reshape(-1, 5)
+        pumps = np.array(self._pumps, dtype=float).reshape(-1, 6)
+        n_pipes = len(pipes)
+        start = np.concatenate([pipes[:, 0], pumps[:, 0]]).astype(int)
+        end = np.concatenate([pipes[:, 1], pumps[:, 1]]).astype(int)
+        start_free, end_free = free_index[start], free_index[end]
+
+        length, diameter, roughness = pipes[:, 2], pipes[:, 3], pipes[:, 4]
+        area = np.pi * (diameter / 2) ** 2
+        nu = self.nu_cSt * 1e-6
+        g = self.g
+        laminar_slope = 32 * nu * length / (g * diameter ** 2 * area)
+
+        Q_BEP, H_BEP, shutoff_ratio, C_q = pumps[:, 2], pumps[:, 3], pumps[:, 4], pumps[:, 5]
+        H_shutoff = shutoff_ratio * H_BEP
+        K = (H_shutoff - H_BEP) / Q_BEP ** 2
+        pump_slope_floor = 1e-6 * H_shutoff / Q_BEP
+
+        demand = np.array(self._demand) / 3600
+        head = np.where(fixed, fixed_head, np.max(fixed_head[fixed]))
+
+        # Start from 0.5 m/s in every pipe and the BEP flow in every pump.
+        Q = np.concatenate([0.5 * area, C_q * Q_BEP])
+
+        def losses(Q):
+            # Head loss of every link and its derivative with respect to the flow.
+            Qp = Q[:n_pipes]
+            velocity = Qp / area
+            Re = np.abs(velocity) * diameter / nu
+            f = _friction_factor(Re, diameter, roughness, friction_method)
+            turbulent = Re > TRANSITION_RE[0]
+            h_pipe = np.where(turbulent, f * length / diameter * velocity * np.abs(velocity) / (2 * g),
+                              laminar_slope * Qp)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                slope_pipe = np.where(turbulent, 2 * h_pipe / Qp, laminar_slope)
+
+            # Pump gain on the corrected curve: Q_vis = C_q Q_water, H_vis = C_h(Q_water) H_water.
+            Q_water = Q[n_pipes:] / C_q
+            ratio = np.abs(Q_water) / Q_BEP
+            C_h = 1 - (1 - C_q) * ratio ** 0.75
+            H_water = H_shutoff - K * Q_water * np.abs(Q_water)
+            with np.errstate(divide="ignore"):
+                dC_h = -(1 - C_q) * 0.75 * ratio ** -0.25 / Q_BEP * np.sign(Q_water)
+            dgain = np.nan_to_num((dC_h * H_water - C_h * 2 * K * np.abs(Q_water)) / C_q, nan=0.0, neginf=0.0)
+            slope_pump = np.maximum(-dgain, pump_slope_floor)
+
+            h = np.concatenate([h_pipe, -C_h * H_water])
+            slope = np.concatenate([slope_pipe, slope_pump])
+            return h, slope, velocity, Re, f
+
+        def incidence(values):
+            # A^T x restricted to the unknown heads (the slot for fixed heads is dropped).
+            return (np.bincount(start_free, values, minlength=n_free + 1)
+                    - np.bincount(end_free, values, minlength=n_free + 1))[:n_free]
+
+        converged = False
+        flow_change = np.inf
+        iteration = 0
+        for iteration in range(1, max_iter + 1):
+            h, slope, _, _, _ = losses(Q)
+            w = 1.0 / slope
+            energy = h - (head[start] - head[end])
+            continuity = (np.bincount(start, Q, minlength=n_nodes) - np.bincount(end, Q, minlength=n_nodes)
+                          + demand)[~fixed]
+
+            rhs = incidence(w * energy) - continuity
+            if use_scipy:
+                dH = _solve_scipy(start_free, end_free, w, rhs, n_free)
+            else:
+                dH = _solve_cg(start_free, end_free, w, rhs, n_free, incidence)
+
+            dH_ext = np.append(dH, 0.0)
+            dQ = w * (dH_ext[start_free] - dH_ext[end_free] - energy)
+            Q = Q + dQ
+            head[~fixed] += dH
+
+            flow_change = float(np.abs(dQ).sum() / max(np.abs(Q).sum(), 1e-12))
+            if flow_change < tol:
+                converged = True
+                break
+
+        h, _, velocity, Re, f = losses(Q)
+        n_pumps = len(pumps)
+        supply = np.bincount(start, Q, minlength=n_nodes) - np.bincount(end, Q, minlength=n_nodes)
+        rho = 1000.0 * self.specific_gravity
+        links = [(self._names[a], self._names[b]) for a, b in zip(start, end)]
+
+        return NetworkResult(
+            nodes=list(self._names),
+            links=links,
+            head_m=head,
+            pressure_Pa=rho * g * (head - np.array(self._elevation)),
+            supply_m3h=np.where(fixed, supply, 0.0) * 3600,
+            flow_m3h=Q * 3600,
+            velocity=np.concatenate([velocity, np.full(n_pumps, np.nan)]),
+            head_loss_m=h,
+            Re=np.concatenate([Re, np.full(n_pumps, np.nan)]),
+            f=np.concatenate([f, np.full(n_pumps, np.nan)]),
+            iterations=iteration,
+            converged=converged,
+            flow_change=flow_change,
+        )
+
+
+def _friction_factor(Re, D, epsilon, method):
+    # Colebrook-White with the laminar/turbulent jump replaced by a linear blend in Re across
+    # TRANSITION_RE, so that the head loss is continuous in the flow and Newton does not cycle
+    # on pipes that settle near the critical Reynolds number.
+    low, high = TRANSITION_RE
+    f, _ = friction_factor_array(np.maximum(Re, high * (Re > low)), D, epsilon, method=method)
+    t = np.clip((Re - low) / (high - low), 0.0, 1.0)
+    return np.where(Re > low, (1 - t) * (64 / low) + t * f, 64 / np.maximum(Re, 1e-12))
+
+
+@lru_cache(maxsize=None)
+def _scipy_sparse():
+    # SciPy takes ~300 ms to import, so it is only loaded once a network is solved with it.
+    try:
+        import scipy.sparse as sparse
+        import scipy.sparse.linalg as sparse_linalg
+    except ImportError:
+        return None
+    return sparse, sparse_linalg
+
+
+def _solve_scipy(start_free, end_free, w, rhs, n_free):
+    # Assemble A^T diag(w) A over the unknown heads; entries of the fixed-head slot are dropped.
+    a_free = start_free < n_free
+    b_free = end_free < n_free
+    both = a_free & b_free
+    rows = np.concatenate([start_free[a_free], end_free[b_free], start_free[both], end_free[both]])
+    cols = np.concatenate([start_free[a_free], end_free[b_free], end_free[both], start_free[both]])
+    data = np.concatenate([w[a_free], w[b_free], -w[both], -w[both]])
+    sparse, sparse_linalg = _scipy_sparse()
+    matrix = sparse.csr_matrix((data, (rows, cols)), shape=(n_free, n_free))
+    return sparse_linalg.spsolve(matrix, rhs)
+
+
+def _solve_cg(start_free, end_free, w, rhs, n_free, incidence, tol=1e-12, max_iter=None):
+    # Jacobi-preconditioned conjugate gradient on A^T diag(w) A, applied matrix-free.
+    def matvec(x):
+        x_ext = np.append(x, 0.0)
+        return incidence(w * (x_ext[start_free] - x_ext[end_free]))
+
+    diagonal = (np.bincount(start_free, w, minlength=n_free + 1)
+                + np.bincount(end_free, w, minlength=n_free + 1))[:n_free]
+    x = np.zeros(n_free)
+    r = rhs.copy()
+    z = r / diagonal
+    p = z.copy()
+    rz = r @ z
+    threshold = tol * np.linalg.norm(rhs)
+    for _ in range(max_iter or 10 * n_free):
+        if np.linalg.norm(r) <= threshold:
+            break
+        Ap = matvec(p)
+        alpha = rz / (p @ Ap)
+        x += alpha * p
+        r -= alpha * Ap
+        z = r / diagonal
+        rz_new = r @ z
+        p = z + (rz_new / rz) * p
+        rz = rz_new
+    return x
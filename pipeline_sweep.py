@@ -0,0 +1,202 @@
+"""
+Multiprocess sweep of the pressurized pipeline calculation (app_03_pressurized_flow).
+
+Every combination of flow rate, diameter, roughness and fluid is evaluated with
+correction_service.pressurized_flow_batch. The Cartesian grid is split into chunks of flat
+indices that a process pool evaluates in parallel; results are gathered into one NumPy
+structured array with a row per combination. Example:
+
+    python pipeline_sweep.py --Q 100:3000:50 --D 4,6,8,10,12,16,20,24 --roughness 4.5e-5,1.5e-4 \
+        --fluid 0.001:998 --fluid 0.0945:945 --out sweep.npy
+
+Press Ctrl+C to cancel a running sweep; from code, set the cancel_event passed to sweep_pipeline.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+from correction_service import pressurized_flow_batch
+
+INPUT_FIELDS = ["Q_m3h", "D_inch", "roughness", "mu", "rho"]
+OUTPUT_FIELDS = ["D_m", "velocity", "mass_flow", "Re", "f", "head_loss_per_meter", "length", "manometric_head"]
+# converged is False where the friction factor did not converge and keeps its last iterate.
+RESULT_DTYPE = np.dtype([(name, float) for name in INPUT_FIELDS + OUTPUT_FIELDS] + [("converged", bool)])
+
+DEFAULT_CHUNK_SIZE = 200000
+
+
+class SweepCancelled(Exception):
+    """
+    Raised when a sweep is cancelled. partial holds the result table and done the boolean mask
+    of the rows that were computed before the cancellation.
+    """
+
+    def __init__(self, partial, done):
+        super().__init__(f"Sweep cancelled after {int(done.sum())} of {done.size} cases.")
+        self.partial = partial
+        self.done = done
+
+
+def sweep_pipeline(Q_m3h, D_inch, roughness, fluids, g=9.81, P_nominal=1e6, P_min=5.2e5, divisor=2,
+                   n_workers=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None, cancel_event=None):
+    """
+    Evaluates the pipeline calculation over the Cartesian grid of the given values.
+
+    Parameters:
+        Q_m3h (array_like): Volumetric flow rates [m³/h].
+        D_inch (array_like): Internal diameters [inch].
+        roughness (array_like): Absolute roughnesses [m].
+        fluids (sequence): (mu [Pa·s], rho [kg/m³]) pairs.
+        g (float): Gravity [m/s²].
+        P_nominal (float): Nominal pressure [Pa].
+        P_min (float): Minimum pressure [Pa].
+        divisor (float): Pressure drop divisor coefficient [-].
+        n_workers (int, optional): Worker processes. Defaults to os.cpu_count(); 1 runs in-process.
+        chunk_size (int): Cases per task sent to a worker.
+        progress (callable, optional): Called as progress(done, total) after each chunk.
+        cancel_event (threading.Event, optional): Set it to cancel the sweep.
+
+    Returns:
+        ndarray: Structured array (RESULT_DTYPE) with one row per combination, flow rate varying
+        slowest and fluid fastest; the 'converged' field flags rows whose friction factor did
+        not converge.
+
+    Raises:
+        SweepCancelled: If cancel_event is set or the sweep is interrupted with Ctrl+C.
+    """
+    fluids = np.asarray(fluids, dtype=float).reshape(-1, 2)
+    axes = (np.asarray(Q_m3h, dtype=float).ravel(), np.asarray(D_inch, dtype=float).ravel(),
+            np.asarray(roughness, dtype=float).ravel(), fluids)
+    constants = (g, P_nominal, P_min, divisor)
+    shape = tuple(len(axis) for axis in axes)
+    total = int(np.prod(shape))
+
+    table = np.empty(total, dtype=RESULT_DTYPE)
+    done = np.zeros(total, dtype=bool)
+    bounds = [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+    n_workers = n_workers or os.cpu_count() or 1
+
+    def store(start, stop, columns):
+        for name in RESULT_DTYPE.names:
+            table[name][start:stop] = columns[name]
+        done[start:stop] = True
+        if progress is not None:
+            progress(int(done.sum()), total)
+
+    try:
+        if n_workers == 1:
+            for start, stop in bounds:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise SweepCancelled(table, done)
+                store(start, stop, _evaluate_chunk(axes, constants, start, stop))
+            return table
+
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            pending = {pool.submit(_evaluate_chunk, axes, constants, start, stop): (start, stop)
+                       for start, stop in bounds}
+            try:
+                while pending:
+                    # The timeout lets a cancel request be noticed while chunks are running.
+                    finished, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        store(*pending.pop(future), future.result())
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise SweepCancelled(table, done)
+            except BaseException:
+                # Drop the queued chunks (shutdown(cancel_futures=True) needs Python 3.9).
+                for future in pending:
+                    future.cancel()
+                pool.shutdown(wait=False)
+                raise
+    except KeyboardInterrupt:
+        raise SweepCancelled(table, done) from None
+
+    return table
+
+
+def _evaluate_chunk(axes, constants, start, stop):
+    Q_axis, D_axis, roughness_axis, fluids = axes
+    g, P_nominal, P_min, divisor = constants
+    iq, i_d, ie, i_fluid = np.unravel_index(np.arange(start, stop), tuple(len(axis) for axis in axes))
+
+    columns = {
+        "Q_m3h": Q_axis[iq],
+        "D_inch": D_axis[i_d],
+        "roughness": roughness_axis[ie],
+        "mu": fluids[i_fluid, 0],
+        "rho": fluids[i_fluid, 1],
+    }
+    columns.update(pressurized_flow_batch(g, columns["mu"], columns["rho"], P_nominal, P_min, divisor,
+                                          columns["Q_m3h"], columns["D_inch"], columns["roughness"]))
+    return columns
+
+
+class ProgressBar:
+    """
+    Text progress indicator for sweep_pipeline, written to stderr.
+    """
+
+    def __init__(self, width=40, stream=sys.stderr):
+        self.width = width
+        self.stream = stream
+        self._start = time.perf_counter()
+
+    def __call__(self, done, total):
+        fraction = done / total if total else 1.0
+        filled = int(self.width * fraction)
+        elapsed = time.perf_counter() - self._start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        self.stream.write(f"\r[{'#' * filled}{'.' * (self.width - filled)}] "
+                          f"{done}/{total} cases ({fraction:.0%}, {rate:,.0f} cases/s)")
+        if done == total:
+            self.stream.write("\n")
+        self.stream.flush()
+
+
+def _parse_values(text):
+    # "a,b,c" for a list, "start:stop:step" for an inclusive range.
+    if ":" in text:
+        start, stop, step = (float(v) for v in text.split(":"))
+        return np.arange(start, stop + step / 2, step)
+    return np.array([float(v) for v in text.split(",")])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--Q", required=True, help="Flow rates [m³/h]: list 'a,b,c' or range 'start:stop:step'.")
+    parser.add_argument("--D", required=True, help="Internal diameters [inch]: list or range.")
+    parser.add_argument("--roughness", required=True, help="Absolute roughnesses [m]: list or range.")
+    parser.add_argument("--fluid", action="append", required=True,
+                        help="Fluid as 'mu:rho' (dynamic viscosity [Pa·s]:density [kg/m³]); repeat for more fluids.")
+    parser.add_argument("--g", type=float, default=9.81)
+    parser.add_argument("--P-nominal", type=float, default=1e6)
+    parser.add_argument("--P-min", type=float, default=5.2e5)
+    parser.add_argument("--divisor", type=float, default=2)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--out", required=True, help="Output .npy file (structured array).")
+    args = parser.parse_args(argv)
+
+    fluids = [tuple(float(v) for v in fluid.split(":")) for fluid in args.fluid]
+    try:
+        table = sweep_pipeline(_parse_values(args.Q), _parse_values(args.D), _parse_values(args.roughness), fluids,
+                               g=args.g, P_nominal=args.P_nominal, P_min=args.P_min, divisor=args.divisor,
+                               n_workers=args.workers, chunk_size=args.chunk_size, progress=ProgressBar())
+    except SweepCancelled as cancelled:
+        sys.stderr.write(f"\n{cancelled}\n")
+        sys.exit(1)
+
+    np.save(args.out, table)
+    print(f"{table.size} cases written to {args.out}")
+    n_failed = int(np.count_nonzero(~table["converged"]))
+    if n_failed:
+        print(f"Warning: the friction factor did not converge in {n_failed} case(s) (converged == False).")
+
+
+if __name__ == "__main__":
+    main()
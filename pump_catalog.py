@@ -0,0 +1,237 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+from pump_correction_tools import (
+    correct_pump_batch, B_from_water_conditions, correction_factor_flow, correction_factor_efficiency,
+    correction_factor_head, corrected_power
+)
+
+_FILE_VERSION = 1
+_META_FILE = "catalog.json"
+# Columns stored one .npy file each; curves have one row per pump over the shared flow-ratio grid.
+_COLUMNS = ("name", "Q_BEP", "H_BEP", "eta_BEP", "N", "B_coef", "curve_H", "curve_eta")
+DEFAULT_FLOW_RATIOS = np.round(np.arange(0.0, 1.61, 0.1), 10)
+
+
+class PumpCatalog:
+    """
+    Columnar store of pump models with an index on the BEP flow rate.
+
+    Every pump has its BEP (Q, H, eta), speed and water curves (head and efficiency) tabulated
+    over a flow-ratio grid Q/Q_BEP shared by the whole catalog. Pumps are kept sorted by Q_BEP,
+    so duty-point queries only evaluate the slice of pumps whose BEP can reach the requested
+    flow. The catalog is saved as a directory of .npy columns and loaded memory-mapped, so
+    large catalogs open instantly and are shared between processes.
+
+    Example:
+        catalog = PumpCatalog.build(names, Q_BEP, H_BEP, eta_BEP, N)
+        catalog.save("catalog")
+        catalog = PumpCatalog.load("catalog")
+        matches = catalog.covering(Q_vis=250, H_vis=70, nu_vis_cSt=120, specific_gravity=0.9)
+        curves = catalog.correct(matches["index"], nu_vis_cSt=120, specific_gravity=0.9)
+    """
+
+    def __init__(self, columns, flow_ratios):
+        """
+        Parameters:
+            columns (dict): Arrays for every name in _COLUMNS, sorted by Q_BEP.
+            flow_ratios (ndarray): Increasing Q/Q_BEP grid of the curve columns.
+        """
+        self.columns = columns
+        self.flow_ratios = np.asarray(flow_ratios, dtype=float)
+        # Largest B / sqrt(nu) in the catalog, used to bound the flow correction in queries.
+        self._B_coef_max = float(columns["B_coef"].max()) if len(columns["Q_BEP"]) else 0.0
+
+    def __len__(self):
+        return len(self.columns["Q_BEP"])
+
+    @classmethod
+    def build(cls, names, Q_BEP, H_BEP, eta_BEP, N, curve_H=None, curve_eta=None, flow_ratios=None,
+              shutoff_ratio=1.25):
+        """
+        Creates a catalog from per-pump arrays.
+
+        Parameters:
+            names (sequence of str): Pump model names.
+            Q_BEP (array_like): Flow rate at BEP with water [m³/h].
+            H_BEP (array_like): Head at BEP with water [m].
+            eta_BEP (array_like): Efficiency at BEP with water [decimal].
+            N (array_like): Pump speed [rpm].
+            curve_H (array_like, optional): Water head [m] per pump over flow_ratios, shape
+                (n_pumps, n_ratios). Defaults to the parabola through the shutoff head
+                (shutoff_ratio * H_BEP) and the BEP.
+            curve_eta (array_like, optional): Water efficiency [decimal] per pump over
+                flow_ratios. Defaults to the BEP efficiency at every flow, as in app_01_pump_correction.
+            flow_ratios (array_like, optional): Q/Q_BEP grid of the curves. Defaults to 0 to 1.6
+                in steps of 0.1.
+            shutoff_ratio (float): Shutoff head over BEP head of the default head curves [-].
+
+        Returns:
+            PumpCatalog: The catalog, sorted by Q_BEP.
+        """
+        flow_ratios = DEFAULT_FLOW_RATIOS if flow_ratios is None else np.asarray(flow_ratios, dtype=float)
+        Q_BEP, H_BEP, eta_BEP, N = (np.asarray(v, dtype=float).ravel() for v in (Q_BEP, H_BEP, eta_BEP, N))
+        if curve_H is None:
+            curve_H = H_BEP[:, None] * (shutoff_ratio - (shutoff_ratio - 1) * flow_ratios ** 2)
+        if curve_eta is None:
+            curve_eta = np.repeat(eta_BEP[:, None], len(flow_ratios), axis=1)
+
+        order = np.argsort(Q_BEP, kind="stable")
+        columns = {
+            "name": np.asarray(names, dtype=str)[order],
+            "Q_BEP": Q_BEP[order],
+            "H_BEP": H_BEP[order],
+            "eta_BEP": eta_BEP[order],
+            "N": N[order],
+            "B_coef": B_from_water_conditions(1.0, Q_BEP, H_BEP, N)[order],
+            "curve_H": np.asarray(curve_H, dtype=float)[order],
+            "curve_eta": np.asarray(curve_eta, dtype=float)[order],
+        }
+        return cls(columns, flow_ratios)
+
+    def save(self, path):
+        """
+        Writes the catalog to a directory of .npy columns plus a small JSON header.
+
+        Parameters:
+            path (str or Path): Output directory (created if needed).
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in _COLUMNS:
+            np.save(path / f"{name}.npy", self.columns[name])
+        meta = {"version": _FILE_VERSION, "n_pumps": len(self), "flow_ratios": self.flow_ratios.tolist()}
+        (path / _META_FILE).write_text(json.dumps(meta))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Reads a catalog written by save.
+
+        Parameters:
+            path (str or Path): Directory written by save.
+            mmap (bool): Memory-map the columns read-only instead of reading them into memory.
+
+        Returns:
+            PumpCatalog: The loaded catalog.
+        """
+        path = Path(path)
+        meta = json.loads((path / _META_FILE).read_text())
+        if meta["version"] != _FILE_VERSION:
+            raise ValueError(f"Unsupported pump catalog version {meta['version']}.")
+        columns = {name: np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None) for name in _COLUMNS}
+        return cls(columns, meta["flow_ratios"])
+
+    def bep_range(self, Q_min, Q_max):
+        """
+        Returns the index slice of the pumps with Q_min <= Q_BEP <= Q_max.
+        """
+        Q_BEP = self.columns["Q_BEP"]
+        return slice(int(np.searchsorted(Q_BEP, Q_min, side="left")),
+                     int(np.searchsorted(Q_BEP, Q_max, side="right")))
+
+    def covering(self, Q_vis, H_vis, nu_vis_cSt, specific_gravity=1.0, flow_window=(0.7, 1.2), head_margin=None):
+        """
+        Finds the pumps whose viscous-corrected curve covers a duty point.
+
+        A pump covers the duty point when the water-equivalent flow Q_vis / C_q lies within
+        flow_window of its BEP flow and its corrected head there is at least H_vis.
+
+        Parameters:
+            Q_vis (float): Duty flow rate with viscous fluid [m³/h].
+            H_vis (float): Duty head with viscous fluid [m].
+            nu_vis_cSt (float): Kinematic viscosity [cSt].
+            specific_gravity (float): Specific gravity [-].
+            flow_window (tuple): Allowed (min, max) Q_water/Q_BEP at the duty point.
+            head_margin (float, optional): Also reject pumps whose corrected head exceeds
+                H_vis * (1 + head_margin).
+
+        Returns:
+            dict: Arrays for the matching pumps sorted by ascending power: 'index' (catalog
+            rows, for correct and columns_for), 'name', 'Q_BEP', 'H_BEP', 'N', 'B', 'flow_ratio',
+            'H_vis' [m], 'eta_vis' [decimal] and 'P_vis' [kW] at the duty flow.
+        """
+        r_min, r_max = flow_window
+        # C_q only lowers the flow, and is smallest for the largest B in the catalog.
+        C_q_floor = float(correction_factor_flow(max(self._B_coef_max * np.sqrt(nu_vis_cSt), 1.0)))
+        candidates = self.bep_range(Q_vis / r_max, Q_vis / (r_min * C_q_floor))
+        index = np.arange(len(self))[candidates]
+
+        Q_BEP = np.asarray(self.columns["Q_BEP"][candidates])
+        B = np.asarray(self.columns["B_coef"][candidates]) * np.sqrt(nu_vis_cSt)
+        B_eff = np.maximum(B, 1.0)
+        C_q = correction_factor_flow(B_eff)
+        ratio = Q_vis / C_q / Q_BEP
+        keep = (ratio >= r_min) & (ratio <= r_max)
+
+        index, Q_BEP, B, B_eff, C_q, ratio = index[keep], Q_BEP[keep], B[keep], B_eff[keep], C_q[keep], ratio[keep]
+        H_water = self._curve_at("curve_H", index, ratio)
+        H_duty = correction_factor_head(C_q, ratio * Q_BEP, Q_BEP) * H_water
+        keep = H_duty >= H_vis
+        if head_margin is not None:
+            keep &= H_duty <= H_vis * (1 + head_margin)
+
+        index, B, B_eff, ratio, H_duty = index[keep], B[keep], B_eff[keep], ratio[keep], H_duty[keep]
+        eta_duty = self._curve_at("curve_eta", index, ratio) * correction_factor_efficiency(B_eff)
+        P_duty = corrected_power(Q_vis, H_duty, specific_gravity, eta_duty)
+
+        order = np.argsort(P_duty, kind="stable")
+        result = {"index": index[order]}
+        result.update(self.columns_for(result["index"], ("name", "Q_BEP", "H_BEP", "N")))
+        result.update({"B": B[order], "flow_ratio": ratio[order], "H_vis": H_duty[order],
+                       "eta_vis": eta_duty[order], "P_vis": P_duty[order]})
+        return result
+
+    def columns_for(self, index, names=("name", "Q_BEP", "H_BEP", "eta_BEP", "N")):
+        """
+        Gathers catalog columns for a set of rows.
+
+        Parameters:
+            index (array_like): Catalog row indices.
+            names (sequence of str): Columns to gather.
+
+        Returns:
+            dict: {column: array}.
+        """
+        index = np.asarray(index, dtype=np.intp)
+        return {name: np.asarray(self.columns[name][index]) for name in names}
+
+    def correct(self, index, nu_vis_cSt, specific_gravity, flow_ratios=None):
+        """
+        Corrects the stored water curves of catalog rows with pump_correction_tools.correct_pump_batch.
+
+        Parameters:
+            index (array_like): Catalog row indices (e.g. covering(...)['index']).
+            nu_vis_cSt (float or array_like): Kinematic viscosity [cSt].
+            specific_gravity (float or array_like): Specific gravity [-].
+            flow_ratios (array_like, optional): Q/Q_BEP grid. Defaults to the catalog grid; other
+                grids are interpolated from the stored curves.
+
+        Returns:
+            dict: The correct_pump_batch result, one row per index.
+        """
+        index = np.asarray(index, dtype=np.intp)
+        pumps = self.columns_for(index, ("Q_BEP", "H_BEP", "N", "eta_BEP"))
+        if flow_ratios is None:
+            flow_ratios = self.flow_ratios
+            H_curve = np.asarray(self.columns["curve_H"][index])
+            eta_curve = np.asarray(self.columns["curve_eta"][index])
+        else:
+            flow_ratios = np.asarray(flow_ratios, dtype=float)
+            rows = index[:, None]
+            H_curve = self._curve_at("curve_H", rows, flow_ratios)
+            eta_curve = self._curve_at("curve_eta", rows, flow_ratios)
+
+        return correct_pump_batch(pumps["Q_BEP"], pumps["H_BEP"], pumps["N"], pumps["eta_BEP"],
+                                  nu_vis_cSt, specific_gravity, flow_ratios=flow_ratios,
+                                  H_water_curve=H_curve, eta_water_curve=eta_curve)
+
+    def _curve_at(self, column, index, ratio):
+        # Linear interpolation of a curve column at flow ratios broadcast against the rows.
+        grid = self.flow_ratios
+        j = np.clip(np.searchsorted(grid, ratio) - 1, 0, len(grid) - 2)
+        t = (ratio - grid[j]) / (grid[j + 1] - grid[j])
+        curve = self.columns[column]
+        return (1 - t) * curve[index, j] + t * curve[index, j + 1]
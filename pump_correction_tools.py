@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import numpy as np
 
 
@@ -177,28 +179,28 @@ def B_from_viscous_operation(nu_vis_cSt, Q_vis, H_vis):
 
 def inverse_correction_factor_flow(B):
     """
-    Returns the inverse flow correction factor (C_q) — approximate value based on ANSI/HI 9.6.7.
+    Returns the inverse flow correction factor (C_q) based on ANSI/HI 9.6.7.
 
     Parameters:
-        B (float): B parameter.
+        B (float): B parameter from viscous operation.
 
     Returns:
         float: Correction factor.
     """
-    return np.exp(-0.165 * (np.log10(5.7) ** 3.15))
+    return np.exp(-0.165 * (np.log10(B) ** 3.15))
 
 
 def inverse_correction_factor_head(B):
     """
-    Returns the inverse head correction factor (C_H) — approximate value based on ANSI/HI 9.6.7.
+    Returns the inverse head correction factor (C_H) at BEP based on ANSI/HI 9.6.7 (C_H = C_q).
 
     Parameters:
-        B (float): B parameter.
+        B (float): B parameter from viscous operation.
 
     Returns:
         float: Correction factor.
     """
-    return np.exp(-0.165 * (np.log10(5.7) ** 3.15))  # approximation
+    return np.exp(-0.165 * (np.log10(B) ** 3.15))
 
 
 def equivalent_water_flow(C_q, Q_vis):
@@ -270,3 +272,241 @@ def inverse_power(Q_vis, H_vis_total, rho, eta_vis):
         float: Required power [kW].
     """
     return (Q_vis * H_vis_total * rho) / (367 * eta_vis)
+
+
+def solve_water_equivalent(Q_vis, H_vis, nu_vis_cSt, N_rpm, eta_vis=None, B_init=None, tol=1e-10, max_iter=20):
+    """
+    Finds the water performance whose forward ANSI/HI 9.6.7 correction gives the viscous BEP.
+
+    The unknown is the forward B parameter. With Q_water = Q_vis / C_q(B) and
+    H_water = H_vis / C_q(B), the forward definition gives B = B_v * C_q(B) ** 0.3125, where
+    B_v = B_from_water_conditions(nu, Q_vis, H_vis, N). The root is unique and lies in
+    [1, B_v] when B_v > 1; for B_v <= 1 no correction applies. Every element is solved at once
+    with Newton steps safeguarded by bisection, for a fixed iteration budget.
+
+    Parameters:
+        Q_vis (array_like): Flow rate at BEP with viscous fluid [m³/h].
+        H_vis (array_like): Head at BEP with viscous fluid [m].
+        nu_vis_cSt (array_like): Kinematic viscosity [cSt].
+        N_rpm (array_like): Pump speed [rpm].
+        eta_vis (array_like, optional): Efficiency with viscous fluid [decimal].
+        B_init (array_like, optional): Warm start for B, e.g. the previous solution along a
+            time series. Defaults to B_from_viscous_operation.
+        tol (float): Convergence tolerance on B.
+        max_iter (int): Iteration budget.
+
+    Returns:
+        dict: Arrays with the broadcast input shape: 'B', 'C_q', 'C_h', 'C_eta', 'Q_water',
+        'H_water', 'eta_water' (only when eta_vis is given), 'iterations' and 'converged'.
+    """
+    Q_vis, H_vis, nu, N = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (Q_vis, H_vis, nu_vis_cSt, N_rpm)))
+    B_v = B_from_water_conditions(nu, Q_vis, H_vis, N)
+
+    lower = np.ones(B_v.shape)
+    upper = np.maximum(B_v, 1.0)
+    B = B_from_viscous_operation(nu, Q_vis, H_vis) if B_init is None else np.asarray(B_init, dtype=float)
+    B = np.clip(np.broadcast_to(B, B_v.shape), lower, upper)
+
+    active = B_v > 1.0
+    iterations = np.zeros(B_v.shape, dtype=int)
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        log_B = np.log10(B)
+        C_q = np.exp(-0.165 * log_B ** 3.15)
+        residual = B_v * C_q ** 0.3125 - B
+
+        # The residual decreases with B, so its sign tightens the bracket.
+        lower = np.where(active & (residual > 0), B, lower)
+        upper = np.where(active & (residual < 0), B, upper)
+
+        dC_dB = C_q * (-0.165 * 3.15 * log_B ** 2.15) / (B * np.log(10))
+        slope = 0.3125 * B_v * C_q ** -0.6875 * dC_dB - 1.0
+        B_new = B - residual / slope
+        B_new = np.where((B_new > lower) & (B_new < upper), B_new, 0.5 * (lower + upper))
+
+        step = np.abs(B_new - B)
+        B = np.where(active, B_new, B)
+        iterations += active
+        active &= step > tol
+
+    B = np.where(B_v > 1.0, B, B_v)
+    B_eff = np.maximum(B, 1.0)
+    C_q = correction_factor_flow(B_eff)
+    C_eta = correction_factor_efficiency(B_eff)
+
+    result = {
+        "B": B,
+        "C_q": C_q,
+        "C_h": C_BEP_head(C_q),
+        "C_eta": C_eta,
+        "Q_water": equivalent_water_flow(C_q, Q_vis),
+        "H_water": equivalent_water_head(C_BEP_head(C_q), H_vis),
+        "iterations": iterations,
+        "converged": ~active,
+    }
+    if eta_vis is not None:
+        result["eta_water"] = np.asarray(eta_vis, dtype=float) / C_eta
+    return result
+
+
+# --- Batch evaluation (arrays of pumps and fluids)
+
+def correct_pump_batch(Q_BEP_water_m3h, H_BEP_water_m, N_rpm, eta_water, nu_vis_cSt, specific_gravity,
+                       flow_ratios=None, H_water_curve=None, eta_water_curve=None, factors=None):
+    """
+    Applies the ANSI/HI 9.6.7 viscous correction to many pump/fluid combinations at once.
+
+    All pump and fluid inputs are broadcast against each other following NumPy rules, and the
+    flow-ratio grid is appended as the last axis of every curve. To screen every pump against
+    every fluid, pass pump data with shape (P, 1) and fluid data with shape (1, F); the curves
+    then have shape (P, F, len(flow_ratios)).
+
+    The water head and efficiency curves can be given over the flow-ratio grid (see
+    water_curve for tabulated or fitted vendor data); otherwise they are taken as constant at
+    the BEP values. Points with B <= 1 pass through uncorrected.
+
+    Parameters:
+        Q_BEP_water_m3h (array_like): Flow rate at BEP with water [m³/h].
+        H_BEP_water_m (array_like): Head at BEP with water [m].
+        N_rpm (array_like): Pump speed [rpm].
+        eta_water (array_like): Efficiency with water [decimal].
+        nu_vis_cSt (array_like): Kinematic viscosity of viscous fluid [cSt].
+        specific_gravity (array_like): Specific gravity of viscous fluid [-].
+        flow_ratios (array_like, optional): Q/Q_BEP grid. Defaults to 0.2 to 1.5 in steps of 0.1.
+        H_water_curve (array_like, optional): Water head [m] over the grid, broadcastable to
+            the curve shape (..., len(flow_ratios)). Defaults to H_BEP at every flow.
+        eta_water_curve (array_like, optional): Water efficiency [decimal] over the grid.
+            Defaults to eta_water at every flow.
+        factors (tuple, optional): Precomputed (B, C_q, C_eta, n_s), broadcastable to the input
+            shape, e.g. from correction_cache.CorrectionCache.factors. Defaults to computing them.
+
+    Returns:
+        dict: Arrays keyed by name. Per-combination values ('n_s', 'B', 'C_q', 'C_eta',
+        'valid_n_s', 'valid_B', 'valid_viscosity', 'valid') have the broadcast input shape;
+        curves ('Q_water', 'C_h', 'Q_vis', 'H_water', 'H_vis', 'eta_water', 'eta_vis',
+        'P_water', 'P_vis') carry the extra flow-ratio axis, given in 'flow_ratios'.
+    """
+    if flow_ratios is None:
+        flow_ratios = np.arange(0.2, 1.6, 0.1)
+    flow_ratios = np.asarray(flow_ratios, dtype=float)
+
+    Q_BEP, H_BEP, N, eta_w, nu, s = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in
+          (Q_BEP_water_m3h, H_BEP_water_m, N_rpm, eta_water, nu_vis_cSt, specific_gravity)))
+
+    if factors is None:
+        n_s = specific_speed(N, Q_BEP / 3600, H_BEP)
+        B = B_from_water_conditions(nu, Q_BEP, H_BEP, N)
+
+        # Clamping at B = 1 makes every factor exactly 1, which is the pass-through branch.
+        B_eff = np.maximum(B, 1.0)
+        C_q = correction_factor_flow(B_eff)
+        C_eta = correction_factor_efficiency(B_eff)
+    else:
+        B, C_q, C_eta, n_s = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in factors), Q_BEP)[:4]
+
+    # Per-combination values gain a trailing axis to broadcast against the flow-ratio grid.
+    Q_water = Q_BEP[..., None] * flow_ratios
+    C_h = correction_factor_head(C_BEP_head(C_q)[..., None], Q_water, Q_BEP[..., None])
+    if H_water_curve is None:
+        H_water = np.broadcast_to(H_BEP[..., None], Q_water.shape)
+    else:
+        H_water = np.broadcast_to(np.asarray(H_water_curve, dtype=float), Q_water.shape)
+    if eta_water_curve is None:
+        eta_water_curve = np.broadcast_to(eta_w[..., None], Q_water.shape)
+    else:
+        eta_water_curve = np.broadcast_to(np.asarray(eta_water_curve, dtype=float), Q_water.shape)
+
+    Q_vis = corrected_flow(C_q[..., None], Q_water)
+    H_vis = corrected_head(C_h, H_water)
+    eta_vis = corrected_efficiency(C_eta[..., None], eta_water_curve)
+
+    valid_n_s = n_s <= 60
+    valid_B = B <= 40
+    valid_viscosity = (nu >= 1) & (nu <= 4000)
+
+    return {
+        "flow_ratios": flow_ratios,
+        "n_s": n_s,
+        "B": B,
+        "C_q": C_q,
+        "C_eta": C_eta,
+        "Q_water": Q_water,
+        "C_h": C_h,
+        "Q_vis": Q_vis,
+        "H_water": H_water,
+        "H_vis": H_vis,
+        "eta_water": eta_water_curve,
+        "eta_vis": eta_vis,
+        "P_water": corrected_power(Q_water, H_water, s[..., None], eta_water_curve),
+        "P_vis": corrected_power(Q_vis, H_vis, s[..., None], eta_vis),
+        "valid_n_s": valid_n_s,
+        "valid_B": valid_B,
+        "valid_viscosity": valid_viscosity,
+        "valid": valid_n_s & valid_B & valid_viscosity,
+    }
+
+
+# --- Water curves (tabulated or fitted vendor data)
+
+def water_curve(Q_points_m3h, values, Q_m3h, degree=None):
+    """
+    Evaluates a water performance curve (head or efficiency) from vendor data points.
+
+    With degree=None the points are interpolated linearly (flows outside the data take the
+    end values); otherwise a least-squares polynomial of that degree in Q is fitted. Fits are
+    cached per data set, so correcting the same pump again does not refit its curves.
+
+    Parameters:
+        Q_points_m3h (array_like): Flow rates of the data points [m³/h].
+        values (array_like): Head [m] or efficiency [decimal] at the data points.
+        Q_m3h (array_like): Flow rates to evaluate the curve at [m³/h].
+        degree (int, optional): Polynomial degree of the fit.
+
+    Returns:
+        ndarray: Curve values at Q_m3h.
+
+    Raises:
+        ValueError: If the points have different values at the same flow rate, or a fit has fewer
+            different flow rates than degree + 1.
+    """
+    Q_points = np.asarray(Q_points_m3h, dtype=float).ravel()
+    values = np.asarray(values, dtype=float).ravel()
+    if Q_points.shape != values.shape:
+        raise ValueError("Curve flow rates and values must have the same length.")
+    order = np.argsort(Q_points, kind="stable")
+    Q_points, values = Q_points[order], values[order]
+    duplicate = (np.diff(Q_points) == 0) & (np.diff(values) != 0)
+    if duplicate.any():
+        raise ValueError(f"Curve has different values at the same flow rate "
+                         f"({Q_points[1:][duplicate][0]:g} m³/h).")
+
+    if degree is None:
+        return np.interp(Q_m3h, Q_points, values)
+    return np.polyval(fit_water_curve(Q_points, values, degree), Q_m3h)
+
+
+def fit_water_curve(Q_points_m3h, values, degree):
+    """
+    Returns the cached least-squares polynomial coefficients of a water curve.
+
+    Parameters:
+        Q_points_m3h (array_like): Flow rates of the data points [m³/h].
+        values (array_like): Head [m] or efficiency [decimal] at the data points.
+        degree (int): Polynomial degree.
+
+    Returns:
+        ndarray: Read-only coefficients, highest power first (np.polyval order).
+    """
+    return _fit_water_curve(tuple(np.asarray(Q_points_m3h, dtype=float).ravel().tolist()),
+                            tuple(np.asarray(values, dtype=float).ravel().tolist()), int(degree))
+
+
+@lru_cache(maxsize=4096)
+def _fit_water_curve(Q_points, values, degree):
+    if len(set(Q_points)) <= degree:
+        raise ValueError(f"A degree {degree} fit needs at least {degree + 1} different flow rates.")
+    coefficients = np.polyfit(Q_points, values, degree)
+    coefficients.setflags(write=False)
+    return coefficients
@@ -0,0 +1,269 @@
+"""
+Pump stations: several viscous-corrected pumps in series or parallel.
+
+Each pump is scaled to its running speed with the affinity laws (Q ~ N, H ~ N²) before the
+ANSI/HI 9.6.7 correction, since B depends on the speed. Pump curves are tabulated on a grid of
+flow ratios, combined into the station curve on a flow grid shared by the station's pumps
+(heads added at equal flow in series, flows added at equal head in parallel), and intersected
+with the Darcy-Weisbach system curve of operating_point.system_head.
+
+Pump data carry the pumps on the last axis, so a batch of stations (e.g. lineups during an
+optimization) is solved in one call:
+
+    # 3000 lineups of 4 pump slots; a speed of 0 rpm means the pump is not running
+    result = solve_station(Q_BEP, H_BEP, eta, N_rated, N_run, nu, SG, L, D, roughness, H_static,
+                           arrangement="parallel")
+
+As in operating_point, the water head curve is the parabola through the shutoff head
+(shutoff_ratio * H_BEP) and the BEP, and the water efficiency is constant. Pumps in parallel
+that cannot reach the station head deliver no flow (check valves), and stopped pumps in series
+are bypassed.
+"""
+
+import numpy as np
+
+from operating_point import system_head
+from pump_correction_tools import (
+    B_from_water_conditions, correction_factor_flow, C_BEP_head, correction_factor_head,
+    correction_factor_efficiency, corrected_power
+)
+
+ARRANGEMENTS = ("series", "parallel")
+
+
+def interp_rows(x, xp, fp):
+    """
+    Linear interpolation along the last axis, one curve per row (np.interp for stacked curves).
+
+    Leading axes of the three arrays broadcast against each other. Points outside a curve take
+    its end values, as in np.interp.
+
+    Parameters:
+        x (array_like): Points to evaluate, shape (..., J).
+        xp (array_like): Increasing abscissas of the curves, shape (..., K).
+        fp (array_like): Curve values, shape (..., K).
+
+    Returns:
+        ndarray: Interpolated values, shape (..., J).
+    """
+    x, xp, fp = (np.asarray(v, dtype=float) for v in (x, xp, fp))
+    lead = np.broadcast_shapes(x.shape[:-1], xp.shape[:-1], fp.shape[:-1])
+    x = np.broadcast_to(x, lead + x.shape[-1:]).reshape(-1, x.shape[-1])
+    xp = np.broadcast_to(xp, lead + xp.shape[-1:]).reshape(-1, xp.shape[-1])
+    fp = np.broadcast_to(fp, lead + fp.shape[-1:]).reshape(-1, fp.shape[-1])
+    n_rows, K = xp.shape
+
+    # Rows are normalized to [0, 1] and shifted apart, so one searchsorted serves every row.
+    start = xp[:, :1]
+    span = xp[:, -1:] - start
+    span = np.where(span > 0, span, 1.0)
+    offset = 2.0 * np.arange(n_rows)[:, None]
+    keys = ((xp - start) / span + offset).ravel()
+    queries = np.clip((x - start) / span, 0.0, 1.0) + offset
+    j = np.searchsorted(keys, queries.ravel(), side="right").reshape(x.shape) - 1
+    j = np.clip(j - K * np.arange(n_rows)[:, None], 0, K - 2)
+
+    x0, x1 = np.take_along_axis(xp, j, -1), np.take_along_axis(xp, j + 1, -1)
+    f0, f1 = np.take_along_axis(fp, j, -1), np.take_along_axis(fp, j + 1, -1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.clip(np.where(x1 > x0, (x - x0) / (x1 - x0), 0.0), 0.0, 1.0)
+    return (f0 + t * (f1 - f0)).reshape(lead + (x.shape[-1],))
+
+
+def pump_curves(Q_BEP_water_m3h, H_BEP_water_m, eta_water, N_rated_rpm, N_rpm, nu_vis_cSt, specific_gravity,
+                shutoff_ratio=1.25, n_points=64):
+    """
+    Tabulates the viscous curves of the pumps at their running speeds.
+
+    Parameters:
+        Q_BEP_water_m3h (array_like): Flow rate at BEP with water at the rated speed [m³/h], shape (..., M).
+        H_BEP_water_m (array_like): Head at BEP with water at the rated speed [m], shape (..., M).
+        eta_water (array_like): Efficiency with water [decimal], shape (..., M).
+        N_rated_rpm (array_like): Speed of the BEP data [rpm], shape (..., M).
+        N_rpm (array_like): Running speed [rpm], shape (..., M); 0 for a stopped pump.
+        nu_vis_cSt (array_like): Kinematic viscosity [cSt], shape (...).
+        specific_gravity (array_like): Specific gravity [-], shape (...).
+        shutoff_ratio (array_like): Shutoff head over BEP head of the water curves [-], > 1.
+        n_points (int): Points per pump curve, from shutoff to zero head.
+
+    Returns:
+        dict: Per pump (..., M): 'running', 'Q_BEP' and 'H_BEP' (water, at running speed), 'B',
+        'C_q', 'C_eta', 'eta_vis'. Curves (..., M, n_points): 'Q_vis' [m³/h] increasing, 'H_vis' [m]
+        decreasing to zero, 'P_vis' [kW]. Stopped pumps have zero flow, head and power.
+    """
+    Q_BEP, H_BEP, eta_w, N_rated, N, shutoff = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (Q_BEP_water_m3h, H_BEP_water_m, eta_water, N_rated_rpm, N_rpm,
+                                               shutoff_ratio)))
+    if np.any(shutoff <= 1):
+        raise ValueError("Station curves need rising water head curves (shutoff_ratio > 1).")
+    nu = np.asarray(nu_vis_cSt, dtype=float)[..., None]
+    s = np.asarray(specific_gravity, dtype=float)[..., None]
+
+    # Affinity laws to the running speed; stopped pumps keep their rated data to stay finite.
+    running = N > 0
+    speed_ratio = np.where(running, N / N_rated, 1.0)
+    N = np.where(running, N, N_rated)
+    Q_BEP = Q_BEP * speed_ratio
+    H_BEP = H_BEP * speed_ratio ** 2
+
+    B = B_from_water_conditions(nu, Q_BEP, H_BEP, N)
+    B_eff = np.maximum(B, 1.0)
+    C_q = correction_factor_flow(B_eff)
+    C_eta = correction_factor_efficiency(B_eff)
+    eta_vis = C_eta * eta_w
+
+    # Flow ratios from shutoff to the zero head of the water parabola.
+    ratio_max = np.sqrt(shutoff / (shutoff - 1))
+    ratio = np.linspace(0.0, 1.0, n_points) * ratio_max[..., None]
+    H_water = H_BEP[..., None] * (shutoff[..., None] - (shutoff[..., None] - 1) * ratio ** 2)
+    Q_water = Q_BEP[..., None] * ratio
+    C_h = correction_factor_head(C_BEP_head(C_q)[..., None], Q_water, Q_BEP[..., None])
+
+    on = running[..., None]
+    Q_vis = np.where(on, C_q[..., None] * Q_water, 0.0)
+    H_vis = np.where(on, np.maximum(C_h * H_water, 0.0), 0.0)
+    return {
+        "running": running,
+        "Q_BEP": Q_BEP,
+        "H_BEP": H_BEP,
+        "B": B,
+        "C_q": C_q,
+        "C_eta": C_eta,
+        "eta_vis": eta_vis,
+        "Q_vis": Q_vis,
+        "H_vis": H_vis,
+        "P_vis": np.where(on, corrected_power(Q_vis, H_vis, s, eta_vis[..., None]), 0.0),
+    }
+
+
+def station_curve(curves, arrangement="parallel", n_flow=256):
+    """
+    Combines tabulated pump curves (see pump_curves) into station curves on a shared flow grid.
+
+    Parameters:
+        curves (dict): Result of pump_curves.
+        arrangement (str): 'series' or 'parallel'.
+        n_flow (int): Points of the station flow grid.
+
+    Returns:
+        dict: Station curves (..., n_flow): 'Q' [m³/h] from zero to the largest station flow,
+        'H' [m] and 'P' [kW] (total shaft power).
+    """
+    if arrangement not in ARRANGEMENTS:
+        raise ValueError(f"Unknown arrangement '{arrangement}'. Use {' or '.join(ARRANGEMENTS)}.")
+    running = curves["running"][..., None]
+    Q_vis, H_vis, P_vis = curves["Q_vis"], curves["H_vis"], curves["P_vis"]
+    grid = np.linspace(0.0, 1.0, n_flow)
+
+    if arrangement == "series":
+        # Equal flow through every running pump, up to the first one that runs out of head.
+        Q_end = np.where(running[..., 0], Q_vis[..., -1], np.inf).min(axis=-1)
+        Q_end = np.where(np.isfinite(Q_end), Q_end, 0.0)  # No pump running
+        Q = Q_end[..., None] * grid
+        at_Q = Q[..., None, :]
+        H = np.where(running, interp_rows(at_Q, Q_vis, H_vis), 0.0).sum(axis=-2)
+        P = np.where(running, interp_rows(at_Q, Q_vis, P_vis), 0.0).sum(axis=-2)
+        return {"Q": Q, "H": H, "P": P}
+
+    # Parallel: add the flows at equal head on a head grid, then resample on the flow grid.
+    h = H_vis[..., 0].max(axis=-1)[..., None] * grid
+    at_h = h[..., None, :]
+    H_up, Q_up, P_up = H_vis[..., ::-1], Q_vis[..., ::-1], P_vis[..., ::-1]
+    Q_h = np.where(running, interp_rows(at_h, H_up, Q_up), 0.0).sum(axis=-2)
+    P_h = np.where(running, interp_rows(at_h, H_up, P_up), 0.0).sum(axis=-2)
+    Q = Q_h[..., :1] * grid
+    H = interp_rows(Q, Q_h[..., ::-1], h[..., ::-1])
+    P = interp_rows(Q, Q_h[..., ::-1], P_h[..., ::-1])
+    return {"Q": Q, "H": H, "P": P}
+
+
+def solve_station(Q_BEP_water_m3h, H_BEP_water_m, eta_water, N_rated_rpm, N_rpm, nu_vis_cSt, specific_gravity,
+                  L_m, D_m, roughness_m, H_static_m, arrangement="parallel", shutoff_ratio=1.25, g=9.81,
+                  friction_method="fixed_point", n_points=64, n_flow=256):
+    """
+    Finds the operating point of pump stations against their system curves.
+
+    The station curve is piecewise linear on the shared flow grid, and the operating point is
+    its first crossing of the system curve, so the accuracy is set by n_points and n_flow
+    (about 1e-4 relative on the head with the defaults).
+
+    Parameters:
+        Q_BEP_water_m3h, H_BEP_water_m, eta_water, N_rated_rpm, N_rpm: Pump data with the pumps on
+            the last axis, see pump_curves.
+        nu_vis_cSt (array_like): Kinematic viscosity [cSt], shape (...).
+        specific_gravity (array_like): Specific gravity [-], shape (...).
+        L_m, D_m, roughness_m, H_static_m (array_like): System curve data (see
+            operating_point.system_head), shape (...).
+        arrangement (str): 'series' or 'parallel'.
+        shutoff_ratio (array_like): Shutoff head over BEP head of the water curves [-].
+        g (float): Gravity [m/s²].
+        friction_method (str): Turbulent friction factor backend, see flow_resistance.friction_factor.
+        n_points (int): Points per pump curve.
+        n_flow (int): Points of the station flow grid.
+
+    Returns:
+        dict: Station values (...): 'Q_vis' [m³/h], 'H_vis' [m], 'P_vis' [kW], 'eta_vis' (station
+        hydraulic efficiency [decimal]), 'Re', 'f' and 'has_solution' (False, with NaN values,
+        where the station cannot overcome the static head or never meets the system curve).
+        Per pump (..., M): 'pump_Q_vis', 'pump_H_vis', 'pump_P_vis', 'pump_eta_vis' (zero for
+        stopped pumps) and 'B'.
+    """
+    curves = pump_curves(Q_BEP_water_m3h, H_BEP_water_m, eta_water, N_rated_rpm, N_rpm, nu_vis_cSt,
+                         specific_gravity, shutoff_ratio, n_points)
+    station = station_curve(curves, arrangement, n_flow)
+    Q, H = station["Q"], station["H"]
+    shape = Q.shape[:-1]
+
+    nu, s, L_m, D_m, roughness_m, H_static_m = (
+        np.broadcast_to(np.asarray(v, dtype=float), shape)[..., None]
+        for v in (nu_vis_cSt, specific_gravity, L_m, D_m, roughness_m, H_static_m))
+    H_sys, _, _ = system_head(Q, L_m, D_m, roughness_m, H_static_m, nu, s, g, friction_method)
+    residual = H - H_sys
+
+    # First grid interval where the station curve drops below the system curve.
+    below = residual <= 0
+    has_solution = (residual[..., 0] > 0) & below.any(axis=-1)
+    j = np.clip(np.argmax(below, axis=-1), 1, Q.shape[-1] - 1)[..., None]
+    r0, r1 = np.take_along_axis(residual, j - 1, -1), np.take_along_axis(residual, j, -1)
+    # r0 > 0 >= r1 wherever there is a crossing; elsewhere (e.g. every pump stopped) t is unused.
+    t = r0 / np.where(has_solution[..., None], r0 - r1, 1.0)
+    Q0, Q1 = np.take_along_axis(Q, j - 1, -1), np.take_along_axis(Q, j, -1)
+    H0, H1 = np.take_along_axis(H, j - 1, -1), np.take_along_axis(H, j, -1)
+    Q_op = np.where(has_solution, (Q0 + t * (Q1 - Q0))[..., 0], np.nan)
+    H_op = np.where(has_solution, (H0 + t * (H1 - H0))[..., 0], np.nan)
+
+    # Duty of every pump at the station operating point.
+    running = curves["running"]
+    if arrangement == "series":
+        pump_Q = np.broadcast_to(Q_op[..., None], running.shape)
+        pump_H = interp_rows(np.nan_to_num(pump_Q)[..., None], curves["Q_vis"], curves["H_vis"])[..., 0]
+    else:
+        pump_H = np.broadcast_to(H_op[..., None], running.shape)
+        pump_Q = interp_rows(np.nan_to_num(pump_H)[..., None], curves["H_vis"][..., ::-1],
+                             curves["Q_vis"][..., ::-1])[..., 0]
+    solved = has_solution[..., None] & running
+    pump_Q = np.where(solved, pump_Q, np.where(has_solution[..., None], 0.0, np.nan))
+    pump_H = np.where(solved, pump_H, np.where(has_solution[..., None], 0.0, np.nan))
+    pump_eta = np.where(running, curves["eta_vis"], 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pump_P = np.where(solved, corrected_power(pump_Q, pump_H, s, np.where(running, pump_eta, 1.0)), 0.0)
+        pump_P = np.where(has_solution[..., None], pump_P, np.nan)
+        P_op = pump_P.sum(axis=-1)
+        eta_op = corrected_power(Q_op, H_op, s[..., 0], 1.0) / P_op
+
+    _, Re, f = system_head(np.nan_to_num(Q_op), L_m[..., 0], D_m[..., 0], roughness_m[..., 0], H_static_m[..., 0],
+                           nu[..., 0], s[..., 0], g, friction_method)
+    return {
+        "Q_vis": Q_op,
+        "H_vis": H_op,
+        "P_vis": P_op,
+        "eta_vis": eta_op,
+        "Re": np.where(has_solution, Re, np.nan),
+        "f": np.where(has_solution, f, np.nan),
+        "has_solution": has_solution,
+        "pump_Q_vis": pump_Q,
+        "pump_H_vis": pump_H,
+        "pump_P_vis": pump_P,
+        "pump_eta_vis": pump_eta,
+        "B": curves["B"],
+    }
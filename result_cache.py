@@ -0,0 +1,256 @@
+"""
+Content-addressed on-disk cache of calculation results and rendered reports.
+
+Entries are keyed by the SHA-256 of the calculation name, its normalized inputs and
+MODEL_VERSION, so identical inputs map to the same entry across runs and processes, and any
+change of the models (bump MODEL_VERSION) invalidates every entry. Results are stored as .npz
+files (no pickling) and rendered figures next to them with their own extension. Once the cache
+exceeds max_bytes, the least recently used entries are deleted.
+
+    cache = ResultCache("~/.cache/pump_correction", max_bytes=200 * 2**20)
+    result = cache.call(correct_pump, Q_BEP_water=110, H_total=77, N=2950, eta_water=0.8,
+                        viscosity=120, specific_gravity=0.9)
+    key = cache.key("report", pump_name="T1", inputs=...)
+    if not cache.copy_figure(key, "pdf", "plots/report.pdf"):
+        render_report("plots/report.pdf")
+        cache.put_figure(key, "plots/report.pdf")
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+
+import numpy as np
+
+from correction_service import PumpCorrectionResult, InverseCorrectionResult, PipelineFlowResult
+
+# Bump whenever a change to the models or to the result layout changes cached results.
+MODEL_VERSION = "1"
+DEFAULT_MAX_BYTES = 256 * 2**20
+# Cache used by the applications; the RESULT_CACHE_DIR environment variable overrides it.
+DEFAULT_CACHE_DIR = Path(".result_cache")
+_RESULT_TYPES = {cls.__name__: cls for cls in (PumpCorrectionResult, InverseCorrectionResult, PipelineFlowResult)}
+_SIGNIFICANT_DIGITS = 12
+
+
+_default_cache = None
+
+
+def default_cache():
+    """
+    Returns the shared cache of the applications (created on first use).
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache(os.environ.get("RESULT_CACHE_DIR", DEFAULT_CACHE_DIR))
+    return _default_cache
+
+
+def normalize(value):
+    """
+    Converts inputs to a canonical JSON-serializable form for hashing.
+
+    Numbers become floats rounded to 12 significant digits (so 0.1 + 0.2 and 0.3, or 2950 and
+    2950.0, give the same key), arrays and tuples become lists and dict keys are sorted.
+    """
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(f"{float(value):.{_SIGNIFICANT_DIGITS}g}")
+    raise TypeError(f"Cannot use a {type(value).__name__} as a cache input.")
+
+
+class ResultCache:
+    """
+    On-disk cache of results (.npz) and rendered figures, bounded in size.
+
+    The cache can be shared by several processes: files are written to a temporary name and
+    renamed into place, and a missing or unreadable entry is treated as a miss.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, model_version=MODEL_VERSION):
+        """
+        Parameters:
+            path (str or Path): Cache directory (created if needed).
+            max_bytes (int): Size above which the least recently used entries are evicted.
+            model_version (str): Version mixed into every key.
+        """
+        self.path = Path(path).expanduser()
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.model_version = model_version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = sum(f.stat().st_size for f in self._files())
+
+    def key(self, name, **inputs):
+        """
+        Returns the hex key of a calculation (or report) name and its inputs.
+        """
+        payload = {"name": name, "model_version": self.model_version, "inputs": normalize(inputs)}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Returns the arrays stored under key, or None on a miss.
+        """
+        file = self._file(key, "npz")
+        try:
+            with np.load(file, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self._touch(file)
+        self.hits += 1
+        return arrays
+
+    def put(self, key, arrays):
+        """
+        Stores a dict of arrays (or numbers and strings) under key, compressed.
+        """
+        def write(fh):
+            np.savez_compressed(fh, **{name: np.asarray(value) for name, value in arrays.items()})
+
+        self._write(self._file(key, "npz"), write)
+
+    def call(self, function, **kwargs):
+        """
+        Returns function(**kwargs) from the cache, computing and storing it on a miss.
+
+        Parameters:
+            function (callable): correct_pump, inverse_correction or pressurized_flow of
+                correction_service (any function returning one of their result dataclasses).
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            The result dataclass.
+        """
+        key = self.key(function.__name__, **kwargs)
+        arrays = self.get(key)
+        if arrays is not None:
+            return _result_from_arrays(arrays)
+        result = function(**kwargs)
+        self.put(key, _result_to_arrays(result))
+        return result
+
+    def copy_figure(self, key, file_format, destination):
+        """
+        Copies the figure cached under key to destination.
+
+        Returns:
+            bool: True on a hit; False if the figure has to be rendered (then call put_figure).
+        """
+        file = self._file(key, file_format)
+        try:
+            shutil.copyfile(file, destination)
+        except OSError:
+            self.misses += 1
+            return False
+        self._touch(file)
+        self.hits += 1
+        return True
+
+    def put_figure(self, key, source):
+        """
+        Stores a rendered figure file under key (the file extension is kept as its format).
+        """
+        source = Path(source)
+        self._write(self._file(key, source.suffix.lstrip(".")), lambda fh: fh.write(source.read_bytes()))
+
+    def stats(self):
+        """
+        Returns hit, miss and eviction counters and the cache size [bytes].
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "bytes": self._size}
+
+    def clear(self):
+        """
+        Deletes every entry.
+        """
+        for file in self._files():
+            file.unlink(missing_ok=True)
+        self._size = 0
+
+    def _file(self, key, extension):
+        # Two-character fan-out keeps directories small.
+        return self.path / key[:2] / f"{key}.{extension}"
+
+    def _files(self):
+        return (f for f in self.path.glob("??/*") if not f.name.startswith("."))
+
+    def _touch(self, file):
+        # The modification time orders the entries for eviction.
+        try:
+            os.utime(file)
+        except OSError:
+            pass
+
+    def _write(self, file, write):
+        file.parent.mkdir(exist_ok=True)
+        old_size = file.stat().st_size if file.exists() else 0
+        fd, tmp = tempfile.mkstemp(dir=file.parent, prefix=".")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                write(fh)
+            os.replace(tmp, file)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._size += file.stat().st_size - old_size
+        if self._size > self.max_bytes:
+            self._evict(keep=file)
+
+    def _evict(self, keep):
+        # Least recently used first, down to 90 % of the bound so that evictions come in batches.
+        entries = []
+        for file in self._files():
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file))
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, file in sorted(entries, key=lambda entry: entry[0]):
+            if self._size <= 0.9 * self.max_bytes:
+                break
+            if file == keep:
+                continue
+            file.unlink(missing_ok=True)
+            self._size -= size
+            self.evictions += 1
+
+
+def _result_to_arrays(result):
+    if not is_dataclass(result) or type(result).__name__ not in _RESULT_TYPES:
+        raise TypeError(f"Cannot cache a {type(result).__name__} result.")
+    arrays = {"__type__": type(result).__name__}
+    for item in fields(result):
+        value = getattr(result, item.name)
+        arrays[item.name] = np.asarray(value, dtype=str) if item.name == "warnings" else value
+    return arrays
+
+
+def _result_from_arrays(arrays):
+    cls = _RESULT_TYPES[str(arrays["__type__"])]
+    values = {}
+    for item in fields(cls):
+        value = arrays[item.name]
+        if item.name == "warnings":
+            values[item.name] = [str(w) for w in value]
+        else:
+            values[item.name] = value.item() if value.ndim == 0 else value
+    return cls(**values)
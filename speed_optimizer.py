@@ -0,0 +1,175 @@
+"""
+Variable-speed drive optimizer: pump speed and number of running pumps that deliver a duty
+with the least viscous shaft power.
+
+For a duty (Q, H) and fluid, n identical pumps in parallel each deliver Q/n. At a candidate
+speed N each pump is scaled with the affinity laws and corrected with ANSI/HI 9.6.7 (B changes
+with N), and any head above H is throttled away. The shaft power at the duty flow is minimized
+over N in [N_min, N_max] by golden-section search, for every hour of a demand profile and
+every pump count at once; speeds whose head falls short of H are infeasible.
+
+    # 24 h demand profile, up to 3 pumps in parallel
+    best = optimize_speed(Q_hourly, H_hourly, nu_hourly, 0.9, Q_BEP_water_m3h=110, H_BEP_water_m=77,
+                          eta_water=0.8, N_rated_rpm=2950, max_pumps=3, eta_curve=(ratios, etas))
+    best["N_rpm"], best["n_pumps"], best["P_vis"]
+
+With the default flat water efficiency the power grows with speed, so the optimum is the
+lowest speed that reaches the duty head; an efficiency curve over Q/Q_BEP (eta_curve) moves
+the optimum towards the speed that runs the pumps near their BEP.
+"""
+
+import numpy as np
+
+from pump_correction_tools import (
+    specific_speed, B_from_water_conditions, correction_factor_flow, C_BEP_head, correction_factor_head,
+    correction_factor_efficiency, corrected_power
+)
+from pump_station import interp_rows
+
+GOLDEN = (np.sqrt(5) - 1) / 2
+
+
+def pump_duty(Q_m3h, N_rpm, nu_vis_cSt, specific_gravity, Q_BEP_water_m3h, H_BEP_water_m, eta_water, N_rated_rpm,
+              shutoff_ratio=1.25, eta_curve=None):
+    """
+    Evaluates a viscous-corrected pump at a given flow rate and speed.
+
+    Parameters:
+        Q_m3h (array_like): Viscous flow rate delivered by the pump [m³/h].
+        N_rpm (array_like): Pump speed [rpm].
+        nu_vis_cSt (array_like): Kinematic viscosity [cSt].
+        specific_gravity (array_like): Specific gravity [-].
+        Q_BEP_water_m3h (array_like): Flow rate at BEP with water at the rated speed [m³/h].
+        H_BEP_water_m (array_like): Head at BEP with water at the rated speed [m].
+        eta_water (array_like): Efficiency at BEP with water [decimal].
+        N_rated_rpm (array_like): Speed of the BEP data [rpm].
+        shutoff_ratio (array_like): Shutoff head over BEP head of the water curve [-].
+        eta_curve (tuple, optional): (flow_ratios, efficiencies) water efficiency curve over Q/Q_BEP,
+            unchanged by the affinity laws; efficiencies may carry leading axes per pump.
+            Defaults to eta_water at every flow.
+
+    Returns:
+        dict: Arrays with the broadcast input shape: 'H_vis' [m], 'eta_vis' [decimal], 'P_vis' [kW],
+        'B', 'n_s' and 'flow_ratio' (water flow over BEP flow at this speed).
+    """
+    Q, N, nu, s, Q_BEP, H_BEP, eta_w, N_rated, shutoff = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (Q_m3h, N_rpm, nu_vis_cSt, specific_gravity, Q_BEP_water_m3h,
+                                               H_BEP_water_m, eta_water, N_rated_rpm, shutoff_ratio)))
+
+    # Affinity laws to the candidate speed, then the correction at that speed.
+    Q_BEP = Q_BEP * N / N_rated
+    H_BEP = H_BEP * (N / N_rated) ** 2
+    B = B_from_water_conditions(nu, Q_BEP, H_BEP, N)
+    B_eff = np.maximum(B, 1.0)
+    C_q = correction_factor_flow(B_eff)
+
+    Q_water = Q / C_q
+    ratio = Q_water / Q_BEP
+    H_water = H_BEP * (shutoff - (shutoff - 1) * ratio ** 2)
+    H_vis = correction_factor_head(C_BEP_head(C_q), Q_water, Q_BEP) * H_water
+    if eta_curve is not None:
+        ratios, values = eta_curve
+        eta_w = interp_rows(ratio[..., None], np.asarray(ratios, dtype=float), values)[..., 0]
+    eta_vis = correction_factor_efficiency(B_eff) * eta_w
+
+    return {
+        "H_vis": H_vis,
+        "eta_vis": eta_vis,
+        "P_vis": corrected_power(Q, H_vis, s, eta_vis),
+        "B": B,
+        "n_s": specific_speed(N, Q_BEP / 3600, H_BEP),
+        "flow_ratio": ratio,
+    }
+
+
+def optimize_speed(Q_req_m3h, H_req_m, nu_vis_cSt, specific_gravity, Q_BEP_water_m3h, H_BEP_water_m, eta_water,
+                   N_rated_rpm, N_min_rpm=None, N_max_rpm=None, max_pumps=1, shutoff_ratio=1.25, eta_curve=None,
+                   tol_rpm=0.5):
+    """
+    Finds the speed and pump count with the least shaft power for every duty.
+
+    All duty, fluid and pump inputs broadcast against each other (e.g. 24 hourly duties, or
+    hours x plant pumps); the pump count is searched on an extra leading axis, so every hour and
+    count is solved in the same vectorized golden-section iterations.
+
+    Parameters:
+        Q_req_m3h (array_like): Required flow rate [m³/h].
+        H_req_m (array_like): Required head [m]; excess pump head is throttled.
+        nu_vis_cSt (array_like): Kinematic viscosity [cSt].
+        specific_gravity (array_like): Specific gravity [-].
+        Q_BEP_water_m3h, H_BEP_water_m, eta_water, N_rated_rpm, shutoff_ratio, eta_curve: Pump data,
+            see pump_duty.
+        N_min_rpm (array_like, optional): Lowest drive speed [rpm]. Defaults to 30 % of the rated speed.
+        N_max_rpm (array_like, optional): Highest drive speed [rpm]. Defaults to the rated speed.
+        max_pumps (int): Largest number of identical pumps running in parallel.
+        tol_rpm (float): Speed tolerance of the search [rpm].
+
+    Returns:
+        dict: Arrays with the broadcast input shape: 'N_rpm', 'n_pumps', 'P_vis' (total shaft power
+        [kW]), 'H_pump' (head before throttling [m]), 'eta_vis', 'B' and 'feasible' (False, with NaN
+        values and n_pumps 0, where no count reaches the duty within the speed range), plus
+        'P_by_count' with the best power of each pump count (1 to max_pumps) on the first axis.
+    """
+    N_rated = np.asarray(N_rated_rpm, dtype=float)
+    N_min = 0.3 * N_rated if N_min_rpm is None else np.asarray(N_min_rpm, dtype=float)
+    N_max = N_rated if N_max_rpm is None else np.asarray(N_max_rpm, dtype=float)
+    pump = (Q_BEP_water_m3h, H_BEP_water_m, eta_water, N_rated, shutoff_ratio, eta_curve)
+    shape = np.broadcast_shapes(*(np.shape(v) for v in (Q_req_m3h, H_req_m, nu_vis_cSt, specific_gravity,
+                                                        Q_BEP_water_m3h, H_BEP_water_m, eta_water, N_rated,
+                                                        N_min, N_max, shutoff_ratio)))
+
+    counts = np.arange(1, max_pumps + 1).reshape((-1,) + (1,) * len(shape))
+    Q_pump = np.asarray(Q_req_m3h, dtype=float) / counts
+    H_req = np.asarray(H_req_m, dtype=float)
+
+    def power(N):
+        # Total power of the running pumps; infinite where the head or the curve falls short.
+        duty = pump_duty(Q_pump, N, nu_vis_cSt, specific_gravity, *pump[:4], shutoff_ratio=pump[4],
+                         eta_curve=pump[5])
+        ok = (duty["H_vis"] >= H_req) & (duty["eta_vis"] > 0)
+        return np.where(ok, counts * duty["P_vis"], np.inf), duty
+
+    a = np.broadcast_to(N_min, (max_pumps,) + shape).astype(float)
+    b = np.broadcast_to(N_max, (max_pumps,) + shape).astype(float)
+    c = b - GOLDEN * (b - a)
+    d = a + GOLDEN * (b - a)
+    f_c, _ = power(c)
+    f_d, _ = power(d)
+    best_N = np.where(f_c <= f_d, c, d)
+    best_P = np.minimum(f_c, f_d)
+
+    # Golden section; an infeasible (infinite) left point moves the bracket towards higher speeds.
+    n_iter = int(np.ceil(np.log(tol_rpm / max(float(np.max(b - a)), tol_rpm)) / np.log(GOLDEN)))
+    for _ in range(n_iter):
+        left = f_c < f_d
+        a = np.where(left, a, c)
+        b = np.where(left, d, b)
+        c, d = np.where(left, b - GOLDEN * (b - a), d), np.where(left, c, a + GOLDEN * (b - a))
+        N_new = np.where(left, c, d)
+        f_new, _ = power(N_new)
+        f_c, f_d = np.where(left, f_new, f_d), np.where(left, f_c, f_new)
+
+        improved = f_new < best_P
+        best_N = np.where(improved, N_new, best_N)
+        best_P = np.where(improved, f_new, best_P)
+
+    # Cheapest pump count per duty, then the duty details at its speed.
+    count_index = np.argmin(best_P, axis=0)[None]
+    P = np.take_along_axis(best_P, count_index, 0)[0]
+    N = np.take_along_axis(best_N, count_index, 0)[0]
+    n_pumps = count_index[0] + 1
+    feasible = np.isfinite(P)
+
+    _, duty = power(np.broadcast_to(N, best_N.shape))
+    pick = lambda values: np.take_along_axis(np.broadcast_to(values, best_N.shape), count_index, 0)[0]
+    nan = lambda values: np.where(feasible, values, np.nan)
+    return {
+        "N_rpm": nan(N),
+        "n_pumps": np.where(feasible, n_pumps, 0),
+        "P_vis": nan(P),
+        "H_pump": nan(pick(duty["H_vis"])),
+        "eta_vis": nan(pick(duty["eta_vis"])),
+        "B": nan(pick(duty["B"])),
+        "feasible": feasible,
+        "P_by_count": np.where(np.isfinite(best_P), best_P, np.nan),
+    }